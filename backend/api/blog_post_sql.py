@@ -1,23 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.core import get_async_session
+from database.routing import db_router, get_read_session, get_write_session, is_pinned_to_primary
 # Import from dependencies module
 from .dependencies.access_control import admin_access, regular_user_access
+from .errors import api_error
+from .listing import cached_or_not_modified, list_page
 import logging
-from sqlalchemy import text, and_
-from api.dependencies.pagination import get_pagination_params, pagination_params, refine_filter_parser
+from api.dependencies.pagination import get_pagination_params, refine_filter_parser, count_strategy_param, get_fields_param, get_embed_param
 from database.models import BlogPost
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import select, func
-from sqlalchemy.orm import selectinload
-from sqlalchemy.exc import ProgrammingError
-from fastapi.responses import JSONResponse
+from sqlalchemy.sql import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import insert, update, delete
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
-from datetime import datetime
-from sqlalchemy.types import String, Text
-from utils.query_builder import QueryBuilder
+from datetime import datetime, date
+from enum import Enum
+import csv
+import io
+from utils.query_builder import QueryBuilder, InvalidQueryError
+from utils.count_strategy import CountStrategy
+from utils.serialization import FastJSONResponse, dumps
+from utils.response_cache import response_cache
+from utils.single_flight import detail_flights
+from utils.conditional import (
+    make_etag, validator_headers, is_not_modified, has_conditional_headers, not_modified,
+    with_page_validators
+)
+from core.config import settings
 
 router = APIRouter(
     prefix="/blog-post-sql",
@@ -25,55 +36,316 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+class CategoryResponse(BaseModel):
+    id: int
+    title: str
+
 class BlogPostResponse(BaseModel):
     id: int
     title: str
-    content: str
+    # Nullable, like the column: create and update both accept a missing content
+    content: Optional[str] = None
+    category_id: Optional[int] = None
+    status: Optional[str] = None
+
+class BlogPostWithCategory(BlogPostResponse):
+    # Present with ?_embed=category
+    category: Optional[CategoryResponse] = None
 
 class BlogPostList(BaseModel):
     data: List[BlogPostResponse]
     total: int
 
+class BlogPostIds(BaseModel):
+    ids: List[int]
+
+class BlogPostCreate(BaseModel):
+    title: str
+    content: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class BlogPostUpdate(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+class BlogPostBulkUpdate(BaseModel):
+    ids: List[int]
+    values: BlogPostUpdate
+
 logger = logging.getLogger(__name__)
 
 @router.get(
     "/", 
-    response_model=List[BlogPostResponse],
+    response_model=List[BlogPostWithCategory],
     dependencies=[Depends(regular_user_access)]
 )
 async def get_blog_posts(
+    request: Request,
     pagination: Dict[str, Any] = Depends(get_pagination_params),
     filters: List[Dict] = Depends(refine_filter_parser),
-    db: AsyncSession = Depends(get_async_session)
+    count_strategy: CountStrategy = Depends(count_strategy_param(CountStrategy.AUTO)),
+    fields: Optional[List[str]] = Depends(get_fields_param),
+    embed: List[str] = Depends(get_embed_param),
+    q: Optional[str] = Query(None, description="Full-text search over title and content, ranked by relevance"),
+    db: AsyncSession = Depends(get_read_session)
 ):
-    """Get paginated blog posts with sorting"""
-    try:
-        query_builder = QueryBuilder(BlogPost)
-        
-        # Build query with all conditions
-        posts, total = await (query_builder
+    """
+    Get paginated blog posts with sorting, optionally restricted to `_fields` columns
+
+    Filters and sorting may use `category.title`; `_embed=category` includes
+    each post's category, loaded in one query for the whole page.
+    """
+    def build():
+        query_builder = (QueryBuilder(BlogPost)
+            .select_fields(fields)
+            .embed(embed)
             .apply_filters(filters)
-            .apply_sorting(pagination.get("order_by"))
-            .apply_pagination(pagination["skip"], pagination["limit"])
-            .execute(db))
-
-        headers = {"x-total-count": str(total)}
-        
-        return JSONResponse(
-            content=jsonable_encoder(posts),
-            headers=headers
-        )
+            .apply_search(q)
+            .use_count_strategy(count_strategy))
+        if settings.FAST_SERIALIZATION:
+            query_builder.as_mappings()
+        return query_builder
+
+    try:
+        return await list_page(request, db, BlogPost.__tablename__, build, pagination)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching blog posts: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": {
-                    "message": "Internal server error",
-                    "statusCode": 500
-                }
-            }
-        )
+        logger.error("Error fetching blog posts: %s", e)
+        raise api_error(500, "Internal server error")
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+async def _export_body(query_builder: QueryBuilder, export_format: ExportFormat, pinned: bool):
+    """Encode streamed batches; the session lives as long as the response body"""
+    async with db_router.read_session(pinned=pinned) as session:
+        header_sent = False
+        try:
+            async for batch in query_builder.stream(session, settings.EXPORT_BATCH_SIZE):
+                if export_format == ExportFormat.NDJSON:
+                    yield b"".join(dumps(row) + b"\n" for row in batch)
+                    continue
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                if not header_sent:
+                    writer.writerow(query_builder.fields)
+                    header_sent = True
+                writer.writerows([_csv_value(row[name]) for name in query_builder.fields] for row in batch)
+                yield buffer.getvalue().encode("utf-8")
+            if export_format == ExportFormat.CSV and not header_sent:
+                yield (",".join(query_builder.fields) + "\r\n").encode("utf-8")
+        except Exception as e:
+            # Headers are already sent; all we can do is cut the stream short
+            logger.error("Export of blog posts failed mid-stream: %s", e)
+            raise
+
+@router.get(
+    "/export",
+    dependencies=[Depends(regular_user_access)],
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}}
+)
+async def export_blog_posts(
+    request: Request,
+    pagination: Dict[str, Any] = Depends(get_pagination_params),
+    filters: List[Dict] = Depends(refine_filter_parser),
+    fields: Optional[List[str]] = Depends(get_fields_param),
+    q: Optional[str] = Query(None, description="Full-text search over title and content"),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson or csv")
+):
+    """
+    Stream every blog post matching the list filters as NDJSON or CSV
+
+    Accepts the same filter, sort, search and `_fields` parameters as the
+    list endpoint; pagination parameters are ignored. Rows are read from a
+    server-side cursor in EXPORT_BATCH_SIZE batches and sent as they arrive.
+    """
+    try:
+        query_builder = (QueryBuilder(BlogPost)
+            .select_fields(fields)
+            .apply_filters(filters)
+            .apply_search(q)
+            # Stable default order; searches without _sort keep rank order
+            .apply_sorting(pagination.get("order_by") or (None if q else "id ASC"))
+            .as_mappings())
+    except InvalidQueryError as e:
+        raise api_error(400, str(e))
+
+    media_type = "application/x-ndjson" if export_format == ExportFormat.NDJSON else "text/csv"
+    return StreamingResponse(
+        _export_body(query_builder, export_format, is_pinned_to_primary(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="blog_posts.{export_format.value}"'}
+    )
+
+async def _get_many(ids: List[int], fields: Optional[List[str]], db: AsyncSession):
+    """Shared body of the GET and POST get-many endpoints"""
+    if len(ids) > settings.MAX_MANY_IDS:
+        raise api_error(400, f"At most {settings.MAX_MANY_IDS} ids per request")
+    try:
+        query_builder = QueryBuilder(BlogPost).select_fields(fields)
+        if settings.FAST_SERIALIZATION:
+            query_builder.as_mappings()
+        posts, missing = await query_builder.fetch_many(db, ids)
+    except InvalidQueryError as e:
+        raise api_error(400, str(e))
+
+    headers = {"x-missing-ids": ",".join(str(i) for i in missing)} if missing else {}
+    if query_builder.fields is not None:
+        return FastJSONResponse(content=posts, headers=headers)
+    return JSONResponse(content=jsonable_encoder(posts), headers=headers)
+
+@router.get(
+    "/many",
+    response_model=List[BlogPostResponse],
+    dependencies=[Depends(regular_user_access)]
+)
+async def get_many_blog_posts(
+    ids: List[int] = Query(..., alias="id", description="Repeat for each id: ?id=1&id=2"),
+    fields: Optional[List[str]] = Depends(get_fields_param),
+    db: AsyncSession = Depends(get_read_session)
+):
+    """
+    Fetch several blog posts in one query (Refine getMany)
+
+    Posts come back in the order the ids were requested; ids that do not
+    exist are listed in the X-Missing-Ids header. Supports `_fields`.
+    """
+    return await _get_many(ids, fields, db)
+
+@router.post(
+    "/many",
+    response_model=List[BlogPostResponse],
+    dependencies=[Depends(regular_user_access)]
+)
+async def post_many_blog_posts(
+    body: BlogPostIds,
+    fields: Optional[List[str]] = Depends(get_fields_param),
+    db: AsyncSession = Depends(get_read_session)
+):
+    """Same as GET /many for id lists too long for a query string"""
+    return await _get_many(body.ids, fields, db)
+
+def _check_bulk_size(count: int):
+    if count == 0:
+        raise api_error(400, "No rows given")
+    if count > settings.MAX_BULK_ROWS:
+        raise api_error(413, f"At most {settings.MAX_BULK_ROWS} rows per request")
+
+def _post_dict(post: BlogPost) -> dict:
+    return {column.key: getattr(post, column.key) for column in BlogPost.__table__.columns}
+
+@router.post(
+    "/bulk",
+    status_code=201,
+    dependencies=[Depends(admin_access)]
+)
+async def create_many_blog_posts(
+    rows: List[Dict[str, Any]],
+    db: AsyncSession = Depends(get_write_session)
+):
+    """
+    Create many blog posts with one multi-row INSERT ... RETURNING (Refine createMany)
+
+    Every row is validated first and all problems are reported together,
+    keyed by row index; nothing is written unless every row is valid.
+    """
+    _check_bulk_size(len(rows))
+    values, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            values.append(BlogPostCreate.model_validate(row).model_dump(exclude_unset=True))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.errors(include_url=False, include_input=False)})
+    if errors:
+        raise api_error(422, "Validation Error", errors)
+
+    try:
+        posts = (await db.scalars(insert(BlogPost).returning(BlogPost), values)).all()
+        created = [_post_dict(post) for post in posts]
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Bulk create of %d blog posts failed: %s", len(values), e)
+        raise api_error(409, "Bulk create failed, no rows were written", [str(getattr(e, "orig", e))])
+    return FastJSONResponse(content=created, status_code=201)
+
+@router.patch(
+    "/bulk",
+    dependencies=[Depends(admin_access)]
+)
+async def update_many_blog_posts(
+    body: BlogPostBulkUpdate,
+    db: AsyncSession = Depends(get_write_session)
+):
+    """
+    Apply the same changes to many blog posts with one UPDATE ... WHERE id IN (Refine updateMany)
+
+    Ids that do not exist are listed in X-Missing-Ids.
+    """
+    ids = list(dict.fromkeys(body.ids))
+    _check_bulk_size(len(ids))
+    changes = body.values.model_dump(exclude_unset=True)
+    if not changes:
+        raise api_error(400, "No fields to update")
+
+    try:
+        posts = (await db.scalars(
+            update(BlogPost)
+            .where(BlogPost.id.in_(ids))
+            .values(**changes)
+            .returning(BlogPost),
+            execution_options={"synchronize_session": False}
+        )).all()
+        updated = [_post_dict(post) for post in posts]
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Bulk update of %d blog posts failed: %s", len(ids), e)
+        raise api_error(409, "Bulk update failed, no rows were changed", [str(getattr(e, "orig", e))])
+
+    found = {post["id"] for post in updated}
+    missing = [i for i in ids if i not in found]
+    headers = {"x-missing-ids": ",".join(str(i) for i in missing)} if missing else {}
+    return FastJSONResponse(content=updated, headers=headers)
+
+@router.delete(
+    "/bulk",
+    dependencies=[Depends(admin_access)]
+)
+async def delete_many_blog_posts(
+    ids: List[int] = Query(..., alias="id", description="Repeat for each id: ?id=1&id=2"),
+    db: AsyncSession = Depends(get_write_session)
+):
+    """
+    Delete many blog posts with one DELETE ... RETURNING id (Refine deleteMany)
+
+    Returns the deleted ids; ids that did not exist are listed in X-Missing-Ids.
+    """
+    ids = list(dict.fromkeys(ids))
+    _check_bulk_size(len(ids))
+    try:
+        deleted = (await db.scalars(
+            delete(BlogPost).where(BlogPost.id.in_(ids)).returning(BlogPost.id),
+            execution_options={"synchronize_session": False}
+        )).all()
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Bulk delete of %d blog posts failed: %s", len(ids), e)
+        raise api_error(409, "Bulk delete failed, no rows were deleted", [str(getattr(e, "orig", e))])
+
+    found = set(deleted)
+    missing = [i for i in ids if i not in found]
+    headers = {"x-missing-ids": ",".join(str(i) for i in missing)} if missing else {}
+    return FastJSONResponse(content=[{"id": i} for i in ids if i in found], headers=headers)
 
 @router.get("/test-deps")
 async def test_dependencies(
@@ -82,37 +354,94 @@ async def test_dependencies(
 ):
     return {"admin_check": admin, "user_check": user}
 
-@router.get("/{post_id}", response_model=BlogPostResponse)
+def _post_validators(post_id: int, version) -> dict:
+    return validator_headers(make_etag(BlogPost.__tablename__, post_id, version), version)
+
+async def _coalesced(db: AsyncSession, key: tuple, fetch):
+    """
+    Share one execution of fetch() among concurrent requests for the same post
+
+    fetch() must return a plain dict (or None); ORM entities are never shared,
+    as they belong to the leader's session.
+    """
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return await fetch()
+    result, _ = await detail_flights.do((db.bind, BlogPost.__tablename__) + key, fetch)
+    return result
+
+@router.get("/{post_id}", response_model=BlogPostWithCategory, response_model_exclude_unset=True)
 async def get_blog_post(
     post_id: int,
-    db: AsyncSession = Depends(get_async_session)
+    request: Request,
+    response: Response,
+    embed: List[str] = Depends(get_embed_param),
+    db: AsyncSession = Depends(get_read_session)
 ):
-    result = await db.execute(select(BlogPost).filter(BlogPost.id == post_id))
-    post = result.scalars().first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    return post 
-
-def read_blog_posts(skip: int = 0, limit: int = 10, filters: dict = None):
-    db = next(get_async_session())
-    
-    query = db.query(BlogPost)
-    
-    # Add filter conditions
-    if filters:
-        filter_conditions = []
-        field = getattr(BlogPost, filters["field"], None)
-        
-        if field is not None:
-            if filters["operator"] == "eq":
-                filter_conditions.append(field == filters["value"])
-            elif filters["operator"] == "contains":
-                filter_conditions.append(field.ilike(f"%{filters['value']}%"))
-            # Add more operators as needed
-        
-        if filter_conditions:
-            query = query.filter(and_(*filter_conditions))
-    
-    # Existing pagination
-    print("Received filters:", filters)  # Should show your filter params
-    return query.offset(skip).limit(limit).all() 
\ No newline at end of file
+    """Get one blog post; `_embed=category` includes its category"""
+    try:
+        embedder = QueryBuilder(BlogPost).embed(embed)
+    except InvalidQueryError as e:
+        raise api_error(400, str(e))
+    embedded = tuple(sorted(embed))
+
+    cached = await response_cache.get(BlogPost.__tablename__, request)
+    if cached is not None:
+        return cached_or_not_modified(request, cached)
+
+    # The same version expression resolve_version() uses, read along with the post
+    version_column = QueryBuilder(BlogPost).version_expression().label("version")
+    if not embedded and has_conditional_headers(request):
+        # Revalidation: compare against the row version without loading the post
+        found, version = await (QueryBuilder(BlogPost)
+            .apply_filters([{"field": "id", "operator": "eq", "value": post_id}])
+            .resolve_version(db))
+        if not found:
+            raise HTTPException(status_code=404, detail="Post not found")
+        validators = _post_validators(post_id, version)
+        if is_not_modified(request, validators["ETag"], version):
+            return not_modified(validators)
+
+    if settings.FAST_SERIALIZATION:
+        # Select exactly the response model's columns and encode the row mapping directly
+        columns = [getattr(BlogPost, name) for name in BlogPostResponse.model_fields]
+
+        async def fetch_row():
+            result = await db.execute(select(*columns, version_column).filter(BlogPost.id == post_id))
+            row = result.mappings().first()
+            if row is None:
+                return None
+            content = dict(row)
+            await embedder.load_embedded(db, [content])
+            return content
+
+        row = await _coalesced(db, ("mapping", post_id, embedded), fetch_row)
+        if not row:
+            raise HTTPException(status_code=404, detail="Post not found")
+        content = dict(row)
+        version = content.pop("version")
+        response = FastJSONResponse(content=content, headers={} if embedded else _post_validators(post_id, version))
+    else:
+        # Not coalesced: the entity is bound to this request's session
+        result = await db.execute(
+            select(BlogPost, version_column).filter(BlogPost.id == post_id).options(*embedder.embed_options())
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        post, version = row
+        validators = _post_validators(post_id, version)
+        if not response_cache.enabled and not embedded:
+            response.headers.update(validators)
+            return BlogPostResponse.model_validate(post, from_attributes=True)
+        # Relationships are lazy="raise"; only read the one that was loaded
+        schema = BlogPostWithCategory if "category" in embedded else BlogPostResponse
+        response = JSONResponse(
+            content=jsonable_encoder(schema.model_validate(post, from_attributes=True)),
+            headers={} if embedded else validators
+        )
+
+    if embedded:
+        # The post's version does not cover the embedded rows: validate the rendered body
+        response = with_page_validators(request, response, {})
+    await response_cache.put(BlogPost.__tablename__, request, response)
+    return response
@@ -1,30 +1,43 @@
 from fastapi import Request, HTTPException, Depends, status
 import logging
 from fastapi.security import OAuth2PasswordBearer
+from core.config import settings
+from utils.jwt_auth import AuthUser, TokenError, verify_token
 
 logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 
-# Temporary user validation until auth is implemented
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Temporary development bypass"""
-    if not token:  # Bypass authentication when no token provided
-        class TempUser:
-            role = "admin"
-            email = "dev@example.com"
-        logger.info("Using temporary development user")
-        return TempUser()
-    
-    # Actual token validation would go here
-    raise HTTPException(status.HTTP_401_UNAUTHORIZED)
-
-async def admin_access(user = Depends(get_current_user)):
-    logger.info(f"Admin check for {user.email}")
-    if user.role != "admin":
+# Development bypass user, shared by every token-less request while AUTH_DEV_BYPASS is on
+DEV_USER = AuthUser(id="dev", email="dev@example.com", roles=("admin",))
+
+def _unauthorized(message: str) -> HTTPException:
+    return HTTPException(
+        status.HTTP_401_UNAUTHORIZED,
+        detail={"error": {"message": message, "statusCode": 401}},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> AuthUser:
+    """Verify the bearer token locally (no network or DB round trip)"""
+    if not token:
+        if settings.AUTH_DEV_BYPASS:
+            logger.debug("Using temporary development user")
+            return DEV_USER
+        raise _unauthorized("Not authenticated")
+
+    try:
+        return verify_token(token)
+    except TokenError as e:
+        logger.info("Rejected bearer token: %s", e)
+        raise _unauthorized("Invalid or expired token")
+
+async def admin_access(user: AuthUser = Depends(get_current_user)):
+    logger.info("Admin check for %s", user.email or user.id)
+    if not user.has_role("admin"):
         raise HTTPException(status.HTTP_403_FORBIDDEN)
     return user
 
-async def regular_user_access(user = Depends(get_current_user)):
-    logger.info(f"User access check for {user.email}")
-    return user 
\ No newline at end of file
+async def regular_user_access(user: AuthUser = Depends(get_current_user)):
+    logger.info("User access check for %s", user.email or user.id)
+    return user
@@ -1,23 +1,11 @@
 from fastapi import Query, HTTPException
-from typing import Tuple, Optional
+from typing import Optional, List
 from enum import Enum
+import json
 import logging
-import sys
+from utils.count_strategy import CountStrategy
 
-# Set up logging to output to console
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# Create console handler with a higher debug level
-ch = logging.StreamHandler(sys.stdout)
-ch.setLevel(logging.DEBUG)
-
-# Create formatter
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-ch.setFormatter(formatter)
-
-# Add the handler to the logger
-logger.addHandler(ch)
 
 class SortOrder(str, Enum):
     ASC = "asc"
@@ -29,19 +17,21 @@ def get_pagination_params(
     page: Optional[int] = Query(None, alias="_page", ge=1, description="Page number"),
     limit: Optional[int] = Query(None, alias="_limit", ge=1, le=100, description="Items per page"),
     sort: Optional[str] = Query(None, alias="_sort", description="Sort field(s)"),
-    order: Optional[SortOrder] = Query(None, alias="_order", description="Sort order (asc/desc)")
+    order: Optional[SortOrder] = Query(None, alias="_order", description="Sort order (asc/desc)"),
+    cursor: Optional[str] = Query(None, alias="_cursor", description="Opaque keyset cursor; send empty for the first page")
 ) -> dict:
     """
-    Reusable pagination parameters supporting both index-based and page-based pagination
+    Reusable pagination parameters supporting index-based, page-based and keyset pagination
     
-    Supports two pagination styles:
+    Supports three pagination styles:
     1. start/end: Using _start and _end parameters
     2. page/limit: Using _page and _limit parameters
+    3. cursor: Using _cursor (page size still comes from _limit or _end - _start)
     
     Returns:
-        dict: Contains 'skip', 'limit', and 'order_by' values
+        dict: Contains 'skip', 'limit', 'order_by', 'sort', 'order' and 'cursor' values
     """
-    logger.info(f"Received pagination request - page: {page}, limit: {limit}, sort: {sort}, order: {order}")
+    logger.debug("Received pagination request - page: %s, limit: %s, sort: %s, order: %s", page, limit, sort, order)
     
     # Initialize default values
     skip = 0
@@ -51,7 +41,7 @@ def get_pagination_params(
     if page is not None and limit is not None:
         skip = (page - 1) * limit
         items_limit = limit
-        logger.debug(f"Using page-based pagination: page={page}, limit={limit}")
+        logger.debug("Using page-based pagination: page=%s, limit=%s", page, limit)
     # Handle start/end pagination
     elif start is not None and end is not None:
         if end <= start:
@@ -61,7 +51,7 @@ def get_pagination_params(
             )
         skip = start
         items_limit = end - start
-        logger.debug(f"Using start/end pagination: start={start}, end={end}")
+        logger.debug("Using start/end pagination: start=%s, end=%s", start, end)
 
     # Handle sorting
     order_by = None
@@ -69,15 +59,22 @@ def get_pagination_params(
         # For SQL Alchemy: field_name DESC/ASC
         order_direction = "DESC" if order == SortOrder.DESC else "ASC"
         order_by = f"{sort} {order_direction}"
-        logger.info(f"Sorting parameters - Field: {sort}, Direction: {order_direction}")
-        logger.info(f"Generated order_by clause: {order_by}")
+        logger.debug("Sorting parameters - Field: %s, Direction: %s", sort, order_direction)
+
+    if cursor is not None:
+        # Keyset mode seeks from the cursor position, the offset is ignored
+        skip = 0
+        logger.debug("Using cursor pagination: cursor=%r, limit=%s", cursor, items_limit)
 
     result = {
         "skip": skip,
         "limit": items_limit,
-        "order_by": order_by
+        "order_by": order_by,
+        "sort": sort,
+        "order": order.value if order else None,
+        "cursor": cursor
     }
-    logger.info(f"Final pagination parameters: {result}")
+    logger.info("Final pagination parameters: %s", result)
     return result
 
 def pagination_params(
@@ -86,18 +83,96 @@ def pagination_params(
 ):
     return {"skip": skip, "limit": limit}
 
+def count_strategy_param(default: Optional[CountStrategy] = None):
+    """
+    Build a dependency reading the per-request `_count` strategy
+
+    `default` sets the route-level strategy; None defers to settings.COUNT_STRATEGY.
+    """
+    def get_count_strategy(
+        count: Optional[CountStrategy] = Query(None, alias="_count", description="Total count strategy (exact/cached/estimate/auto)")
+    ) -> Optional[CountStrategy]:
+        return count or default
+    return get_count_strategy
+
+def get_fields_param(
+    fields: Optional[str] = Query(None, alias="_fields", description="Comma-separated columns to return (sparse fieldset)")
+) -> Optional[List[str]]:
+    """Parse the `_fields` projection parameter; None means all columns"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    return names or None
+
+def get_embed_param(
+    embed: Optional[str] = Query(None, alias="_embed", description="Comma-separated relations to include in each item, e.g. category")
+) -> List[str]:
+    """Parse the `_embed` parameter; related rows are loaded in one batch per page"""
+    if not embed:
+        return []
+    return [name.strip() for name in embed.split(",") if name.strip()]
+
 from fastapi import Query as FilterQuery
 
+MAX_FILTERS = 50
+MAX_FILTER_DEPTH = 5
+
+def _validate_crud_filters(filters, depth: int = 0) -> int:
+    """Check the shape of a CrudFilters tree and return how many leaf filters it holds"""
+    if depth > MAX_FILTER_DEPTH:
+        raise HTTPException(status_code=400, detail=f"Filters nested deeper than {MAX_FILTER_DEPTH} levels")
+    if not isinstance(filters, list):
+        raise HTTPException(status_code=400, detail="Filters must be a list of CrudFilter objects")
+    count = 0
+    for f in filters:
+        if not isinstance(f, dict) or "operator" not in f:
+            raise HTTPException(status_code=400, detail="Each filter needs an operator")
+        if f["operator"] in ("and", "or"):
+            count += _validate_crud_filters(f.get("value"), depth + 1)
+        elif "field" not in f:
+            raise HTTPException(status_code=400, detail="Each filter needs a field")
+        else:
+            count += 1
+    return count
+
 def refine_filter_parser(
-    filter_field: Optional[str] = Query(None, alias="filter[field]"),
-    filter_operator: Optional[str] = Query(None, alias="filter[operator]"),
-    filter_value: Optional[str] = Query(None, alias="filter[value]")
+    filter_field: List[str] = Query([], alias="filter[field]"),
+    filter_operator: List[str] = Query([], alias="filter[operator]"),
+    filter_value: List[str] = Query([], alias="filter[value]"),
+    filters_json: Optional[str] = Query(
+        None,
+        alias="filters",
+        description="JSON-encoded Refine CrudFilters, including nested and/or groups"
+    )
 ):
-    """Parse Refine-style filter parameters according to official spec"""
-    if filter_field and filter_operator and filter_value:
-        return [{
-            "field": filter_field,
-            "operator": filter_operator,
-            "value": filter_value
-        }]
-    return [] 
\ No newline at end of file
+    """
+    Parse Refine-style filter parameters according to official spec
+
+    Accepts any number of filter[field]/filter[operator]/filter[value]
+    triples (matched up by position) and/or a `filters` JSON array of
+    CrudFilters. Everything at the top level is AND-ed together.
+    """
+    if not (len(filter_field) == len(filter_operator) == len(filter_value)):
+        raise HTTPException(
+            status_code=400,
+            detail="filter[field], filter[operator] and filter[value] must be given the same number of times"
+        )
+    parsed = [
+        {"field": field, "operator": operator, "value": value}
+        for field, operator, value in zip(filter_field, filter_operator, filter_value)
+        if field and operator
+    ]
+
+    if filters_json:
+        try:
+            tree = json.loads(filters_json)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="filters is not valid JSON")
+        if isinstance(tree, dict):
+            tree = [tree]
+        _validate_crud_filters(tree)
+        parsed.extend(tree)
+
+    if _validate_crud_filters(parsed) > MAX_FILTERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FILTERS} filters are allowed")
+    return parsed
@@ -0,0 +1,10 @@
+from typing import List, Optional
+from fastapi import HTTPException
+
+
+def api_error(status_code: int, message: str, errors: Optional[List] = None) -> HTTPException:
+    """HTTPException with the API's error body: {"error": {"message", "statusCode"[, "errors"]}}"""
+    error = {"message": message, "statusCode": status_code}
+    if errors:
+        error["errors"] = errors
+    return HTTPException(status_code=status_code, detail={"error": error})
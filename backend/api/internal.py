@@ -0,0 +1,74 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from .dependencies.access_control import admin_access
+from utils.response_cache import response_cache
+from database.core import get_engine, pool_dimensions
+from database.pool import pool_stats
+from database.routing import db_router
+from database.slow_queries import slow_query_recorder
+from database.models import Base
+from utils.index_advisor import index_advisor, render_migration
+from utils.admission import admission_controller
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(admin_access)]
+)
+
+@router.get("/cache")
+async def cache_stats():
+    """Response cache hit/miss/eviction/invalidation counters"""
+    return response_cache.describe()
+
+@router.get("/pool")
+async def connection_pool_stats():
+    """Live connection pool usage (checked out, overflow) and checkout wait times"""
+    pool_size, max_overflow = pool_dimensions()
+    return {
+        "configured": {"pool_size": pool_size, "max_overflow": max_overflow},
+        **pool_stats(get_engine()),
+    }
+
+@router.get("/admission")
+async def admission_status():
+    """Admission control limits, admitted requests per route and queued requests per class"""
+    return admission_controller.describe()
+
+@router.get("/replicas")
+async def replica_status():
+    """Read replica health, replication lag and in-flight reads as last probed"""
+    return db_router.describe()
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|avg_ms|count)$")
+):
+    """Worst statement shapes over SLOW_QUERY_THRESHOLD_MS, with sampled EXPLAIN plans"""
+    return slow_query_recorder.worst(limit, order_by)
+
+@router.delete("/slow-queries", status_code=204)
+async def reset_slow_queries():
+    """Start aggregating slow query shapes afresh"""
+    slow_query_recorder.reset()
+
+@router.get("/index-advice")
+async def index_advice(min_hits: int = Query(1, ge=1)):
+    """
+    Observed list filter/sort shapes, whether an index serves each, and suggested indexes
+
+    Hits count the sampled executions (INDEX_ADVISOR_SAMPLE_RATE), not every request.
+    """
+    return index_advisor.report(Base.metadata.tables, min_hits)
+
+@router.get("/index-advice/migration", response_class=PlainTextResponse)
+async def index_advice_migration(
+    revision: str = Query(..., description="Revision id for the new migration"),
+    down_revision: Optional[str] = Query(None, description="Current head revision"),
+    min_hits: int = Query(10, ge=1)
+):
+    """Alembic migration creating the suggested indexes; save under migrations/versions/"""
+    suggestions = index_advisor.suggestions(Base.metadata.tables, min_hits)
+    return PlainTextResponse(render_migration(suggestions, revision, down_revision))
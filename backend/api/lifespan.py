@@ -0,0 +1,171 @@
+"""
+Application lifespan: background warmup, readiness and shutdown
+
+Startup returns immediately so liveness probes pass; warmup then runs in the
+background and /ready answers 503 until it has:
+  1. built the (lazy) engine,
+  2. opened WARMUP_CONNECTIONS pool connections at once,
+  3. run the hot list/detail statements on each of them, filling SQLAlchemy's
+     compiled cache and every connection's asyncpg prepared statements.
+A failed warmup (database not up yet) is retried with backoff.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from database.core import get_engine, dispose_engines, pool_dimensions
+from database.models import BlogPost
+from database.routing import db_router
+from utils.count_strategy import CountStrategy
+from utils.query_builder import QueryBuilder, ExecutionMode
+from .resources import resources
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(include_in_schema=False)
+
+
+class StartupState:
+    """Readiness flag plus the timings of each startup phase (seconds)"""
+
+    def __init__(self):
+        self.ready = False
+        self.timings: Dict[str, float] = {}
+        self.attempts = 0
+        self.error: Optional[str] = None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+
+startup_state = StartupState()
+
+
+def _hot_queries() -> List:
+    """Builders for the statements nearly every request runs, one set per model"""
+    builders = [
+        # Default Refine table page: offset page, exact count, version for the ETag
+        lambda: (QueryBuilder(BlogPost).apply_sorting("id ASC").apply_pagination(0, 10)
+                 .use_count_strategy(CountStrategy.EXACT)),
+        lambda: (QueryBuilder(BlogPost).as_mappings().apply_sorting("id ASC").apply_pagination(0, 10)
+                 .use_count_strategy(CountStrategy.EXACT)),
+    ]
+    for plan in resources.values():
+        builders.append(lambda plan=plan: (plan.query_builder(None).apply_sorting(f"{plan.metadata.primary_key} ASC")
+                                           .apply_pagination(0, 10).use_count_strategy(CountStrategy.EXACT)))
+    return builders
+
+
+async def _prime(session: AsyncSession) -> None:
+    for build in _hot_queries():
+        # The session is bound to one connection: count and page must not
+        # run at the same time on it (LIST_EXECUTION_MODE=concurrent)
+        query_builder = build().without_index_advice().use_execution_mode(ExecutionMode.SEQUENTIAL)
+        await query_builder.resolve_version(session)
+        await query_builder.execute(session)
+    for plan in resources.values():
+        await session.execute(plan.detail_statement, {"id": plan.convert_id("0")})
+    await session.rollback()
+
+
+async def warmup(state: StartupState = startup_state) -> None:
+    started = time.perf_counter()
+    engine = get_engine()
+    state.timings["engine"] = time.perf_counter() - started
+
+    pool_size, _ = pool_dimensions()
+    count = max(1, min(settings.WARMUP_CONNECTIONS, pool_size))
+    opened = asyncio.Event()
+    connected = 0
+    release = asyncio.Event()
+    phase_started = time.perf_counter()
+
+    async def hold_and_prime():
+        nonlocal connected
+        async with engine.connect() as conn:
+            connected += 1
+            if connected == count:
+                opened.set()
+            # Keep every connection checked out until all are open, so the
+            # pool really grows to `count` instead of reusing one
+            await opened.wait()
+            async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                await _prime(session)
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold_and_prime()) for _ in range(count)]
+    try:
+        await asyncio.wait_for(opened.wait(), settings.WARMUP_TIMEOUT)
+        state.timings["connections"] = time.perf_counter() - phase_started
+        phase_started = time.perf_counter()
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*tasks), settings.WARMUP_TIMEOUT)
+        state.timings["prime"] = time.perf_counter() - phase_started
+    finally:
+        release.set()
+        opened.set()
+        for task in tasks:
+            task.cancel()
+
+    if db_router.replica_urls:
+        phase_started = time.perf_counter()
+        await db_router.choose_replica()
+        state.timings["replicas"] = time.perf_counter() - phase_started
+
+
+async def _warmup_until_ready(state: StartupState) -> None:
+    delay = 0.5
+    started = time.perf_counter()
+    while True:
+        state.attempts += 1
+        try:
+            await warmup(state)
+            break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.error = f"{type(e).__name__}: {e}"
+            logger.warning("Warmup attempt %d failed, retrying in %.1fs: %s", state.attempts, delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+    state.error = None
+    state.timings["warmup"] = time.perf_counter() - started
+    state.ready = True
+    logger.info("Warmup finished: %s", state.describe()["timings"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state = startup_state
+    task = None
+    if settings.WARMUP_ENABLED:
+        task = asyncio.create_task(_warmup_until_ready(state))
+    else:
+        state.ready = True
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await db_router.dispose()
+        await dispose_engines()
+
+
+@router.get("/ready")
+async def readiness():
+    """200 once warmup has finished, 503 (with startup progress) until then"""
+    body = startup_state.describe()
+    if startup_state.ready:
+        return body
+    return JSONResponse(status_code=503, content=body, headers={"Retry-After": "1"})
@@ -0,0 +1,92 @@
+"""
+List endpoint shared by the blog post router and the generated resource routers
+
+Both answer a list request the same way: the response cache, keyset or
+OFFSET/LIMIT pagination, the version pre-check that lets revalidation end in
+a 304 before the page is fetched, the count and cursor headers, and the
+page-hash ETag when the version does not cover the result.
+"""
+from typing import Any, Callable, Dict
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.conditional import (
+    make_etag, validator_headers, is_not_modified, has_conditional_headers, not_modified,
+    with_page_validators
+)
+from utils.query_builder import QueryBuilder, InvalidQueryError
+from utils.response_cache import response_cache, request_signature
+from utils.serialization import FastJSONResponse
+from .errors import api_error
+
+
+def cached_or_not_modified(request: Request, cached: Response) -> Response:
+    """The cached response, or a 304 carrying its validators when the client's copy is current"""
+    if is_not_modified(request, cached.headers.get("etag"), cached.headers.get("last-modified")):
+        return not_modified({k: v for k, v in cached.headers.items() if k in ("etag", "last-modified")})
+    return cached
+
+
+def paginate(query_builder: QueryBuilder, pagination: Dict[str, Any]) -> QueryBuilder:
+    """Keyset pagination when a cursor is supplied, OFFSET/LIMIT otherwise"""
+    if pagination.get("cursor") is not None:
+        return query_builder.apply_keyset_pagination(
+            pagination["cursor"], pagination.get("sort"), pagination.get("order"), pagination["limit"]
+        )
+    return (query_builder
+        .apply_sorting(pagination.get("order_by"))
+        .apply_pagination(pagination["skip"], pagination["limit"]))
+
+
+async def list_page(
+    request: Request,
+    db: AsyncSession,
+    table: str,
+    build: Callable[[], QueryBuilder],
+    pagination: Dict[str, Any]
+) -> Response:
+    """
+    Answer a list request for table with the query build() configures
+
+    build() applies fields, filters, search and count strategy; pagination is
+    added here. Invalid queries are answered with 400.
+    """
+    cached = await response_cache.get(table, request)
+    if cached is not None:
+        return cached_or_not_modified(request, cached)
+
+    try:
+        query_builder = paginate(build(), pagination)
+
+        # Revalidation compares (exact count, newest version) first, so an
+        # unchanged list is answered with 304 before the page is fetched;
+        # plain requests, and pages with related rows the version does not
+        # cover, skip that query and get the page's hash as ETag
+        validators = {}
+        if query_builder.version_covers_result and has_conditional_headers(request):
+            total, last_modified = await query_builder.resolve_version(db)
+            validators = validator_headers(
+                make_etag(request_signature(request), total, last_modified), last_modified
+            )
+            if is_not_modified(request, validators["ETag"], last_modified):
+                return not_modified(validators)
+
+        items, total = await query_builder.execute(db)
+    except InvalidQueryError as e:
+        raise api_error(400, str(e))
+
+    headers = {"x-total-count": str(total)}
+    if query_builder.next_cursor:
+        headers["x-next-cursor"] = query_builder.next_cursor
+    if query_builder.prev_cursor:
+        headers["x-prev-cursor"] = query_builder.prev_cursor
+
+    if query_builder.fields is not None:
+        # Rows are already plain dicts, skip jsonable_encoder
+        response = FastJSONResponse(content=items, headers=headers)
+    else:
+        response = JSONResponse(content=jsonable_encoder(items), headers=headers)
+    response = with_page_validators(request, response, validators)
+    await response_cache.put(table, request, response)
+    return response
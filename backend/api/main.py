@@ -1,25 +1,83 @@
+import time
+_import_started = time.perf_counter()
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+import logging
 # Use explicit relative import within the package
 from .blog_post_sql import router as blog_post_router
+from .internal import router as internal_router
+from .lifespan import lifespan, startup_state, router as readiness_router
+from .resources import register_resource
+from database.models import Category
+from .middleware import (
+    RequestIdMiddleware, MetricsMiddleware, RequestRecorderMiddleware, AdmissionControlMiddleware,
+    ReadAfterWriteMiddleware
+)
+from core.config import settings
+from database.core import get_engine
+from database.pool import pool_stats
+from utils.metrics import registry
+from utils.admission import admission_controller
+
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(blog_post_router)
+app.include_router(internal_router)
+app.include_router(readiness_router)
+# Generic read endpoints for the remaining models
+category_router = register_resource(Category)
+app.include_router(category_router)
 
+if settings.ADMISSION_ENABLED:
+    # Inside CORS, so browsers can read the 503 and its Retry-After
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=[*blog_post_router.routes, *category_router.routes],
+        controller=admission_controller,
+    )
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
-    expose_headers=["x-total-count"]  # 👈 Add this line
+    expose_headers=["x-total-count", "x-next-cursor", "x-prev-cursor", "etag", "last-modified", "x-missing-ids", "x-request-id", "retry-after"]
 )
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if settings.REQUEST_LOG_PATH:
+    app.add_middleware(RequestRecorderMiddleware, path=settings.REQUEST_LOG_PATH)
+# Keeps a client that just wrote on the primary until replicas catch up
+app.add_middleware(ReadAfterWriteMiddleware)
+# Added last, so it is the outermost middleware and every log line of the
+# request (including CORS and the other middlewares) carries the id
+app.add_middleware(RequestIdMiddleware)
+
+# Module import cost (routers, models, settings); reported by /ready
+startup_state.timings["import"] = time.perf_counter() - _import_started
+
+@registry.collector
+def _pool_metrics():
+    stats = pool_stats(get_engine())
+    for name, metric, kind in (("checkedout", "db_pool_checked_out", "gauge"),
+                               ("overflow", "db_pool_overflow", "gauge"),
+                               ("checkouts", "db_pool_checkouts_total", "counter"),
+                               ("total_wait_seconds", "db_pool_checkout_wait_seconds_total", "counter")):
+        if name in stats:
+            yield f"# TYPE {metric} {kind}"
+            yield f"{metric} {stats[name]}"
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request, DB and pool metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
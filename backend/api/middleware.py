@@ -0,0 +1,240 @@
+from typing import Optional
+import json
+import re
+import time
+import uuid
+from starlette.routing import Match
+from core.config import settings
+from core.log_config import request_id_var, queued_file_logger
+from database.instrumentation import QueryStats, current_query_stats
+from database.routing import pin_cookie_header
+from utils.admission import AdmissionController, Saturated
+from utils.metrics import (
+    http_requests_total, http_request_duration, http_requests_in_flight,
+    db_queries_total, db_request_duration
+)
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Accept caller-supplied ids only if they look like ids, not arbitrary text
+_VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware tagging each request with an id for log correlation
+
+    Reuses a well-formed incoming X-Request-ID (e.g. from a proxy), otherwise
+    generates one, and echoes it on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER and _VALID_REQUEST_ID.match(value):
+                request_id = value
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex.encode()
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(REQUEST_ID_HEADER, request_id)]
+            await send(message)
+
+        token = request_id_var.set(request_id.decode())
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Pure ASGI middleware keeping a client that just wrote on the primary
+
+    get_write_session() records a committed write in the request state; the
+    response to such a request gets the pin cookie, so the client's reads
+    skip replicas until they have caught up (see database/routing.py).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Shared with request.state of the endpoint, even if the scope is copied
+        state = scope.setdefault("state", {})
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start":
+                cookie = pin_cookie_header(state)
+                if cookie is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency, status codes, in-flight
+    requests and the SQL count/time each request spent
+
+    With METRICS_SERVER_TIMING enabled the response also carries a
+    Server-Timing header (app and db durations) for browser dev tools.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        stats = QueryStats(scope=scope)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.METRICS_SERVER_TIMING:
+                    app_ms = (time.perf_counter() - started) * 1000
+                    value = f'app;dur={app_ms:.1f}, db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            http_requests_in_flight.dec(method)
+            # The route template, never the raw path, to keep label cardinality bounded
+            route = stats.route
+            http_request_duration.observe(time.perf_counter() - started, method, route)
+            http_requests_total.inc(method, route, str(status_code))
+            if stats.count:
+                db_queries_total.inc(route, amount=stats.count)
+                db_request_duration.observe(stats.seconds, route)
+
+
+class RequestRecorderMiddleware:
+    """
+    Append each request to REQUEST_LOG_PATH as a JSON line in the format
+    benchmarks/replay.py consumes (bodies are not recorded, so only
+    body-less requests replay faithfully)
+    """
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.log = queued_file_logger("request_log", path)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            query = scope.get("query_string", b"").decode("latin-1")
+            self.log.info(json.dumps({
+                "method": scope["method"],
+                "path": scope["path"] + (f"?{query}" if query else ""),
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }))
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware putting requests for the given (database-bound)
+    routes through the admission controller (see utils/admission.py)
+
+    The route is resolved here, before routing (and stored in
+    scope["route"], so shed requests are still attributed to it in metrics),
+    and classified: /many (GET, or POST for long id lists) and GETs ending
+    in a path parameter are detail reads, other GETs are lists, everything
+    else is a write. Requests for
+    other routes (/metrics, /ready, /internal, docs) pass straight through.
+    """
+
+    def __init__(self, app, routes, controller: AdmissionController):
+        self.app = app
+        self.routes = list(routes)
+        self.controller = controller
+
+    def _resolve(self, scope):
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    @staticmethod
+    def classify(method: str, path: str) -> str:
+        if path.endswith("/many") and method in ("GET", "HEAD", "POST"):
+            return "detail"
+        if method not in ("GET", "HEAD"):
+            return "write"
+        if path.endswith("}"):
+            return "detail"
+        return "list"
+
+    async def __call__(self, scope, receive, send):
+        route = self._resolve(scope) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        scope["route"] = route
+        kind = self.classify(scope["method"], route.path)
+        try:
+            await self.controller.acquire(route.path, kind)
+        except Saturated as e:
+            await self._reject(send, e.reason)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route.path, kind)
+
+    async def _reject(self, send, reason: str):
+        body = json.dumps({"error": {
+            "message": "Server is busy, retry shortly", "statusCode": 503, "reason": reason
+        }}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,209 @@
+"""
+Model-driven read resources
+
+register_resource(Model) builds a ResourcePlan once (column metadata, type
+converters and operators via get_model_metadata, the response schema, the
+precompiled detail statement and version expression) and generates a router
+with the tuned list/detail/many endpoints the hand-written blog post router
+uses: filters, sorting, keyset cursors, `_fields`, `_count`, the response
+cache, ETag/304 and Core row mappings encoded straight to JSON bytes.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Type
+import logging
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import BaseModel, create_model
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from database.routing import get_read_session
+from utils.conditional import make_etag, validator_headers, is_not_modified, has_conditional_headers, not_modified
+from utils.count_strategy import CountStrategy
+from utils.model_metadata import ModelMetadata, get_model_metadata
+from utils.query_builder import QueryBuilder, InvalidQueryError
+from utils.response_cache import response_cache
+from utils.serialization import FastJSONResponse
+from utils.single_flight import detail_flights
+from .dependencies.access_control import regular_user_access
+from .dependencies.pagination import (
+    get_pagination_params, refine_filter_parser, count_strategy_param, get_fields_param
+)
+from .errors import api_error
+from .listing import cached_or_not_modified, list_page
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_TYPES = (bool, int, float, Decimal, datetime, date, time, str)
+
+
+def _python_type(column) -> type:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return Any
+    return next((base for base in _SCHEMA_TYPES if issubclass(python_type, base)), Any)
+
+
+def response_schema(model_class) -> Type[BaseModel]:
+    """Pydantic response model mirroring the table's columns (for the OpenAPI docs)"""
+    fields = {}
+    for column in model_class.__table__.columns:
+        python_type = _python_type(column)
+        fields[column.key] = (Optional[python_type], None) if column.nullable else (python_type, ...)
+    return create_model(f"{model_class.__name__}Response", **fields)
+
+
+@dataclass
+class ResourcePlan:
+    """Everything a resource's endpoints need, computed once at registration"""
+    name: str
+    model_class: Any
+    metadata: ModelMetadata
+    table: str
+    columns: List[str]
+    schema: Type[BaseModel]
+    # SELECT <columns>, <version> WHERE pk = :id
+    detail_statement: Any
+    version_statement: Optional[Any]
+    versioned: bool
+    searchable: bool
+
+    @classmethod
+    def build(cls, model_class, name: str) -> "ResourcePlan":
+        metadata = get_model_metadata(model_class)
+        table = model_class.__table__
+        columns = [column.key for column in table.columns]
+        pk = getattr(model_class, metadata.primary_key)
+        version = QueryBuilder(model_class).version_expression()
+        selected = [getattr(model_class, column) for column in columns]
+        if version is not None:
+            selected.append(version.label("version"))
+        return cls(
+            name=name,
+            model_class=model_class,
+            metadata=metadata,
+            table=table.name,
+            columns=columns,
+            schema=response_schema(model_class),
+            detail_statement=select(*selected).where(pk == bindparam("id")),
+            version_statement=(
+                select(version.label("version")).where(pk == bindparam("id")) if version is not None else None
+            ),
+            versioned=version is not None,
+            searchable=bool(metadata.search_vector or metadata.search_columns),
+        )
+
+    def query_builder(self, fields: Optional[List[str]]) -> QueryBuilder:
+        return QueryBuilder(self.model_class).select_fields(fields).as_mappings()
+
+    def convert_id(self, raw: Any) -> Any:
+        try:
+            return self.metadata.convert(self.metadata.primary_key, raw)
+        except (ValueError, TypeError) as e:
+            raise api_error(400, f"Invalid id: {raw!r}") from e
+
+
+def build_router(plan: ResourcePlan, dependencies: List = None) -> APIRouter:
+    """List, many and detail endpoints for one resource plan"""
+    router = APIRouter(
+        prefix=f"/{plan.name}",
+        tags=[plan.model_class.__name__],
+        dependencies=dependencies if dependencies is not None else [Depends(regular_user_access)],
+        responses={404: {"description": "Not found"}}
+    )
+    label = plan.model_class.__name__
+
+    @router.get("/", response_model=List[plan.schema], name=f"list_{plan.name}")
+    async def list_items(
+        request: Request,
+        pagination: Dict[str, Any] = Depends(get_pagination_params),
+        filters: List[Dict] = Depends(refine_filter_parser),
+        count_strategy: CountStrategy = Depends(count_strategy_param(CountStrategy.AUTO)),
+        fields: Optional[List[str]] = Depends(get_fields_param),
+        q: Optional[str] = Query(None, description="Full-text search, if the model declares search columns"),
+        db: AsyncSession = Depends(get_read_session)
+    ):
+        return await list_page(
+            request, db, plan.table,
+            lambda: (plan.query_builder(fields)
+                .apply_filters(filters)
+                .apply_search(q if plan.searchable else None)
+                .use_count_strategy(count_strategy)),
+            pagination
+        )
+
+    @router.get("/many", response_model=List[plan.schema], name=f"get_many_{plan.name}")
+    async def get_many(
+        ids: List[str] = Query(..., alias="id", description="Repeat for each id: ?id=1&id=2"),
+        fields: Optional[List[str]] = Depends(get_fields_param),
+        db: AsyncSession = Depends(get_read_session)
+    ):
+        """Rows in the requested id order; unknown ids are listed in X-Missing-Ids"""
+        if len(ids) > settings.MAX_MANY_IDS:
+            raise api_error(400, f"At most {settings.MAX_MANY_IDS} ids per request")
+        try:
+            items, missing = await plan.query_builder(fields).fetch_many(db, ids)
+        except InvalidQueryError as e:
+            raise api_error(400, str(e))
+        headers = {"x-missing-ids": ",".join(str(i) for i in missing)} if missing else {}
+        return FastJSONResponse(content=items, headers=headers)
+
+    @router.get("/{item_id}", response_model=plan.schema, name=f"get_{plan.name}")
+    async def get_item(
+        item_id: str,
+        request: Request,
+        db: AsyncSession = Depends(get_read_session)
+    ):
+        cached = await response_cache.get(plan.table, request)
+        if cached is not None:
+            return cached_or_not_modified(request, cached)
+
+        item_id = plan.convert_id(item_id)
+        if plan.versioned and has_conditional_headers(request):
+            # Revalidation: compare against the row version without loading the row
+            version = (await db.execute(plan.version_statement, {"id": item_id})).scalar_one_or_none()
+            validators = validator_headers(make_etag(plan.table, item_id, version), version)
+            if version is not None and is_not_modified(request, validators["ETag"], version):
+                return not_modified(validators)
+
+        async def fetch_row():
+            return (await db.execute(plan.detail_statement, {"id": item_id})).mappings().first()
+
+        if settings.SINGLE_FLIGHT_ENABLED:
+            row, _ = await detail_flights.do((db.bind, plan.table, item_id), fetch_row)
+        else:
+            row = await fetch_row()
+        if row is None:
+            raise api_error(404, f"{label} not found")
+        content = dict(row)
+        headers = {}
+        if plan.versioned:
+            version = content.pop("version")
+            headers = validator_headers(make_etag(plan.table, item_id, version), version)
+        response = FastJSONResponse(content=content, headers=headers)
+        await response_cache.put(plan.table, request, response)
+        return response
+
+    return router
+
+
+# Registered resources by URL name
+resources: Dict[str, ResourcePlan] = {}
+
+
+def register_resource(model_class, name: Optional[str] = None, dependencies: List = None) -> APIRouter:
+    """
+    Precompute the model's plan and return its router (include it in the app)
+
+    name defaults to the table name, matching the resource names the Refine
+    frontend uses (e.g. "categories").
+    """
+    name = name or model_class.__tablename__
+    if name in resources:
+        raise ValueError(f"Resource {name!r} is already registered")
+    plan = ResourcePlan.build(model_class, name)
+    resources[name] = plan
+    logger.debug("Registered resource %s (%d columns)", name, len(plan.columns))
+    return build_router(plan, dependencies)
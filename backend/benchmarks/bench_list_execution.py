@@ -0,0 +1,73 @@
+"""
+Compare list execution modes (sequential / window / concurrent)
+
+Seeds a scratch database at each size, then times QueryBuilder.execute for
+a first page, a deep page and a filtered page in every ExecutionMode.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_list_execution --database-url postgresql+asyncpg://.../bench
+    python -m benchmarks.bench_list_execution --database-url ... --sizes 10000 1000000 --iterations 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from database.models import BlogPost
+from utils.count_strategy import CountStrategy
+from utils.query_builder import QueryBuilder, ExecutionMode
+from benchmarks.seed import seed
+
+PAGE_SIZE = 20
+
+def scenarios(rows: int):
+    """(name, filters, skip) triples exercised at each table size"""
+    return [
+        ("first page", [], 0),
+        ("deep page", [], max(rows // 2 - PAGE_SIZE, 0)),
+        ("filtered", [{"field": "title", "operator": "contains", "value": "api"}], 0),
+    ]
+
+async def time_mode(engine, mode: ExecutionMode, filters, skip: int, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            await (QueryBuilder(BlogPost)
+                .apply_filters(filters)
+                .apply_sorting("created_at DESC")
+                .apply_pagination(skip, PAGE_SIZE)
+                .use_count_strategy(CountStrategy.EXACT)
+                .use_execution_mode(mode)
+                .execute(db))
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def main(database_url: str, sizes: list, iterations: int):
+    # Concurrent mode needs a second connection per request
+    engine = create_async_engine(database_url, pool_size=4, max_overflow=0)
+    try:
+        for rows in sizes:
+            await seed(engine, rows)
+            print(f"\n== {rows:,} rows ==")
+            print(f"{'scenario':<12} {'mode':<11} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, filters, skip in scenarios(rows):
+                for mode in ExecutionMode:
+                    # Warm the pool and statement caches before measuring
+                    await time_mode(engine, mode, filters, skip, 2)
+                    timings = sorted(await time_mode(engine, mode, filters, skip, iterations))
+                    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                    print(
+                        f"{name:<12} {mode.value:<11} {statistics.mean(timings):>9.2f} "
+                        f"{statistics.median(timings):>9.2f} {p95:>9.2f}"
+                    )
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Async SQLAlchemy URL of a scratch database (it is reseeded)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.sizes, args.iterations))
@@ -0,0 +1,69 @@
+"""
+Per-row cost of the list response path: ORM + jsonable_encoder vs Core mappings + fast encoder
+
+Runs against an in-memory SQLite database so it needs no server.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --page-sizes 10 100 --iterations 2000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from database.models import Base, BlogPost
+from utils.serialization import FastJSONResponse, rows_to_dicts, orjson
+
+def build_session(rows: int) -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(BlogPost), [
+            {"id": i, "title": f"Post {i}", "content": "lorem ipsum " * 80, "created_at": base + timedelta(minutes=i)}
+            for i in range(1, rows + 1)
+        ])
+    return Session(engine)
+
+def orm_path(session: Session, page_size: int) -> bytes:
+    """Baseline: hydrate entities, walk them with jsonable_encoder, re-encode with json"""
+    posts = session.execute(select(BlogPost).limit(page_size)).scalars().all()
+    body = JSONResponse(content=jsonable_encoder(posts)).body
+    # Drop the entities so every iteration pays for hydration again
+    session.expunge_all()
+    return body
+
+def fast_path(session: Session, page_size: int) -> bytes:
+    """Fast path: Core row mappings encoded straight to bytes"""
+    columns = BlogPost.__table__.columns
+    rows = rows_to_dicts(session.execute(select(*columns).limit(page_size)).mappings())
+    return FastJSONResponse(content=rows).body
+
+def per_row_us(fn, session: Session, page_size: int, iterations: int) -> float:
+    for _ in range(min(iterations, 50)):
+        fn(session, page_size)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(session, page_size)
+    return (time.perf_counter() - started) / iterations / page_size * 1_000_000
+
+def main(page_sizes: list, iterations: int):
+    session = build_session(max(page_sizes))
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"fast path encoder: {encoder}")
+    print(f"{'page size':>9} {'orm us/row':>11} {'fast us/row':>12} {'speed-up':>9}")
+    for page_size in page_sizes:
+        assert len(orm_path(session, page_size)) > 0
+        orm = per_row_us(orm_path, session, page_size, iterations)
+        fast = per_row_us(fast_path, session, page_size, iterations)
+        print(f"{page_size:>9} {orm:>11.2f} {fast:>12.2f} {orm / fast:>8.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    main(args.page_sizes, args.iterations)
@@ -0,0 +1,173 @@
+"""
+Replay a recorded request log and report throughput and latency percentiles per endpoint
+
+The log is JSON lines, one request each:
+    {"method": "GET", "path": "/blog-post-sql/?_start=0&_end=10", "headers": {...}, "body": {...}}
+(headers/body optional). REQUEST_LOG_PATH makes the API record its own
+traffic in this format; benchmarks/traffic/ holds a representative sample.
+
+Requests go to api.main:app in-process over httpx's ASGI transport (using
+the app's configured database) or, with --base-url, to a running server.
+
+Results can be saved with --output and compared against a stored baseline
+with --baseline: the run fails (exit 1) when any endpoint's p95 rises, or
+its throughput drops, by more than --tolerance.
+
+Usage (from the backend directory):
+    python -m benchmarks.replay benchmarks/traffic/refine_blog_posts.jsonl --requests 2000
+    python -m benchmarks.replay traffic.jsonl --base-url http://localhost:8000 --concurrency 32
+    python -m benchmarks.replay traffic.jsonl --output baseline.json
+    python -m benchmarks.replay traffic.jsonl --baseline baseline.json --tolerance 0.1
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+
+# Path segments that are ids collapse into one endpoint
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+def load_requests(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    if not entries:
+        raise SystemExit(f"No requests in {path}")
+    return entries
+
+def endpoint_of(entry: dict) -> str:
+    """Grouping key: explicit "endpoint" or METHOD plus the path with ids templated"""
+    if entry.get("endpoint"):
+        return entry["endpoint"]
+    return f"{entry.get('method', 'GET').upper()} {_ID_SEGMENT.sub('/{id}', urlsplit(entry['path']).path)}"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+def build_client(base_url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0)
+    from api.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=30.0)
+
+async def replay(entries: List[dict], total: int, concurrency: int, base_url: Optional[str], warmup: int) -> dict:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    schedule = itertools.cycle(entries)
+    lock = asyncio.Lock()
+    remaining = total
+
+    async with build_client(base_url, concurrency) as client:
+        for entry in entries[:warmup]:
+            await client.request(entry.get("method", "GET"), entry["path"], headers=entry.get("headers"), json=entry.get("body"))
+
+        async def worker():
+            nonlocal remaining
+            while True:
+                async with lock:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                    entry = next(schedule)
+                endpoint = endpoint_of(entry)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        entry.get("method", "GET"), entry["path"],
+                        headers=entry.get("headers"), json=entry.get("body")
+                    )
+                    failed = response.status_code >= 500
+                except httpx.HTTPError:
+                    failed = True
+                timings[endpoint].append((time.perf_counter() - started) * 1000)
+                if failed:
+                    errors[endpoint] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, values in sorted(timings.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": errors[endpoint],
+            # Share of the run's wall time, so endpoints add up to the overall rate
+            "rps": len(values) / elapsed,
+            "mean_ms": statistics.fmean(values),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+        }
+    return {
+        "target": base_url or "in-process",
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed_s": elapsed,
+        "rps": total / elapsed,
+        "endpoints": endpoints,
+    }
+
+def print_report(results: dict) -> None:
+    print(f"{results['requests']} requests against {results['target']} "
+          f"(concurrency {results['concurrency']}): {results['rps']:,.0f} req/s")
+    print(f"{'endpoint':<40} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, stats in results["endpoints"].items():
+        print(f"{endpoint:<40} {stats['requests']:>6} {stats['errors']:>4} {stats['rps']:>8.0f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond tolerance, as human-readable lines"""
+    regressions = []
+    for endpoint, stats in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+        if stats["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: throughput {before['rps']:.0f} -> {stats['rps']:.0f} req/s")
+        if stats["errors"] > before.get("errors", 0):
+            regressions.append(f"{endpoint}: errors {before.get('errors', 0)} -> {stats['errors']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="JSON lines request log")
+    parser.add_argument("--base-url", help="Replay against a running server instead of in-process")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests (the log is cycled)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests from the head of the log")
+    parser.add_argument("--output", help="Write results as JSON (e.g. to store a baseline)")
+    parser.add_argument("--baseline", help="Compare with a stored results file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(load_requests(args.log), args.requests, args.concurrency, args.base_url, args.warmup))
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Seed a benchmark database with synthetic blog posts
+
+Usage (from the backend directory):
+    python -m benchmarks.seed --database-url postgresql+asyncpg://.../bench --rows 1000000
+    python -m benchmarks.seed --database-url postgresql+asyncpg://.../bench --size 10m
+
+The target table is emptied first, so never point this at a real database.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from database.models import Base, BlogPost
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua api database index"
+).split()
+
+# Standard dataset sizes, so results from different runs are comparable
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+POSTGRES_SEED_SQL = """
+INSERT INTO blog_posts (id, title, content, created_at)
+SELECT g,
+       'Post ' || g || ' ' || (ARRAY['api','index','query','cache','async'])[1 + g % 5],
+       repeat('lorem ipsum dolor sit amet ', 20 + g % 40),
+       TIMESTAMPTZ '2024-01-01' + (g % 525600) * INTERVAL '1 minute'
+FROM generate_series(:first, :last) AS g
+"""
+
+async def seed(engine: AsyncEngine, rows: int, batch_size: int = 10_000) -> float:
+    """Recreate the schema and insert `rows` synthetic posts; returns elapsed seconds"""
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for first in range(1, rows + 1, batch_size):
+        last = min(first + batch_size - 1, rows)
+        async with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                # Let the server generate rows instead of shipping them over the wire
+                await conn.execute(text(POSTGRES_SEED_SQL), {"first": first, "last": last})
+            else:
+                await conn.execute(insert(BlogPost), [
+                    {
+                        "id": i,
+                        "title": f"Post {i} {rng.choice(WORDS)}",
+                        "content": " ".join(rng.choices(WORDS, k=60)),
+                        "created_at": base + timedelta(minutes=i % 525600),
+                    }
+                    for i in range(first, last + 1)
+                ])
+
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE blog_posts"))
+    return time.perf_counter() - started
+
+async def main(database_url: str, rows: int, batch_size: int):
+    engine = create_async_engine(database_url)
+    try:
+        elapsed = await seed(engine, rows, batch_size)
+        print(f"Seeded {rows} blog posts in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Async SQLAlchemy URL of a scratch database")
+    rows = parser.add_mutually_exclusive_group()
+    rows.add_argument("--rows", type=int, default=10_000)
+    rows.add_argument("--size", choices=SIZES, help="Standard dataset size (overrides --rows)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, SIZES[args.size] if args.size else args.rows, args.batch_size))
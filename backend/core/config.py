@@ -1,19 +1,137 @@
-import logging
+from typing import Dict, List, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
+from .log_config import configure_logging
 
 class Settings(BaseSettings):
     SYNC_DATABASE_URL: str
     ASYNC_DATABASE_URL: str
-    ENVIRONMENT: str = "development"
+    ENVIRONMENT: str = "production"
     LOG_LEVEL: str = "INFO"
+    # Logging (see core/log_config.py): text | json
+    LOG_FORMAT: str = "text"
+    # Per-logger level overrides, e.g. {"sqlalchemy.engine": "WARNING"}
+    LOG_LEVELS: Dict[str, str] = {}
+    # Fraction of INFO/DEBUG records kept per logger prefix (per-request chatter)
+    LOG_SAMPLE_RATES: Dict[str, float] = {"api.dependencies": 0.01}
+    LOG_QUEUE_SIZE: int = 10_000
+
+    # Prometheus /metrics and per-request DB timing; Server-Timing header is opt-in
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = False
+    # Record every request as JSON lines for benchmarks/replay.py (off when unset)
+    REQUEST_LOG_PATH: Optional[str] = None
+    # Statements at or above this are logged and aggregated by shape (/internal/slow-queries)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    # Fraction of slow PostgreSQL reads re-run as EXPLAIN (ANALYZE, BUFFERS) in the background
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_MAX_SHAPES: int = 200
+
+    # Opt-in: reject sorts/filters on columns no index can serve (400). Off, they
+    # are allowed and the index advisor still records their shapes
+    QUERY_WHITELIST_ENFORCED: bool = False
+    # Fraction of executed list queries whose shape the index advisor records
+    # (0 disables it); /internal/index-advice hit counts are sampled accordingly
+    INDEX_ADVISOR_SAMPLE_RATE: float = 0.1
+
+    # Connection pool. Each worker process gets DB_CONNECTION_BUDGET / WEB_CONCURRENCY
+    # connections (pool + overflow) unless DB_POOL_SIZE/DB_MAX_OVERFLOW are set
+    WEB_CONCURRENCY: int = 1
+    DB_CONNECTION_BUDGET: int = 30
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg per-connection prepared statement cache (0 disables, e.g. behind pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_COMMAND_TIMEOUT: Optional[float] = 30.0
+    # Startup warmup (api/lifespan.py): /ready returns 503 until it finishes
+    WARMUP_ENABLED: bool = True
+    # Pool connections opened and primed with the hot statements (capped at the pool size)
+    WARMUP_CONNECTIONS: int = 4
+    WARMUP_TIMEOUT: float = 30.0
+
+    # Admission control (utils/admission.py): requests beyond the pool's capacity
+    # queue briefly by priority, then get 503 + Retry-After
+    ADMISSION_ENABLED: bool = True
+    # Concurrent requests per worker; defaults to pool size + overflow
+    ADMISSION_MAX_CONCURRENCY: Optional[int] = None
+    # Share of those slots one list/write route may hold (detail reads may use all)
+    ADMISSION_LIST_SHARE: float = 0.5
+    # Per-route overrides by route template, e.g. {"/blog-post-sql/export": 2}
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {}
+    ADMISSION_QUEUE_SIZE: int = 100
+    # Keep well below DB_POOL_TIMEOUT so saturation fails fast
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # Bearer token verification (local, see utils/jwt_auth.py)
+    JWT_ALGORITHMS: List[str] = ["HS256", "RS256"]
+    # HMAC secret, published under kid "default"
+    JWT_SECRET: Optional[str] = None
+    # Extra keys by kid: HMAC secrets or PEM public keys (rotation)
+    JWT_KEYS: Dict[str, str] = {}
+    JWT_JWKS_FILE: Optional[str] = None
+    JWT_ISSUER: Optional[str] = None
+    JWT_AUDIENCE: Optional[str] = None
+    JWT_LEEWAY: int = 30
+    JWT_ROLE_CLAIM: str = "roles"
+    # Verified tokens are reused until exp, but never for longer than TOKEN_CACHE_TTL
+    TOKEN_CACHE_SIZE: int = 10_000
+    TOKEN_CACHE_TTL: float = 300.0
+    # Requests without a token act as an admin dev user. Unset, it is on only
+    # when ENVIRONMENT is "development"
+    AUTH_DEV_BYPASS: Optional[bool] = None
+
+    # Read replicas (JSON list of async URLs). Empty keeps every read on the primary
+    READ_REPLICA_URLS: List[str] = []
+    # round_robin | least_busy
+    REPLICA_SELECTION: str = "round_robin"
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_INTERVAL: float = 5.0
+    # A replica that does not answer its health probe within this is marked down
+    REPLICA_PROBE_TIMEOUT: float = 1.0
+    # After a write the client's reads stay on the primary for this long
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+
+    # x-total-count strategy (exact | cached | estimate | auto)
+    COUNT_STRATEGY: str = "exact"
+    COUNT_CACHE_TTL: float = 30.0
+    COUNT_CACHE_SIZE: int = 1024
+    # AUTO switches to planner estimates at or above this many rows
+    COUNT_ESTIMATE_THRESHOLD: int = 100_000
+    # How list count + page queries run (sequential | window | concurrent)
+    LIST_EXECUTION_MODE: str = "sequential"
+    # Read Core row mappings and encode with orjson instead of ORM + jsonable_encoder
+    FAST_SERIALIZATION: bool = False
+    # Identical concurrent list/detail queries share one execution (utils/single_flight.py)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    # Rows fetched per server-side cursor round trip by export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+    # Most ids accepted by one get-many request
+    MAX_MANY_IDS: int = 1000
+    # Most rows accepted by one bulk create/update/delete request
+    MAX_BULK_ROWS: int = 1000
+
+    # Rendered list/detail responses (none | memory | redis). memory is per process
+    # and only allowed with WEB_CONCURRENCY=1; several workers need redis
+    RESPONSE_CACHE_BACKEND: str = "none"
+    RESPONSE_CACHE_TTL: float = 10.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_URL: Optional[str] = None
     
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def _resolve_dev_bypass(self) -> "Settings":
+        if self.AUTH_DEV_BYPASS is None:
+            self.AUTH_DEV_BYPASS = self.ENVIRONMENT == "development"
+        return self
+
 settings = Settings()
 
-# Configure root logger
-logging.basicConfig(
-    level=settings.LOG_LEVEL,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure root logger (queued, optionally JSON and sampled)
+configure_logging(settings)
@@ -2,8 +2,13 @@
 
 # Add explicit exports
 from .core import get_async_session, AsyncSessionLocal
-from .models import BlogPost, Base
+from .routing import get_read_session, get_write_session
+from .models import BlogPost, Category, Base
+# Session hooks that announce committed table writes (cache invalidation)
+from . import events
+# Cursor-execute hooks attributing SQL time to the current request (metrics)
+from . import instrumentation
 
 # Alias for common usage
 get_db_connection = get_async_session
-__all__ = ["get_db_connection", "get_async_session", "BlogPost", "Base"] 
\ No newline at end of file
+__all__ = ["get_db_connection", "get_async_session", "get_read_session", "get_write_session", "BlogPost", "Category", "Base"] 
\ No newline at end of file
@@ -1,10 +1,5 @@
-from sqlalchemy.ext.asyncio import create_async_engine
-from core.config import settings
+from .core import create_async_engine_from_settings
 
 def create_async_engine_wrapper():
-    return create_async_engine(
-        settings.ASYNC_DATABASE_URL,
-        pool_size=20,
-        max_overflow=10,
-        pool_pre_ping=True
-    ) 
\ No newline at end of file
+    """Standalone engine for scripts, built by the same factory as the app's engine"""
+    return create_async_engine_from_settings()
@@ -1,35 +1,114 @@
-import os
-from dotenv import load_dotenv
+import threading
+from typing import Optional, Tuple
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
+from sqlalchemy.orm import sessionmaker
 from core.config import settings
+from .pool import InstrumentedAsyncPool
 
-# Load environment variables once
-load_dotenv()
+def pool_dimensions() -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) for this worker process
 
-# Async engine and session
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    pool_size=20,
-    max_overflow=10
-)
+    Explicit DB_POOL_SIZE/DB_MAX_OVERFLOW win; otherwise the global
+    DB_CONNECTION_BUDGET is split evenly across WEB_CONCURRENCY workers and
+    two thirds of each share are kept open, the rest allowed as overflow.
+    """
+    per_worker = max(1, settings.DB_CONNECTION_BUDGET // max(1, settings.WEB_CONCURRENCY))
+    pool_size = settings.DB_POOL_SIZE if settings.DB_POOL_SIZE is not None else max(1, per_worker * 2 // 3)
+    max_overflow = (
+        settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW is not None
+        else max(0, per_worker - pool_size)
+    )
+    return pool_size, max_overflow
+
+def create_async_engine_from_settings(url: str = None, **overrides) -> AsyncEngine:
+    """Single factory for every async engine in the app, configured from Settings"""
+    url = make_url(url or settings.ASYNC_DATABASE_URL)
+    pool_size, max_overflow = pool_dimensions()
+    options = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        # asyncpg's own statement cache plus SQLAlchemy's prepared statement cache
+        url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": {"application_name": "realjungle-api"},
+        }
+    options.update(overrides)
+    return create_async_engine(url, **options)
+
+# Engines are built on first use (or by the app's lifespan warmup), so
+# importing this module opens nothing and reads no files
+_async_engine: Optional[AsyncEngine] = None
+_sync_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> AsyncEngine:
+    """The application's async engine, created on first call"""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine_from_settings()
+    return _async_engine
+
+def get_sync_engine() -> Engine:
+    """Sync engine for migrations and scripts, created on first call"""
+    global _sync_engine
+    if _sync_engine is None:
+        with _engine_lock:
+            if _sync_engine is None:
+                _sync_engine = create_engine(settings.SYNC_DATABASE_URL)
+    return _sync_engine
+
+async def dispose_engines() -> None:
+    """Close pooled connections (lifespan shutdown); engines are rebuilt on next use"""
+    global _async_engine, _sync_engine
+    engine, _async_engine = _async_engine, None
+    if engine is not None:
+        await engine.dispose()
+    sync_engine, _sync_engine = _sync_engine, None
+    if sync_engine is not None:
+        sync_engine.dispose()
+    AsyncSessionLocal.kw.pop("bind", None)
+
+class LazySessionMaker(sessionmaker):
+    """sessionmaker that binds to get_engine() when the first session is made"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine,
+AsyncSessionLocal = LazySessionMaker(
     class_=AsyncSession,
     expire_on_commit=False
 )
 
-# Sync engine for migrations
-sync_engine = create_engine(settings.SYNC_DATABASE_URL)
+def __getattr__(name: str):
+    # `from database.core import async_engine / sync_engine` keeps working
+    if name == "async_engine":
+        return get_engine()
+    if name == "sync_engine":
+        return get_sync_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Sync connection (Migrations/scripts)
 def get_sync_connection():
     """Sync connection using psycopg2"""
     import psycopg2
-    return psycopg2.connect(os.getenv("SYNC_DATABASE_URL"))
+    return psycopg2.connect(settings.SYNC_DATABASE_URL)
 
 async def get_async_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
@@ -0,0 +1,69 @@
+from itertools import chain
+from typing import Callable, Iterable, List, Set
+import logging
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Callbacks receiving the set of table names written by a committed transaction
+_write_listeners: List[Callable[[Set[str]], None]] = []
+
+_PENDING_KEY = "written_tables"
+
+
+def on_table_write(listener: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """
+    Register a callback invoked after a commit that wrote to one or more tables
+
+    Usable as a decorator. Listeners must be cheap and must not raise; they
+    run synchronously inside the committing session.
+    """
+    _write_listeners.append(listener)
+    return listener
+
+
+def notify_table_write(table_names: Iterable[str]) -> None:
+    """Tell every listener that the given tables changed"""
+    tables = set(table_names)
+    if not tables:
+        return
+    for listener in _write_listeners:
+        try:
+            listener(tables)
+        except Exception:
+            logger.exception("Table write listener failed")
+
+
+def _pending(session: Session) -> Set[str]:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    """Record tables touched by unit-of-work inserts, updates and deletes"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _pending(session).add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml_tables(orm_execute_state):
+    """Record tables targeted by insert()/update()/delete() statements run through a session"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _pending(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session):
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        notify_table_write(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,62 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from core.config import settings
+from .slow_queries import slow_query_recorder
+
+
+@dataclass
+class QueryStats:
+    """SQL statements and time attributed to one request"""
+    count: int = 0
+    seconds: float = 0.0
+    # ASGI scope of the request; routing fills in scope["route"] before any query runs
+    scope: Optional[dict] = None
+
+    @property
+    def route(self) -> str:
+        route = (self.scope or {}).get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+# Set by MetricsMiddleware for the duration of a request; None outside requests
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+_STARTED_KEY = "query_started_at"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Stack, since a connection event may fire while another statement is timed
+    conn.info.setdefault(_STARTED_KEY, []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its entry
+    # so it is not left behind for the next statement to pop
+    conn = exception_context.connection
+    context = exception_context.execution_context
+    if conn is None or context is None:
+        return
+    stack = conn.info.get(_STARTED_KEY)
+    if stack and stack[-1][0] is context:
+        stack.pop()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info[_STARTED_KEY].pop()
+    elapsed = time.perf_counter() - started
+    # SQLAlchemy's async greenlets share the caller's context, so the
+    # request's stats are visible here even though we run on the driver side
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        route = stats.route if stats is not None else "-"
+        slow_query_recorder.record(conn, statement, parameters, elapsed * 1000, route)
@@ -1,14 +1,43 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, DateTime, func
+from sqlalchemy.orm import relationship
 
 # Create the base class for our models
 Base = declarative_base()
 
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, nullable=False, index=True)
+
+    # lazy="raise": related rows are only ever loaded in batches (selectinload)
+    posts = relationship("BlogPost", back_populates="category", lazy="raise")
+
 # Create the blog posts model
 class BlogPost(Base):
     __tablename__ = "blog_posts"
 
+    # Full-text search document (see migration 0001_blog_post_search).
+    # search_vector is a generated tsvector column that only exists on
+    # PostgreSQL, so it is referenced by name rather than mapped.
+    __search_vector__ = "search_vector"
+    __search_columns__ = ("title", "content")
+    __search_language__ = "english"
+    # Sorting/filtering is limited to indexed columns (see utils/model_metadata.py);
+    # title/content substring filters are also served by their trigram indexes
+
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    # info["trigram_indexed"] marks columns with a pg_trgm GIN index
+    title = Column(String, nullable=False, index=True, info={"trigram_indexed": True})
+    content = Column(Text, nullable=True, info={"trigram_indexed": True})
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Row version for ETag/Last-Modified; a trigger also maintains it on
+    # PostgreSQL for writes that bypass the ORM (migration 0002)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+    # Written by scripts/import_data.py (migration 0005)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    status = Column(String, nullable=True, index=True)
+
+    # Filter/sort as "category.<column>" (joined) and embed with ?_embed=category
+    category = relationship("Category", back_populates="posts", lazy="raise") 
\ No newline at end of file
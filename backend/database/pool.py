@@ -0,0 +1,71 @@
+from dataclasses import dataclass, asdict
+import threading
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass
+class PoolWaitStats:
+    """Cumulative checkout timings for one pool"""
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout took
+
+    Checkout time covers waiting for a free connection, opening an overflow
+    connection and the pre-ping, i.e. everything a request spends before it
+    can send its first statement.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+        self._stats_lock = threading.Lock()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except Exception:
+            with self._stats_lock:
+                self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_stats.checkouts += 1
+                self.wait_stats.total_wait_seconds += waited
+                self.wait_stats.max_wait_seconds = max(self.wait_stats.max_wait_seconds, waited)
+
+    def recreate(self):
+        # dispose()/invalidation builds a fresh pool; keep the counters
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def pool_stats(engine) -> dict:
+    """Live pool figures plus cumulative wait statistics for an (async) engine"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if "overflow" in stats:
+        # QueuePool counts from -pool_size (it is really "connections - pool_size");
+        # report only the overflow connections actually open
+        stats["overflow"] = max(stats["overflow"], 0)
+    stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(asdict(wait_stats))
+        stats["avg_wait_seconds"] = (
+            wait_stats.total_wait_seconds / wait_stats.checkouts if wait_stats.checkouts else 0.0
+        )
+    return stats
@@ -0,0 +1,239 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from http.cookies import SimpleCookie
+from itertools import count
+from typing import AsyncIterator, List, Optional
+import asyncio
+import logging
+import time
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from core.config import settings
+from .core import AsyncSessionLocal, create_async_engine_from_settings
+
+logger = logging.getLogger(__name__)
+
+# Cookie carrying the unix time until which the client's reads stay on the primary
+PIN_COOKIE = "db_primary_until"
+
+# Replay lag in seconds; 0 when the replica has applied everything it received
+# (an idle primary would otherwise make pg_last_xact_replay_timestamp look stale)
+PG_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class ReplicaSelection(str, Enum):
+    ROUND_ROBIN = "round_robin"
+    LEAST_BUSY = "least_busy"
+
+
+@dataclass
+class Replica:
+    """One read replica with its engine, session factory and last health probe"""
+    url: str
+    engine: AsyncEngine
+    session_factory: sessionmaker
+    # Not used until a first probe has succeeded
+    healthy: bool = False
+    lag_seconds: float = 0.0
+    checked_at: float = 0.0
+    in_flight: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def describe(self) -> dict:
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "in_flight": self.in_flight,
+            "checked_at": self.checked_at,
+        }
+
+
+class DatabaseRouter:
+    """
+    Routes read sessions to replicas and everything else to the primary
+
+    Replica health (reachability and replication lag) is probed lazily, at
+    most once per REPLICA_HEALTH_INTERVAL per replica; a replica that is
+    down or further behind than REPLICA_MAX_LAG_SECONDS is skipped until the
+    next probe says otherwise. With no usable replica reads use the primary.
+
+    A probe runs on the request that finds the health stale, bounded by
+    REPLICA_PROBE_TIMEOUT; requests arriving meanwhile use the last known
+    health rather than queueing behind it.
+    """
+
+    def __init__(
+        self,
+        primary_factory: sessionmaker,
+        replica_urls: List[str],
+        selection: ReplicaSelection = ReplicaSelection.ROUND_ROBIN,
+        max_lag_seconds: float = 5.0,
+        health_interval: float = 5.0,
+        probe_timeout: float = 1.0,
+    ):
+        self.primary_factory = primary_factory
+        self.selection = ReplicaSelection(selection)
+        self.max_lag_seconds = max_lag_seconds
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+        self.replica_urls = list(replica_urls)
+        self._replicas: Optional[List[Replica]] = None
+        self._next = count()
+
+    @property
+    def replicas(self) -> List[Replica]:
+        # Engines are created on first use, not at import
+        if self._replicas is None:
+            replicas = []
+            for url in self.replica_urls:
+                engine = create_async_engine_from_settings(url)
+                factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+                replicas.append(Replica(url=url, engine=engine, session_factory=factory))
+            self._replicas = replicas
+        return self._replicas
+
+    @staticmethod
+    async def _replication_lag(replica: Replica) -> float:
+        async with replica.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                return float(await conn.scalar(PG_LAG_SQL) or 0)
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+    async def _probe(self, replica: Replica) -> None:
+        if time.monotonic() - replica.checked_at < self.health_interval:
+            return
+        if replica.lock.locked():
+            # Another request is probing it; go with the last known health
+            return
+        async with replica.lock:
+            if time.monotonic() - replica.checked_at < self.health_interval:
+                return
+            try:
+                replica.lag_seconds = await asyncio.wait_for(self._replication_lag(replica), self.probe_timeout)
+                replica.healthy = replica.lag_seconds <= self.max_lag_seconds
+                if not replica.healthy:
+                    logger.warning("Replica %s lagging %.1fs", replica.describe()["url"], replica.lag_seconds)
+            except asyncio.TimeoutError:
+                replica.healthy = False
+                logger.warning("Replica %s did not answer within %.1fs", replica.describe()["url"], self.probe_timeout)
+            except Exception as e:
+                replica.healthy = False
+                logger.warning("Replica %s unreachable: %s", replica.describe()["url"], e)
+            replica.checked_at = time.monotonic()
+
+    async def choose_replica(self) -> Optional[Replica]:
+        """A healthy replica according to the selection policy, or None"""
+        if not self.replicas:
+            return None
+        await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if not candidates:
+            return None
+        if self.selection == ReplicaSelection.LEAST_BUSY:
+            return min(candidates, key=lambda replica: replica.in_flight)
+        return candidates[next(self._next) % len(candidates)]
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        # Force a fresh probe on the next selection instead of waiting out the interval
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    @asynccontextmanager
+    async def read_session(self, pinned: bool = False) -> AsyncIterator[AsyncSession]:
+        """Session on a replica (or the primary when pinned / no replica is usable)"""
+        replica = None if pinned else await self.choose_replica()
+        if replica is None:
+            async with self.primary_factory() as session:
+                yield session
+            return
+        replica.in_flight += 1
+        try:
+            async with replica.session_factory() as session:
+                yield session
+        except DBAPIError as e:
+            if e.connection_invalidated or isinstance(e.orig, OSError):
+                self.mark_unhealthy(replica)
+            raise
+        finally:
+            replica.in_flight -= 1
+
+    def describe(self) -> dict:
+        return {
+            "selection": self.selection.value,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": [replica.describe() for replica in self.replicas],
+        }
+
+    async def dispose(self) -> None:
+        replicas, self._replicas = self._replicas or [], None
+        for replica in replicas:
+            await replica.engine.dispose()
+
+
+db_router = DatabaseRouter(
+    AsyncSessionLocal,
+    settings.READ_REPLICA_URLS,
+    selection=settings.REPLICA_SELECTION,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    health_interval=settings.REPLICA_HEALTH_INTERVAL,
+    probe_timeout=settings.REPLICA_PROBE_TIMEOUT,
+)
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """True while the client is inside its read-after-write window"""
+    try:
+        return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session for read-only routes; may be served by a replica"""
+    async with db_router.read_session(pinned=is_pinned_to_primary(request)) as session:
+        yield session
+
+
+async def get_write_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Primary session for routes that write
+
+    A successful commit marks the request so ReadAfterWriteMiddleware can
+    keep the client's next reads on the primary for READ_AFTER_WRITE_SECONDS,
+    so it never reads from a replica that has not caught up with its write.
+    """
+    async with AsyncSessionLocal() as session:
+        def _mark_written(_session):
+            request.state.db_wrote = True
+        event.listen(session.sync_session, "after_commit", _mark_written)
+        yield session
+
+
+def pin_cookie_header(state: dict) -> Optional[bytes]:
+    """
+    Set-Cookie value pinning the client to the primary, for a request whose
+    state (scope["state"], i.e. request.state) records a committed write;
+    None when nothing was written or there are no replicas
+    """
+    if not (db_router.replica_urls and state.get("db_wrote")):
+        return None
+    pin_seconds = settings.READ_AFTER_WRITE_SECONDS
+    cookie = SimpleCookie()
+    cookie[PIN_COOKIE] = str(time.time() + pin_seconds)
+    cookie[PIN_COOKIE]["max-age"] = max(1, int(pin_seconds))
+    cookie[PIN_COOKIE]["path"] = "/"
+    cookie[PIN_COOKIE]["httponly"] = True
+    cookie[PIN_COOKIE]["samesite"] = "lax"
+    return cookie.output(header="").strip().encode("latin-1")
@@ -0,0 +1,168 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_BIND_LIST = re.compile(r"\(\s*(?:[?]|%s|\$\d+|:\w+|%\(\w+\)s)(?:\s*,\s*(?:[?]|%s|\$\d+|:\w+|%\(\w+\)s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# EXPLAIN ANALYZE runs the statement, so only ever explain reads
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals become ?, bind lists collapse
+    to (...) and whitespace is folded, so `IN (1, 2, 3)` and `IN (4, 5)` or
+    different ILIKE patterns group together
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _BIND_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        inner = {type(item).__name__ for item in value}
+        return f"{type(value).__name__}[{'|'.join(sorted(inner)) or 'empty'}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any) -> str:
+    """Types (never values) of the bound parameters, e.g. `{title_1: str, param_1: int}`"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_value_shape(value)}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_value_shape(value) for value in parameters) + ")"
+    return _value_shape(parameters)
+
+
+@dataclass
+class QueryShape:
+    """Aggregated timings for one normalized statement"""
+    sql: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    routes: Counter = field(default_factory=Counter)
+    parameter_shapes: Counter = field(default_factory=Counter)
+    plan: Optional[Any] = None
+    plan_captured_at: Optional[float] = None
+
+    def describe(self) -> dict:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "last_seen": self.last_seen,
+            "routes": dict(self.routes.most_common(5)),
+            "parameter_shapes": dict(self.parameter_shapes.most_common(3)),
+            "plan": self.plan,
+            "plan_captured_at": self.plan_captured_at,
+        }
+
+
+class SlowQueryRecorder:
+    """
+    Records statements slower than SLOW_QUERY_THRESHOLD_MS, grouped by shape
+
+    A sample (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) of slow PostgreSQL reads is
+    re-run as EXPLAIN (ANALYZE, BUFFERS) on a separate pooled connection in a
+    background task, one at a time, so the slow request is never held up.
+    Bound values are kept only until that task has run.
+    """
+
+    def __init__(self, max_shapes: int = 200):
+        self.max_shapes = max_shapes
+        self._shapes: Dict[str, QueryShape] = {}
+        self._lock = threading.Lock()
+        self._explaining = False
+
+    def record(self, conn, statement: str, parameters: Any, elapsed_ms: float, route: str) -> None:
+        normalized = normalize_sql(statement)
+        key = hashlib.sha1(normalized.encode()).hexdigest()
+        params_shape = parameter_shape(parameters)
+        logger.warning(
+            "Slow query %.1fms on %s: %s params=%s", elapsed_ms, route, normalized, params_shape,
+            extra={"query_shape": key, "duration_ms": round(elapsed_ms, 2), "route": route},
+        )
+        with self._lock:
+            shape = self._shapes.get(key)
+            if shape is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Forget the cheapest shape to make room
+                    cheapest = min(self._shapes, key=lambda k: self._shapes[k].total_ms)
+                    del self._shapes[cheapest]
+                shape = self._shapes[key] = QueryShape(sql=normalized)
+            shape.count += 1
+            shape.total_ms += elapsed_ms
+            shape.max_ms = max(shape.max_ms, elapsed_ms)
+            shape.last_seen = time.time()
+            shape.routes[route] += 1
+            shape.parameter_shapes[params_shape] += 1
+
+        if self._should_explain(conn, statement):
+            self._schedule_explain(conn, key, statement, parameters)
+
+    def _should_explain(self, conn, statement: str) -> bool:
+        return (
+            conn.dialect.name == "postgresql"
+            and not self._explaining
+            and _EXPLAINABLE.match(statement) is not None
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        )
+
+    def _schedule_explain(self, conn, key: str, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync engine (scripts, migrations): nothing to run it on
+        self._explaining = True
+        loop.create_task(self._explain(AsyncEngine(conn.engine), key, statement, parameters))
+
+    async def _explain(self, engine: AsyncEngine, key: str, statement: str, parameters: Any) -> None:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                # EXPLAIN ANALYZE really ran the statement; never keep its effects
+                await conn.rollback()
+            with self._lock:
+                shape = self._shapes.get(key)
+                if shape is not None:
+                    shape.plan = plan
+                    shape.plan_captured_at = time.time()
+        except Exception as e:
+            logger.info("EXPLAIN capture failed for slow query %s: %s", key, e)
+        finally:
+            self._explaining = False
+
+    def worst(self, limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+        with self._lock:
+            shapes = [shape.describe() for shape in self._shapes.values()]
+        return sorted(shapes, key=lambda shape: shape[order_by], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_recorder = SlowQueryRecorder(max_shapes=settings.SLOW_QUERY_MAX_SHAPES)
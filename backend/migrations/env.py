@@ -9,12 +9,12 @@ sys.path.insert(0, str(backend_dir))
 
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import create_engine
 from sqlalchemy import pool
 
 from alembic import context
 from core.config import settings
-from database.models import Base, get_engine
+from database.models import Base
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -29,14 +29,30 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
+
+# Objects created by hand-written migrations that the models intentionally
+# do not declare (generated search columns, GIN/trigram indexes); keep
+# autogenerate from proposing to drop them
+MIGRATION_ONLY_OBJECTS = {
+    "search_vector",
+    "ix_blog_posts_search_vector",
+    "ix_blog_posts_title_trgm",
+    "ix_blog_posts_content_trgm",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None and name in MIGRATION_ONLY_OBJECTS:
+        return False
+    return True
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
-config.set_main_option("sqlalchemy.url", os.getenv("ASYNC_SQLALCHEMY_URL"))
+config.set_main_option("sqlalchemy.url", settings.SYNC_DATABASE_URL)
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -54,6 +70,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -69,13 +86,13 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = create_engine(settings.SYNC_DATABASE_URL)
+    connectable = create_engine(settings.SYNC_DATABASE_URL, poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=Base.metadata,
-            url=settings.SYNC_DATABASE_URL
+            target_metadata=target_metadata,
+            include_object=include_object,
             compare_type=True,
             compare_server_default=True
         )
@@ -0,0 +1,65 @@
+"""Add full-text search vector and trigram indexes to blog_posts
+
+Revision ID: 0001_blog_post_search
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_blog_post_search'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # tsvector/pg_trgm are PostgreSQL features; other dialects use the
+        # ILIKE fallback in QueryBuilder.apply_search
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Title terms rank above body terms
+    op.execute("""
+        ALTER TABLE blog_posts
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED
+    """)
+
+    # GIN builds are slow on a large table; CONCURRENTLY keeps it writable
+    # meanwhile, which requires running outside the migration's transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_posts_search_vector", "blog_posts", ["search_vector"],
+            postgresql_using="gin", postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_blog_posts_title_trgm", "blog_posts", ["title"],
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_blog_posts_content_trgm", "blog_posts", ["content"],
+            postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_blog_posts_content_trgm", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_blog_posts_title_trgm", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_blog_posts_search_vector", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+    op.execute("ALTER TABLE blog_posts DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,61 @@
+"""Add updated_at version column to blog_posts
+
+Revision ID: 0002_blog_post_updated_at
+Revises: 0001_blog_post_search
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_blog_post_updated_at'
+down_revision: Union[str, None] = '0001_blog_post_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot add a column with a non-constant default; new rows there
+    # keep updated_at NULL until their first ORM update
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    op.add_column(
+        "blog_posts",
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True),
+            server_default=sa.func.now() if is_postgresql else None, nullable=True
+        )
+    )
+    # Existing rows have not changed since they were created
+    op.execute("UPDATE blog_posts SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+    if is_postgresql:
+        # Keep the version current for writes that bypass the ORM's onupdate
+        op.execute("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = now();
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER blog_posts_set_updated_at
+            BEFORE UPDATE ON blog_posts
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+        """)
+        with op.get_context().autocommit_block():
+            op.create_index("ix_blog_posts_updated_at", "blog_posts", ["updated_at"], postgresql_concurrently=True)
+    else:
+        op.create_index("ix_blog_posts_updated_at", "blog_posts", ["updated_at"])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS blog_posts_set_updated_at ON blog_posts")
+        op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
+    op.drop_index("ix_blog_posts_updated_at", table_name="blog_posts")
+    op.drop_column("blog_posts", "updated_at")
@@ -0,0 +1,38 @@
+"""Add btree indexes for the whitelisted blog_posts sort columns
+
+Revision ID: 0003_blog_post_sort_indexes
+Revises: 0002_blog_post_updated_at
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_blog_post_sort_indexes'
+down_revision: Union[str, None] = '0002_blog_post_updated_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Sort (and keyset seek) columns; created concurrently since blog_posts
+    # is already populated and serving writes by this revision
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_posts_created_at", "blog_posts", ["created_at"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_blog_posts_title", "blog_posts", ["title"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_blog_posts_title", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_blog_posts_created_at", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,56 @@
+"""Add categories table
+
+Revision ID: 0004_categories
+Revises: 0003_blog_post_sort_indexes
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_categories'
+down_revision: Union[str, None] = '0003_blog_post_sort_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Marks a categories table this migration created, as opposed to one it adopted
+CREATED_COMMENT = "created by migration 0004_categories"
+
+
+def upgrade() -> None:
+    # scripts/import_data.py has been loading categories into hand-made tables
+    if sa.inspect(op.get_bind()).has_table("categories"):
+        op.create_index("ix_categories_title", "categories", ["title"], if_not_exists=True)
+        return
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(), nullable=False),
+        comment=CREATED_COMMENT,
+    )
+    op.create_index("ix_categories_id", "categories", ["id"])
+    op.create_index("ix_categories_title", "categories", ["title"])
+
+
+def _created_here() -> bool:
+    try:
+        comment = sa.inspect(op.get_bind()).get_table_comment("categories")["text"]
+    except NotImplementedError:
+        # No table comments (SQLite): an adopted table must never be dropped
+        return False
+    return comment == CREATED_COMMENT
+
+
+def downgrade() -> None:
+    if not _created_here():
+        # Adopted table: only undo the index upgrade() may have added
+        op.drop_index("ix_categories_title", table_name="categories", if_exists=True)
+        return
+    op.drop_index("ix_categories_title", table_name="categories")
+    op.drop_index("ix_categories_id", table_name="categories", if_exists=True)
+    op.drop_table("categories")
@@ -0,0 +1,59 @@
+"""Add blog_posts.category_id (foreign key to categories) and status
+
+Revision ID: 0005_blog_post_category
+Revises: 0004_categories
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_blog_post_category'
+down_revision: Union[str, None] = '0004_categories'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # scripts/import_data.py may already have created these columns by hand
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("blog_posts")}
+    if "category_id" not in existing:
+        op.add_column("blog_posts", sa.Column("category_id", sa.Integer(), nullable=True))
+    if "status" not in existing:
+        op.add_column("blog_posts", sa.Column("status", sa.String(), nullable=True))
+    foreign_keys = {fk["name"] for fk in sa.inspect(op.get_bind()).get_foreign_keys("blog_posts")}
+    if "fk_blog_posts_category_id_categories" not in foreign_keys:
+        # SQLite cannot ALTER constraints; batch mode rebuilds the table there
+        # and issues a plain ALTER TABLE elsewhere
+        with op.batch_alter_table("blog_posts") as batch_op:
+            batch_op.create_foreign_key(
+                "fk_blog_posts_category_id_categories", "categories", ["category_id"], ["id"]
+            )
+
+    # category_id backs the per-page category loads and category.* filters;
+    # concurrent builds, like the other blog_posts indexes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_posts_category_id", "blog_posts", ["category_id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_blog_posts_status", "blog_posts", ["status"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_blog_posts_status", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_blog_posts_category_id", table_name="blog_posts", postgresql_concurrently=True, if_exists=True)
+    foreign_keys = {fk["name"] for fk in sa.inspect(op.get_bind()).get_foreign_keys("blog_posts")}
+    with op.batch_alter_table("blog_posts") as batch_op:
+        if "fk_blog_posts_category_id_categories" in foreign_keys:
+            batch_op.drop_constraint("fk_blog_posts_category_id_categories", type_="foreignkey")
+        batch_op.drop_column("status")
+        batch_op.drop_column("category_id")
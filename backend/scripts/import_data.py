@@ -1,71 +1,365 @@
+"""
+Streaming, batched and resumable bulk importer for categories and blog posts
+
+Usage (from the backend directory):
+    python scripts/import_data.py --categories scripts/categories.json --posts scripts/blog_posts.json
+    python scripts/import_data.py --posts posts.ndjson --batch-size 10000 --workers 4 --method copy
+
+Input may be a JSON array or NDJSON (one object per line); either is parsed
+incrementally, so memory stays flat regardless of file size. Each batch is
+written in its own transaction with COPY (default) or a multi-row
+INSERT ... ON CONFLICT DO NOTHING, and recorded in <input>.checkpoint.json;
+re-running the same command skips batches that already committed. Rows that
+cannot be mapped or inserted are written to <input>.rejects.ndjson instead of
+aborting the run.
+"""
+import argparse
+import io
 import json
 import os
-from dotenv import load_dotenv
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from database import get_sync_connection
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
+
+# Allow running as a plain script from the backend directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+from database.core import get_sync_connection
 
 # Load environment variables
 load_dotenv()
 
-def load_categories(file_path):
-    with open(file_path) as f:
-        categories = json.load(f)
-    
-    conn = get_sync_connection()
-    cur = conn.cursor()
-    
-    inserted = 0
-    for cat in categories:
+READ_CHUNK_SIZE = 1 << 16
+
+
+class TableSpec:
+    """Target table, its columns and how to map one input record to a row"""
+
+    def __init__(self, table: str, columns: Sequence[str], to_row: Callable[[dict], tuple]):
+        self.table = table
+        self.columns = tuple(columns)
+        self.to_row = to_row
+
+
+CATEGORIES = TableSpec(
+    "categories",
+    ("id", "title"),
+    lambda cat: (cat["id"], cat["title"])
+)
+
+BLOG_POSTS = TableSpec(
+    "blog_posts",
+    ("id", "title", "content", "category_id", "status", "created_at"),
+    lambda post: (
+        post["id"],
+        post["title"],
+        post["content"],
+        post["category"]["id"],
+        post["status"],
+        datetime.fromisoformat(post["createdAt"].replace("Z", "+00:00"))
+    )
+)
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """Yield objects from a JSON array or NDJSON file without loading it whole"""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(READ_CHUNK_SIZE)
+        if head.lstrip().startswith("["):
+            yield from _iter_json_array(f, head)
+            return
+        # NDJSON: stitch the already-read head back onto the line stream
+        pending = ""
+        for chunk in _chunks(f, head):
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if pending.strip():
+            yield json.loads(pending)
+
+
+def _chunks(f, head: str) -> Iterator[str]:
+    yield head
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_json_array(f, head: str) -> Iterator[dict]:
+    """Incrementally decode the elements of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    buffer = head.lstrip()[1:]
+    chunks = iter(lambda: f.read(READ_CHUNK_SIZE), "")
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
         try:
-            cur.execute(
-                "INSERT INTO categories (id, title) VALUES (%s, %s)",
-                (cat['id'], cat['title'])
-            )
-            inserted += 1
-        except Exception as e:
-            print(f"Error inserting category {cat}: {str(e)}")
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    return inserted
-
-def load_blog_posts(file_path):
-    with open(file_path) as f:
-        posts = json.load(f)
-    
-    conn = get_sync_connection()
-    cur = conn.cursor()
-    
-    inserted = 0
-    for post in posts:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # Element not complete yet; read more input
+            chunk = next(chunks, None)
+            if not chunk:
+                raise ValueError("Unexpected end of JSON array")
+            buffer += chunk
+            continue
+        yield obj
+        buffer = buffer[end:]
+
+
+def batched(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Checkpoint:
+    """Set of committed batch numbers, persisted atomically next to the input"""
+
+    def __init__(self, path: str, batch_size: int, resume: bool):
+        self.path = path
+        self.batch_size = batch_size
+        self.done = set()
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if state["batch_size"] != batch_size:
+                raise SystemExit(
+                    f"{path} was written with --batch-size {state['batch_size']}; "
+                    f"rerun with that size or delete the checkpoint"
+                )
+            self.done = set(state["completed_batches"])
+
+    def mark(self, batch_no: int) -> None:
+        with self._lock:
+            self.done.add(batch_no)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"batch_size": self.batch_size, "completed_batches": sorted(self.done)}, f)
+            os.replace(tmp, self.path)
+
+
+class RejectWriter:
+    """Append rejected records with their error to an NDJSON side file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record, error: str) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"error": error, "record": record}, default=str) + "\n")
+            self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def _csv_field(value) -> str:
+    # COPY csv reads an unquoted empty field as NULL and a quoted one as '',
+    # so every other value is quoted to keep real empty strings
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_rows(cur, spec: TableSpec, rows: List[tuple]) -> None:
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_csv_field(value) for value in row) + "\n")
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {spec.table} ({', '.join(spec.columns)}) FROM STDIN WITH (FORMAT csv)",
+        buf
+    )
+
+
+def _insert_rows(cur, spec: TableSpec, rows: List[tuple]) -> int:
+    from psycopg2.extras import execute_values
+    execute_values(
+        cur,
+        f"INSERT INTO {spec.table} ({', '.join(spec.columns)}) VALUES %s ON CONFLICT DO NOTHING",
+        rows,
+        page_size=len(rows)
+    )
+    # One page, so this counts every row actually inserted (conflicts excluded)
+    return cur.rowcount
+
+
+def write_batch(conn, spec: TableSpec, batch: List[dict], method: str, rejects: RejectWriter) -> int:
+    """
+    Write one batch in a single transaction and return rows written
+
+    If the set-based write fails (e.g. one duplicate key aborts a COPY) the
+    batch is retried row by row under savepoints so only the offending rows
+    are rejected.
+    """
+    rows, sources = [], []
+    for record in batch:
         try:
+            rows.append(spec.to_row(record))
+            sources.append(record)
+        except (KeyError, TypeError, ValueError) as e:
+            rejects.write(record, f"mapping: {e!r}")
+
+    if not rows:
+        return 0
+    with conn.cursor() as cur:
+        try:
+            if method == "copy":
+                _copy_rows(cur, spec, rows)
+                written = len(rows)
+            else:
+                written = _insert_rows(cur, spec, rows)
+            conn.commit()
+            return written
+        except Exception:
+            conn.rollback()
+
+        written = 0
+        placeholders = ", ".join(["%s"] * len(spec.columns))
+        for row, record in zip(rows, sources):
+            cur.execute("SAVEPOINT import_row")
+            try:
+                cur.execute(f"INSERT INTO {spec.table} ({', '.join(spec.columns)}) VALUES ({placeholders})", row)
+                cur.execute("RELEASE SAVEPOINT import_row")
+                written += 1
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT import_row")
+                rejects.write(record, str(e).strip())
+        conn.commit()
+        return written
+
+
+def import_file(
+    path: str,
+    spec: TableSpec,
+    batch_size: int = 5000,
+    workers: int = 1,
+    method: str = "copy",
+    resume: bool = True
+) -> Tuple[int, int]:
+    """Import one file; returns (rows written, rows rejected)"""
+    checkpoint = Checkpoint(f"{path}.checkpoint.json", batch_size, resume)
+    rejects = RejectWriter(f"{path}.rejects.ndjson")
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+    totals = {"written": 0}
+    totals_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def connection():
+        if not hasattr(local, "conn"):
+            local.conn = get_sync_connection()
+            with connections_lock:
+                connections.append(local.conn)
+        return local.conn
+
+    def run(batch_no: int, batch: List[dict]) -> None:
+        written = write_batch(connection(), spec, batch, method, rejects)
+        checkpoint.mark(batch_no)
+        with totals_lock:
+            totals["written"] += written
+            elapsed = time.perf_counter() - started
+            print(f"  {spec.table}: batch {batch_no} done, {totals['written']:,} rows, "
+                  f"{totals['written'] / elapsed:,.0f} rows/s", flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            for batch_no, batch in enumerate(batched(iter_records(path), batch_size)):
+                if batch_no in checkpoint.done:
+                    continue
+                # Keep at most two batches per worker in memory
+                if len(in_flight) >= workers * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                in_flight.add(pool.submit(run, batch_no, batch))
+            for future in in_flight:
+                future.result()
+
+        _sync_id_sequence(spec)
+    finally:
+        for conn in connections:
+            conn.close()
+        rejects.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"{spec.table}: {totals['written']:,} rows in {elapsed:.1f}s "
+          f"({totals['written'] / max(elapsed, 1e-9):,.0f} rows/s), {rejects.count} rejected")
+    if rejects.count:
+        print(f"  rejected rows written to {rejects.path}")
+    return totals["written"], rejects.count
+
+
+def _sync_id_sequence(spec: TableSpec) -> None:
+    """Move the id sequence past explicitly imported ids so later inserts don't collide"""
+    conn = get_sync_connection()
+    try:
+        with conn.cursor() as cur:
             cur.execute(
-                """INSERT INTO blog_posts 
-                (id, title, content, category_id, status, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s)""",
-                (
-                    post['id'],
-                    post['title'],
-                    post['content'],
-                    post['category']['id'],
-                    post['status'],
-                    datetime.fromisoformat(post['createdAt'])
-                )
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1)) FROM {spec.table}",
+                (spec.table,)
             )
-            inserted += 1
-        except Exception as e:
-            print(f"Error inserting post {post['id']}: {str(e)}")
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-    return inserted
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"  could not advance {spec.table} id sequence: {e}")
+    finally:
+        conn.close()
+
+
+def load_categories(file_path: str, **options) -> int:
+    return import_file(file_path, CATEGORIES, **options)[0]
+
+
+def load_blog_posts(file_path: str, **options) -> int:
+    return import_file(file_path, BLOG_POSTS, **options)[0]
+
 
 if __name__ == "__main__":
-    categories_count = load_categories(".\categories.json")
-    posts_count = load_blog_posts("blog_posts.json")
-    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", help="categories JSON/NDJSON file")
+    parser.add_argument("--posts", help="blog posts JSON/NDJSON file")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="parallel writer connections")
+    parser.add_argument("--method", choices=("copy", "values"), default="copy")
+    parser.add_argument("--restart", action="store_true", help="ignore existing checkpoints")
+    args = parser.parse_args()
+    if not args.categories and not args.posts:
+        parser.error("nothing to import; pass --categories and/or --posts")
 
-    print(f"Successfully inserted {categories_count} categories")
-    print(f"Successfully inserted {posts_count} blog posts") 
\ No newline at end of file
+    options = {
+        "batch_size": args.batch_size,
+        "workers": args.workers,
+        "method": args.method,
+        "resume": not args.restart,
+    }
+    # Categories first: posts reference them
+    if args.categories:
+        categories_count = load_categories(args.categories, **options)
+        print(f"Successfully inserted {categories_count} categories")
+    if args.posts:
+        posts_count = load_blog_posts(args.posts, **options)
+        print(f"Successfully inserted {posts_count} blog posts")
@@ -0,0 +1,119 @@
+"""
+Shared fixtures: the API against a scratch SQLite database
+
+Settings are read when core.config is first imported, so the environment is
+prepared here before any application module is loaded. Every test starts
+from the same seed data with empty in-process caches.
+
+Run from the backend directory:
+    python -m pytest tests
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+import asyncio
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+DATA_DIR = Path(tempfile.mkdtemp(prefix="backend-tests-"))
+PRIMARY_PATH = DATA_DIR / "primary.db"
+os.environ.update({
+    "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{PRIMARY_PATH}",
+    "SYNC_DATABASE_URL": f"sqlite:///{PRIMARY_PATH}",
+    "ENVIRONMENT": "development",
+    "WARMUP_ENABLED": "false",
+    "RESPONSE_CACHE_BACKEND": "none",
+    "READ_REPLICA_URLS": "[]",
+    "LOG_LEVEL": "WARNING",
+})
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from api.main import app
+from database.core import get_engine
+from database.models import Base, BlogPost, Category
+from utils.count_strategy import count_cache
+from utils.response_cache import set_cache_backend
+
+POST_COUNT = 50
+CATEGORY_TITLES = ["Technology", "Science", "Travel", "Food", "Sports"]
+SEED_TIME = datetime(2024, 1, 1)
+
+
+def post_rows():
+    """Deterministic posts: 'api' in every third title, no category on every tenth"""
+    return [
+        {
+            "id": i,
+            "title": f"Post {i:02d} {'api' if i % 3 == 0 else 'misc'}",
+            "content": f"body {i}",
+            # Repeating offsets, so several posts share a created_at
+            "created_at": SEED_TIME + timedelta(hours=i % 7),
+            "updated_at": SEED_TIME + timedelta(minutes=i),
+            "category_id": None if i % 10 == 0 else i % 5 + 1,
+            "status": ("draft", "published", "rejected")[i % 3],
+        }
+        for i in range(1, POST_COUNT + 1)
+    ]
+
+
+def seed_database(url: str) -> None:
+    engine = create_engine(url)
+    try:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Category), [
+                {"id": i, "title": title} for i, title in enumerate(CATEGORY_TITLES, start=1)
+            ])
+            conn.execute(insert(BlogPost), post_rows())
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    seed_database(os.environ["SYNC_DATABASE_URL"])
+    count_cache.invalidate(lambda key: True)
+    set_cache_backend(None)
+    yield
+    set_cache_backend(None)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """SQL text of every statement the application's engine executes"""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def run_db():
+    """Run `fn(session)` on a fresh event loop and engine against the seeded database"""
+    def run(fn, url: str = None):
+        async def main():
+            engine = create_async_engine(url or os.environ["ASYNC_DATABASE_URL"], poolclass=NullPool)
+            try:
+                async with AsyncSession(engine, expire_on_commit=False) as session:
+                    return await fn(session)
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return run
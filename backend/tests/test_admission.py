@@ -0,0 +1,163 @@
+import asyncio
+import pytest
+from api.middleware import AdmissionControlMiddleware
+from utils.admission import AdmissionController, Saturated, admission_controller
+
+
+def test_requests_within_capacity_are_admitted_at_once():
+    async def main():
+        controller = AdmissionController(max_concurrency=2, queue_size=4, queue_timeout=1)
+        await controller.acquire("/a", "detail")
+        await controller.acquire("/b", "detail")
+        return controller.describe()
+
+    state = asyncio.run(main())
+    assert state["in_flight"] == 2
+    assert state["queued"] == {}
+
+
+def test_freed_slots_go_to_the_highest_priority_waiter():
+    async def main():
+        controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=1)
+        await controller.acquire("/held", "detail")
+        order = []
+
+        async def request(route, kind):
+            await controller.acquire(route, kind)
+            order.append(kind)
+            controller.release(route, kind)
+
+        tasks = [asyncio.create_task(request(f"/{kind}", kind)) for kind in ("list", "write", "detail")]
+        await asyncio.sleep(0)
+        assert controller.describe()["queued"] == {"list": 1, "write": 1, "detail": 1}
+        controller.release("/held", "detail")
+        await asyncio.gather(*tasks)
+        return order, controller.in_flight
+
+    order, in_flight = asyncio.run(main())
+    assert order == ["detail", "write", "list"]
+    assert in_flight == 0
+
+
+def test_one_route_cannot_take_every_slot():
+    async def main():
+        controller = AdmissionController(max_concurrency=4, queue_size=4, queue_timeout=0.05, list_share=0.5)
+        await controller.acquire("/list", "list")
+        await controller.acquire("/list", "list")
+        with pytest.raises(Saturated) as shed:
+            await controller.acquire("/list", "list")
+        # Other routes and detail reads still get in
+        await controller.acquire("/other", "list")
+        await controller.acquire("/detail", "detail")
+        return shed.value.reason
+
+    assert asyncio.run(main()) == "timeout"
+
+
+def test_route_limit_override():
+    controller = AdmissionController(max_concurrency=4, queue_size=0, queue_timeout=1, route_limits={"/export": 1})
+    assert controller.limit_for("/export", "list") == 1
+    assert controller.limit_for("/other", "list") == 2
+    assert controller.limit_for("/other", "detail") == 4
+
+
+def test_full_queue_sheds_or_evicts_by_priority():
+    async def main():
+        controller = AdmissionController(max_concurrency=1, queue_size=1, queue_timeout=1)
+        await controller.acquire("/held", "detail")
+        queued_list = asyncio.create_task(controller.acquire("/list", "list"))
+        await asyncio.sleep(0)
+
+        # Not cheaper than the queued list request: shed straight away
+        with pytest.raises(Saturated) as full:
+            await controller.acquire("/list2", "list")
+        # A detail read displaces it instead
+        queued_detail = asyncio.create_task(controller.acquire("/detail", "detail"))
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated) as evicted:
+            await queued_list
+        controller.release("/held", "detail")
+        await queued_detail
+        return full.value.reason, evicted.value.reason, controller.in_flight
+
+    assert asyncio.run(main()) == ("queue_full", "evicted", 1)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=1)
+        await controller.acquire("/held", "detail")
+        waiter = asyncio.create_task(controller.acquire("/list", "list"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        controller.release("/held", "detail")
+        return controller.describe()
+
+    state = asyncio.run(main())
+    assert state["queued"] == {}
+    assert state["in_flight"] == 0
+
+
+def test_slot_granted_as_the_wait_times_out_is_returned(monkeypatch):
+    async def main():
+        controller = AdmissionController(max_concurrency=1, queue_size=4, queue_timeout=1)
+        await controller.acquire("/held", "detail")
+
+        async def grant_then_time_out(future, timeout):
+            # release() hands the slot over, but the timeout wins the race
+            controller.release("/held", "detail")
+            assert future.done()
+            raise asyncio.TimeoutError
+        monkeypatch.setattr(asyncio, "wait_for", grant_then_time_out)
+        with pytest.raises(Saturated) as shed:
+            await controller.acquire("/list", "list")
+        monkeypatch.undo()
+        return shed.value.reason, controller.describe()
+
+    reason, state = asyncio.run(main())
+    assert reason == "timeout"
+    assert state["in_flight"] == 0
+    assert state["in_flight_by_route"] == {}
+
+
+@pytest.mark.parametrize("method,path,kind", [
+    ("GET", "/blog-post-sql/{post_id}", "detail"),
+    ("GET", "/blog-post-sql/many", "detail"),
+    ("POST", "/blog-post-sql/many", "detail"),
+    ("GET", "/blog-post-sql/", "list"),
+    ("GET", "/blog-post-sql/export", "list"),
+    ("POST", "/blog-post-sql/bulk", "write"),
+    ("DELETE", "/blog-post-sql/bulk", "write"),
+])
+def test_classify(method, path, kind):
+    assert AdmissionControlMiddleware.classify(method, path) == kind
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """The app's controller with its only slot taken and no queue"""
+    monkeypatch.setattr(admission_controller, "max_concurrency", 1)
+    monkeypatch.setattr(admission_controller, "queue_size", 0)
+    admission_controller._take("/held", "detail")
+    yield admission_controller
+    admission_controller.release("/held", "detail")
+
+
+def test_saturated_app_answers_503_with_retry_after(client, saturated):
+    response = client.get("/blog-post-sql/1")
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert response.json()["error"]["reason"] == "queue_full"
+
+
+def test_routes_outside_the_database_are_not_admission_controlled(client, saturated):
+    assert client.get("/openapi.json").status_code == 200
+    assert client.get("/metrics").status_code == 200
+
+
+def test_slots_are_released_after_each_request(client):
+    for _ in range(3):
+        assert client.get("/blog-post-sql/1").status_code == 200
+    assert client.get("/blog-post-sql/999").status_code == 404
+    assert admission_controller.in_flight == 0
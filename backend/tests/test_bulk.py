@@ -0,0 +1,86 @@
+"""Refine getMany / createMany / updateMany / deleteMany endpoints"""
+import pytest
+from core.config import settings
+
+
+def test_get_many_keeps_request_order_and_reports_missing(client):
+    response = client.get("/blog-post-sql/many?id=5&id=999&id=2")
+    assert response.status_code == 200
+    assert [post["id"] for post in response.json()] == [5, 2]
+    assert response.headers["x-missing-ids"] == "999"
+
+
+def test_post_many_accepts_ids_in_the_body(client):
+    response = client.post("/blog-post-sql/many?_fields=id,title", json={"ids": [3, 1]})
+    assert response.status_code == 200
+    assert response.json() == [{"id": 3, "title": "Post 03 api"}, {"id": 1, "title": "Post 01 misc"}]
+
+
+def test_get_many_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_MANY_IDS", 2)
+    assert client.post("/blog-post-sql/many", json={"ids": [1, 2, 3]}).status_code == 400
+
+
+def test_create_many(client):
+    response = client.post("/blog-post-sql/bulk", json=[{"title": "new one"}, {"title": "new two", "content": "x"}])
+    assert response.status_code == 201
+    created = response.json()
+    assert [post["title"] for post in created] == ["new one", "new two"]
+    assert all(post["id"] > 50 for post in created)
+    assert client.get("/blog-post-sql/?_start=0&_end=1").headers["x-total-count"] == "52"
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_created_post_without_content_can_be_read(client, monkeypatch, fast):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+    (created,) = client.post("/blog-post-sql/bulk", json=[{"title": "no content"}]).json()
+    response = client.get(f"/blog-post-sql/{created['id']}")
+    assert response.status_code == 200
+    assert response.json()["content"] is None
+    assert client.get(f"/blog-post-sql/many?id={created['id']}").json()[0]["content"] is None
+
+
+def test_create_many_reports_every_invalid_row_and_writes_nothing(client):
+    response = client.post("/blog-post-sql/bulk", json=[{"title": "fine"}, {"content": "no title"}, {"title": 5}])
+    assert response.status_code == 422
+    errors = response.json()["detail"]["error"]["errors"]
+    assert [error["index"] for error in errors] == [1, 2]
+    assert client.get("/blog-post-sql/?_start=0&_end=1").headers["x-total-count"] == "50"
+
+
+def test_update_many(client):
+    response = client.patch("/blog-post-sql/bulk", json={"ids": [1, 2, 999], "values": {"title": "same"}})
+    assert response.status_code == 200
+    assert sorted(post["id"] for post in response.json()) == [1, 2]
+    assert response.headers["x-missing-ids"] == "999"
+    assert client.get("/blog-post-sql/2").json()["title"] == "same"
+
+
+def test_update_many_needs_changes(client):
+    assert client.patch("/blog-post-sql/bulk", json={"ids": [1], "values": {}}).status_code == 400
+
+
+def test_delete_many(client):
+    response = client.delete("/blog-post-sql/bulk?id=4&id=5&id=999")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 4}, {"id": 5}]
+    assert response.headers["x-missing-ids"] == "999"
+    assert client.get("/blog-post-sql/4").status_code == 404
+
+
+@pytest.mark.parametrize("method,url,body", [
+    ("post", "/blog-post-sql/bulk", [{"title": "a"}, {"title": "b"}, {"title": "c"}]),
+    ("patch", "/blog-post-sql/bulk", {"ids": [1, 2, 3], "values": {"title": "x"}}),
+    ("delete", "/blog-post-sql/bulk?id=1&id=2&id=3", None),
+])
+def test_bulk_size_limit(client, monkeypatch, method, url, body):
+    monkeypatch.setattr(settings, "MAX_BULK_ROWS", 2)
+    kwargs = {"json": body} if body is not None else {}
+    assert client.request(method, url, **kwargs).status_code == 413
+
+
+def test_bulk_endpoints_need_a_token_outside_development(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_DEV_BYPASS", False)
+    assert client.delete("/blog-post-sql/bulk?id=1").status_code == 401
+    assert client.post("/blog-post-sql/bulk", json=[{"title": "a"}]).status_code == 401
+    assert client.get("/blog-post-sql/1").status_code == 200
@@ -0,0 +1,148 @@
+"""ETag / Last-Modified validators and 304 answers on list and detail endpoints"""
+import sqlite3
+import pytest
+from conftest import PRIMARY_PATH
+from core.config import settings
+
+LIST = "/blog-post-sql/?_start=0&_end=5&_sort=id&_order=asc"
+
+
+def execute_sql(statement):
+    with sqlite3.connect(PRIMARY_PATH) as conn:
+        conn.execute(statement)
+
+
+def test_plain_list_request_gets_a_page_etag(client):
+    response = client.get(LIST)
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    # No version query was run, so there is no Last-Modified either
+    assert "last-modified" not in response.headers
+    assert client.get(LIST).headers["etag"] == response.headers["etag"]
+
+
+def test_page_etag_revalidates(client):
+    etag = client.get(LIST).headers["etag"]
+    response = client.get(LIST, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_page_etag_revalidation_hands_out_the_version_etag(client, statements):
+    page_etag = client.get(LIST).headers["etag"]
+    response = client.get(LIST, headers={"If-None-Match": page_etag})
+    assert response.status_code == 304
+    version_etag = response.headers["etag"]
+    assert version_etag != page_etag
+    assert response.headers["last-modified"]
+
+    # Polling with it is answered by the version query alone
+    del statements[:]
+    assert client.get(LIST, headers={"If-None-Match": version_etag}).status_code == 304
+    assert len(statements) == 1
+
+
+def test_conditional_request_gets_version_validators(client):
+    response = client.get(LIST, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    version_etag = response.headers["etag"]
+    assert response.headers["last-modified"]
+
+    assert client.get(LIST, headers={"If-None-Match": version_etag}).status_code == 304
+    last_modified = response.headers["last-modified"]
+    assert client.get(LIST, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_update_changes_the_etag(client):
+    page_etag = client.get(LIST).headers["etag"]
+    version_etag = client.get(LIST, headers={"If-None-Match": '"stale"'}).headers["etag"]
+    execute_sql("UPDATE blog_posts SET title = 'changed', updated_at = '2030-01-01 00:00:00' WHERE id = 2")
+    assert client.get(LIST, headers={"If-None-Match": page_etag}).status_code == 200
+    assert client.get(LIST, headers={"If-None-Match": version_etag}).status_code == 200
+
+
+def test_deleting_an_older_row_changes_the_etag(client):
+    # The newest version is untouched, only the count moves
+    version_etag = client.get(LIST, headers={"If-None-Match": '"stale"'}).headers["etag"]
+    execute_sql("DELETE FROM blog_posts WHERE id = 40")
+    assert client.get(LIST, headers={"If-None-Match": version_etag}).status_code == 200
+
+
+def test_estimated_count_does_not_produce_a_stale_304(client):
+    url = LIST + "&_count=cached"
+    version_etag = client.get(url, headers={"If-None-Match": '"stale"'}).headers["etag"]
+    # Bypasses the ORM, so the cached count is not invalidated
+    execute_sql("DELETE FROM blog_posts WHERE id = 40")
+    assert client.get(url, headers={"If-None-Match": version_etag}).status_code == 200
+
+
+def test_filters_are_part_of_the_etag(client):
+    etag = client.get(LIST).headers["etag"]
+    other = client.get(LIST + "&filter[field]=id&filter[operator]=gt&filter[value]=1", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+
+def test_detail_etag(client):
+    response = client.get("/blog-post-sql/3")
+    etag = response.headers["etag"]
+    assert client.get("/blog-post-sql/3", headers={"If-None-Match": etag}).status_code == 304
+
+    execute_sql("UPDATE blog_posts SET title = 'changed', updated_at = '2030-01-01 00:00:00' WHERE id = 3")
+    changed = client.get("/blog-post-sql/3", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "changed"
+
+
+@pytest.mark.parametrize("url", [
+    LIST + "&_embed=category",
+    LIST + "&filter[field]=category.title&filter[operator]=eq&filter[value]=Science",
+    "/blog-post-sql/?_start=0&_end=5&_sort=category.title&_order=desc&_embed=category",
+])
+def test_related_rows_are_covered_by_the_list_etag(client, url):
+    # The posts' version does not move when a category changes, so such
+    # pages are validated by their rendered hash only
+    response = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert "last-modified" not in response.headers
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    execute_sql("UPDATE categories SET title = title || '!'")
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_detail_etag_covers_the_embedded_category(client, monkeypatch, fast):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+    url = "/blog-post-sql/9?_embed=category"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/blog-post-sql/9").headers["etag"] != etag
+
+    execute_sql("UPDATE categories SET title = 'Renamed' WHERE id = 5")
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["category"]["title"] == "Renamed"
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_detail_validators_match_the_revalidation_check(client, monkeypatch, fast):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+    # A row without updated_at must not get a different ETag on each path
+    execute_sql("UPDATE blog_posts SET updated_at = NULL WHERE id = 3")
+    for post_id in (3, 4):
+        response = client.get(f"/blog-post-sql/{post_id}")
+        etag = response.headers["etag"]
+        revalidated = client.get(f"/blog-post-sql/{post_id}", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+
+
+def test_missing_row_is_404_even_when_conditional(client):
+    assert client.get("/blog-post-sql/999", headers={"If-None-Match": '"x"'}).status_code == 404
+
+
+def test_generic_resource_etag(client):
+    etag = client.get("/categories/?_start=0&_end=3").headers["etag"]
+    assert client.get("/categories/?_start=0&_end=3", headers={"If-None-Match": etag}).status_code == 304
+    detail = client.get("/categories/2")
+    assert detail.json() == {"id": 2, "title": "Science"}
@@ -0,0 +1,65 @@
+"""x-total-count strategies: exact, cached, estimate and auto (`_count`)"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+from core.config import settings
+from database.models import BlogPost
+from utils.count_strategy import explain_statement
+
+LIST = "/blog-post-sql/?_start=0&_end=5&_sort=id&_order=asc"
+
+
+def count_queries(statements):
+    return [s for s in statements if "count(*)" in s]
+
+
+def test_exact_counts_on_every_request(client, statements):
+    for _ in range(2):
+        assert client.get(LIST + "&_count=exact").headers["x-total-count"] == "50"
+    assert len(count_queries(statements)) == 2
+
+
+@pytest.mark.parametrize("strategy", ["cached", "auto", "estimate"])
+def test_count_is_cached_until_a_write(client, statements, strategy):
+    url = LIST + f"&_count={strategy}"
+    assert client.get(url).headers["x-total-count"] == "50"
+    assert client.get(url).headers["x-total-count"] == "50"
+    assert len(count_queries(statements)) == 1
+
+    assert client.post("/blog-post-sql/bulk", json=[{"title": "new", "content": "x"}]).status_code == 201
+    assert client.get(url).headers["x-total-count"] == "51"
+
+
+def test_filter_sets_are_cached_separately(client):
+    url = LIST + "&_count=cached&filter[field]=status&filter[operator]=eq&filter[value]=draft"
+    assert client.get(url).headers["x-total-count"] == "16"
+    assert client.get(LIST + "&_count=cached").headers["x-total-count"] == "50"
+
+
+@pytest.mark.parametrize("strategy", ["auto", "estimate"])
+def test_several_workers_do_not_use_the_process_cache_by_default(client, statements, monkeypatch, strategy):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+    for _ in range(2):
+        assert client.get(LIST + f"&_count={strategy}").headers["x-total-count"] == "50"
+    assert len(count_queries(statements)) == 2
+
+
+def test_cached_is_still_available_explicitly_with_several_workers(client, statements, monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+    for _ in range(2):
+        client.get(LIST + "&_count=cached")
+    assert len(count_queries(statements)) == 1
+
+
+def test_unknown_strategy_is_rejected(client):
+    assert client.get(LIST + "&_count=guess").status_code == 422
+
+
+def test_explain_renders_expanding_parameters():
+    # in/nin filters compile to one placeholder per value, in parameter order
+    query = select(BlogPost).where(BlogPost.id.in_([4, 5, 6]), BlogPost.title == "x")
+    sql, params = explain_statement(query, asyncpg.dialect())
+    assert sql.startswith("EXPLAIN (FORMAT JSON) ")
+    assert "POSTCOMPILE" not in sql
+    assert "IN ($2::INTEGER, $3::INTEGER, $4::INTEGER)" in sql
+    assert params == ("x", 4, 5, 6)
@@ -0,0 +1,49 @@
+"""?_embed=category on the blog post list and detail endpoints"""
+import pytest
+
+
+def test_list_embeds_each_posts_category(client):
+    response = client.get("/blog-post-sql/?_start=8&_end=10&_sort=id&_order=asc&_embed=category")
+    assert response.status_code == 200
+    posts = response.json()
+    assert posts[0]["category"] == {"id": 5, "title": "Sports"}
+    # Post 10 has no category
+    assert posts[1]["category_id"] is None and posts[1]["category"] is None
+
+
+def test_embed_with_sparse_fieldset_keeps_the_join_key(client):
+    response = client.get("/blog-post-sql/?_start=0&_end=2&_sort=id&_order=asc&_embed=category&_fields=id,title")
+    assert response.json() == [
+        {"id": 1, "title": "Post 01 misc", "category_id": 2, "category": {"id": 2, "title": "Science"}},
+        {"id": 2, "title": "Post 02 misc", "category_id": 3, "category": {"id": 3, "title": "Travel"}},
+    ]
+
+
+@pytest.mark.parametrize("fields", ["", "&_fields=id"])
+def test_categories_load_in_one_query_per_page(client, statements, fields):
+    client.get(f"/blog-post-sql/?_start=0&_end=20&_count=exact&_embed=category{fields}")
+    category_queries = [s for s in statements if "FROM categories" in s]
+    assert len(category_queries) == 1
+
+
+def test_without_embed_no_category_is_returned(client, statements):
+    posts = client.get("/blog-post-sql/?_start=0&_end=2").json()
+    assert all("category" not in post for post in posts)
+    assert not [s for s in statements if "categories" in s]
+
+
+def test_detail_embed(client):
+    assert client.get("/blog-post-sql/9?_embed=category").json()["category"] == {"id": 5, "title": "Sports"}
+    assert client.get("/blog-post-sql/10?_embed=category").json()["category"] is None
+    assert "category" not in client.get("/blog-post-sql/9").json()
+
+
+def test_unknown_relation_is_rejected(client):
+    assert client.get("/blog-post-sql/?_embed=author").status_code == 400
+    assert client.get("/blog-post-sql/1?_embed=author").status_code == 400
+
+
+def test_sort_by_related_column(client):
+    response = client.get("/blog-post-sql/?_start=0&_end=100&_sort=category.title&_order=asc&_embed=category")
+    titles = [post["category"]["title"] for post in response.json() if post["category"]]
+    assert titles == sorted(titles)
@@ -0,0 +1,90 @@
+"""Sequential, window and concurrent execution of the count + page queries"""
+import asyncio
+import os
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from core.config import settings
+from database.models import BlogPost
+from utils.count_strategy import CountStrategy
+from utils.query_builder import ExecutionMode, QueryBuilder
+
+STATUS_DRAFT = [{"field": "status", "operator": "eq", "value": "draft"}]
+
+
+def run_page(mode, skip=0, fields=None, filters=(), keyset=False):
+    """(ids, total, statements) of one page executed in the given mode"""
+    async def main():
+        engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"], poolclass=NullPool)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        try:
+            async with AsyncSession(engine) as session:
+                query_builder = (QueryBuilder(BlogPost).select_fields(fields).apply_filters(list(filters))
+                                 .use_count_strategy(CountStrategy.EXACT).use_execution_mode(mode))
+                if keyset:
+                    query_builder.apply_keyset_pagination(None, "id", "asc", 5)
+                else:
+                    query_builder.apply_sorting("id ASC").apply_pagination(skip, 5)
+                items, total = await query_builder.execute(session)
+        finally:
+            await engine.dispose()
+        ids = [item["id"] if fields else item.id for item in items]
+        return ids, total, statements
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("mode", list(ExecutionMode))
+@pytest.mark.parametrize("fields", [None, ["id", "title"]])
+def test_every_mode_returns_the_same_page_and_total(mode, fields):
+    ids, total, _ = run_page(mode, skip=5, fields=fields, filters=STATUS_DRAFT)
+    assert (ids, total) == ([18, 21, 24, 27, 30], 16)
+
+
+def test_window_mode_runs_one_statement():
+    _, total, statements = run_page(ExecutionMode.WINDOW)
+    assert total == 50
+    assert len(statements) == 1
+    assert "OVER ()" in statements[0]
+
+
+def test_window_mode_counts_separately_past_the_end():
+    ids, total, statements = run_page(ExecutionMode.WINDOW, skip=100)
+    assert (ids, total) == ([], 50)
+    assert len(statements) == 2
+
+
+def test_keyset_pages_never_use_the_window():
+    ids, total, statements = run_page(ExecutionMode.WINDOW, keyset=True)
+    assert (ids, total) == ([1, 2, 3, 4, 5], 50)
+    assert not [s for s in statements if "OVER ()" in s]
+
+
+def test_concurrent_mode_counts_on_a_second_connection():
+    connections = []
+
+    async def main():
+        engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"], poolclass=NullPool)
+        event.listen(engine.sync_engine, "connect", lambda dbapi_conn, record: connections.append(dbapi_conn))
+        try:
+            async with AsyncSession(engine) as session:
+                return await (QueryBuilder(BlogPost).apply_sorting("id ASC").apply_pagination(0, 5)
+                              .use_count_strategy(CountStrategy.EXACT)
+                              .use_execution_mode(ExecutionMode.CONCURRENT).execute(session))
+        finally:
+            await engine.dispose()
+
+    items, total = asyncio.run(main())
+    assert ([item.id for item in items], total) == ([1, 2, 3, 4, 5], 50)
+    assert len(connections) == 2
+
+
+@pytest.mark.parametrize("mode", [ExecutionMode.WINDOW, ExecutionMode.CONCURRENT])
+def test_list_endpoint_uses_the_configured_mode(client, monkeypatch, mode):
+    monkeypatch.setattr(settings, "LIST_EXECUTION_MODE", mode.value)
+    response = client.get("/blog-post-sql/?_start=0&_end=3&_sort=id&_order=asc&_count=exact")
+    assert response.status_code == 200
+    assert [post["id"] for post in response.json()] == [1, 2, 3]
+    assert response.headers["x-total-count"] == "50"
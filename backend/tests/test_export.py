@@ -0,0 +1,51 @@
+"""GET /blog-post-sql/export: every matching row streamed as NDJSON or CSV"""
+import csv
+import io
+import json
+import pytest
+from core.config import settings
+
+EXPORT = "/blog-post-sql/export"
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Several batches for the 50 seeded posts
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 7)
+
+
+def test_ndjson_streams_every_row_in_id_order(client):
+    response = client.get(EXPORT + "?_start=0&_end=5")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-disposition"] == 'attachment; filename="blog_posts.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # Pagination is ignored
+    assert [row["id"] for row in rows] == list(range(1, 51))
+    assert rows[0]["title"] == "Post 01 misc"
+    assert rows[0]["created_at"] == "2024-01-01T01:00:00"
+
+
+def test_csv_with_fields_filters_and_sorting(client):
+    response = client.get(EXPORT + "?format=csv&_fields=id,title&_sort=id&_order=desc"
+                                   "&filter[field]=id&filter[operator]=lte&filter[value]=3")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert list(csv.reader(io.StringIO(response.text))) == [
+        ["id", "title"], ["3", "Post 03 api"], ["2", "Post 02 misc"], ["1", "Post 01 misc"],
+    ]
+
+
+def test_empty_csv_export_still_has_a_header(client):
+    response = client.get(EXPORT + "?format=csv&_fields=id,title&filter[field]=id&filter[operator]=gt&filter[value]=999")
+    assert response.text == "id,title\r\n"
+
+
+def test_search(client):
+    rows = [json.loads(line) for line in client.get(EXPORT + "?q=api&_fields=id").text.splitlines()]
+    assert sorted(row["id"] for row in rows) == list(range(3, 51, 3))
+
+
+def test_invalid_query_is_rejected_before_streaming(client):
+    response = client.get(EXPORT + "?_fields=nope")
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"]["statusCode"] == 400
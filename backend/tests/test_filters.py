@@ -0,0 +1,112 @@
+import json
+import pytest
+from core.config import settings
+from conftest import post_rows
+from database.models import BlogPost
+from utils.model_metadata import get_model_metadata
+
+
+def ids_of(response):
+    assert response.status_code == 200, response.text
+    return sorted(post["id"] for post in response.json())
+
+
+def list_posts(client, **params):
+    return client.get("/blog-post-sql/", params={"_start": 0, "_end": 100, **params})
+
+
+@pytest.fixture
+def enforce_whitelist(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_WHITELIST_ENFORCED", True)
+
+
+def test_single_filter_triple(client):
+    response = list_posts(client, **{"filter[field]": "status", "filter[operator]": "eq", "filter[value]": "draft"})
+    assert ids_of(response) == [row["id"] for row in post_rows() if row["status"] == "draft"]
+
+
+def test_repeated_triples_are_anded(client):
+    response = client.get(
+        "/blog-post-sql/?_start=0&_end=100"
+        "&filter[field]=id&filter[operator]=gte&filter[value]=10"
+        "&filter[field]=title&filter[operator]=contains&filter[value]=api"
+    )
+    assert ids_of(response) == [i for i in range(10, 51) if i % 3 == 0]
+
+
+def test_compound_crud_filters(client):
+    filters = [{"operator": "or", "value": [
+        {"field": "id", "operator": "in", "value": [1, 2, 3]},
+        {"field": "title", "operator": "endswith", "value": "api"},
+    ]}, {"field": "id", "operator": "lte", "value": 12}]
+    response = list_posts(client, filters=json.dumps(filters))
+    assert ids_of(response) == [1, 2, 3, 6, 9, 12]
+
+
+def test_null_operator(client):
+    response = list_posts(client, **{"filter[field]": "category_id", "filter[operator]": "null", "filter[value]": ""})
+    assert ids_of(response) == [10, 20, 30, 40, 50]
+
+
+def test_filter_by_related_column(client):
+    response = list_posts(client, **{"filter[field]": "category.title", "filter[operator]": "eq", "filter[value]": "Science"})
+    assert ids_of(response) == [row["id"] for row in post_rows() if row["category_id"] == 2]
+
+
+def test_like_wildcards_match_literally(client):
+    response = list_posts(client, **{"filter[field]": "title", "filter[operator]": "contains", "filter[value]": "%"})
+    assert ids_of(response) == []
+
+
+@pytest.mark.parametrize("field,operator,value", [
+    ("nope", "eq", "1"),
+    ("id", "eq", "abc"),
+    ("id", "contains", "1"),
+    ("created_at", "gt", "yesterday"),
+    ("id", "between", "1"),
+])
+def test_invalid_filters_are_rejected(client, field, operator, value):
+    response = list_posts(client, **{"filter[field]": field, "filter[operator]": operator, "filter[value]": value})
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"]["statusCode"] == 400
+
+
+def test_invalid_filter_inside_group_is_rejected(client):
+    filters = [{"operator": "or", "value": [{"field": "id", "operator": "eq", "value": 1},
+                                            {"field": "nope", "operator": "eq", "value": 2}]}]
+    assert list_posts(client, filters=json.dumps(filters)).status_code == 400
+
+
+def test_unknown_sort_field_is_rejected(client):
+    assert list_posts(client, _sort="nope", _order="asc").status_code == 400
+
+
+def test_whitelist_rejects_unindexed_columns(client, enforce_whitelist):
+    assert list_posts(client, _sort="content", _order="asc").status_code == 400
+    response = list_posts(client, **{"filter[field]": "content", "filter[operator]": "gt", "filter[value]": "a"})
+    assert response.status_code == 400
+
+
+def test_whitelist_allows_indexed_and_trigram_columns(client, enforce_whitelist):
+    assert list_posts(client, _sort="title", _order="desc").status_code == 200
+    response = list_posts(client, **{"filter[field]": "content", "filter[operator]": "contains", "filter[value]": "body 1"})
+    assert ids_of(response) == [1] + list(range(10, 20))
+
+
+def test_whitelist_off_accepts_any_column(client, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_WHITELIST_ENFORCED", False)
+    response = list_posts(client, _sort="content", _order="asc")
+    assert response.status_code == 200
+    assert [post["content"] for post in response.json()] == sorted(f"body {i}" for i in range(1, 51))
+
+
+def test_unknown_related_fields_are_not_cached(client):
+    metadata = get_model_metadata(BlogPost)
+    for i in range(20):
+        response = list_posts(client, **{
+            "filter[field]": f"category.missing{i}", "filter[operator]": "eq", "filter[value]": "x"
+        })
+        assert response.status_code == 400
+    assert metadata.resolve("nope.title") is None
+    assert metadata.resolve("category.title").relation == "category"
+    assert set(metadata._related_columns) <= {"category.id", "category.title"}
@@ -0,0 +1,132 @@
+"""scripts/import_data.py: incremental parsing, checkpoints and rejected rows"""
+from pathlib import Path
+import csv
+import importlib.util
+import json
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "import_data.py"
+spec = importlib.util.spec_from_file_location("import_data", SCRIPT)
+import_data = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_data)
+
+
+def post(i, **overrides):
+    record = {"id": i, "title": f"t{i}", "content": f"c{i}", "category": {"id": 1},
+              "status": "draft", "createdAt": "2024-01-01T00:00:00Z"}
+    record.update(overrides)
+    return record
+
+
+class FakeCursor:
+    """The part of a psycopg2 cursor the importer uses, writing into FakeConnection.rows"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, buf):
+        rows = list(csv.reader(buf))
+        if any(int(row[0]) in self.conn.duplicates for row in rows):
+            raise ValueError("duplicate key")
+        self.conn.pending.extend(int(row[0]) for row in rows)
+
+    def execute(self, sql, params=None):
+        if sql.startswith("INSERT"):
+            if params[0] in self.conn.duplicates:
+                raise ValueError(f"duplicate key {params[0]}")
+            self.conn.pending.append(params[0])
+
+
+class FakeConnection:
+    def __init__(self, duplicates=()):
+        self.duplicates = set(duplicates)
+        self.rows, self.pending = [], []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.rows.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("as_ndjson", [False, True])
+def test_records_are_parsed_across_read_chunks(tmp_path, monkeypatch, as_ndjson):
+    monkeypatch.setattr(import_data, "READ_CHUNK_SIZE", 7)
+    records = [post(i, content="x" * i) for i in range(1, 20)]
+    path = tmp_path / "posts.json"
+    if as_ndjson:
+        path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    else:
+        path.write_text(json.dumps(records, indent=2))
+    assert list(import_data.iter_records(str(path))) == records
+
+
+def test_truncated_array_is_an_error(tmp_path):
+    path = tmp_path / "posts.json"
+    path.write_text('[{"id": 1}, {"id": ')
+    with pytest.raises(ValueError):
+        list(import_data.iter_records(str(path)))
+
+
+def test_batched():
+    assert [len(batch) for batch in import_data.batched(range(7), 3)] == [3, 3, 1]
+
+
+def test_copy_keeps_empty_strings_apart_from_null():
+    class Capture:
+        def copy_expert(self, sql, f):
+            self.data = f.read()
+    cur = Capture()
+    import_data._copy_rows(cur, import_data.CATEGORIES, [(1, ""), (2, None), (3, 'say "hi"')])
+    # An unquoted empty field is NULL to COPY, a quoted one is ''
+    assert cur.data.splitlines() == ['"1",""', '"2",', '"3","say ""hi"""']
+
+
+def test_batch_falls_back_to_rows_and_rejects_only_the_bad_ones(tmp_path):
+    conn = FakeConnection(duplicates={2})
+    rejects = import_data.RejectWriter(str(tmp_path / "rejects.ndjson"))
+    batch = [post(1), post(2), post(3), {"id": 4, "title": "no category"}]
+    written = import_data.write_batch(conn, import_data.BLOG_POSTS, batch, "copy", rejects)
+    rejects.close()
+
+    assert written == 2
+    assert conn.rows == [1, 3]
+    rejected = [json.loads(line) for line in (tmp_path / "rejects.ndjson").read_text().splitlines()]
+    assert [entry["record"]["id"] for entry in rejected] == [4, 2]
+    assert rejected[0]["error"].startswith("mapping:")
+
+
+def test_rerun_resumes_after_committed_batches(tmp_path, monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(import_data, "get_sync_connection", lambda: conn)
+    path = tmp_path / "posts.ndjson"
+    path.write_text("\n".join(json.dumps(post(i)) for i in range(1, 8)))
+
+    assert import_data.import_file(str(path), import_data.BLOG_POSTS, batch_size=3) == (7, 0)
+    checkpoint = json.loads((tmp_path / "posts.ndjson.checkpoint.json").read_text())
+    assert checkpoint == {"batch_size": 3, "completed_batches": [0, 1, 2]}
+
+    # Nothing left to do on a second run, everything again with resume=False
+    assert import_data.import_file(str(path), import_data.BLOG_POSTS, batch_size=3) == (0, 0)
+    assert import_data.import_file(str(path), import_data.BLOG_POSTS, batch_size=3, resume=False) == (7, 0)
+    assert len(conn.rows) == 14
+
+
+def test_checkpoint_with_another_batch_size_is_refused(tmp_path):
+    path = str(tmp_path / "posts.json.checkpoint.json")
+    import_data.Checkpoint(path, 100, resume=True).mark(0)
+    with pytest.raises(SystemExit):
+        import_data.Checkpoint(path, 50, resume=True)
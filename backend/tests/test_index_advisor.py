@@ -0,0 +1,48 @@
+import pytest
+from api.lifespan import _prime
+from core.config import settings
+from database.models import Base
+from utils.index_advisor import index_advisor
+
+FILTERED = "/blog-post-sql/?_start=0&_end=5&_sort=title&_order=asc&filter[field]=status&filter[operator]=eq&filter[value]=draft"
+
+
+@pytest.fixture(autouse=True)
+def empty_advisor():
+    index_advisor.reset()
+    yield
+    index_advisor.reset()
+
+
+def report():
+    return index_advisor.report(Base.metadata.tables)
+
+
+def test_sampled_shapes_are_recorded(client, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_ADVISOR_SAMPLE_RATE", 1.0)
+    for _ in range(3):
+        client.get(FILTERED)
+    (entry,) = report()
+    assert entry["hits"] == 3
+    assert entry["shape"]["table"] == "blog_posts"
+
+
+def test_sample_rate_zero_records_nothing(client, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_ADVISOR_SAMPLE_RATE", 0.0)
+    client.get(FILTERED)
+    assert report() == []
+
+
+def test_unenforced_whitelist_accepts_and_records_unindexed_columns(client, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_ADVISOR_SAMPLE_RATE", 1.0)
+    response = client.get("/blog-post-sql/?_start=0&_end=5&_sort=content&_order=asc")
+    assert response.status_code == 200
+    (entry,) = report()
+    assert entry["served"] is False
+    assert entry["suggestion"]["columns"] == ["content"]
+
+
+def test_warmup_queries_are_not_recorded(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "INDEX_ADVISOR_SAMPLE_RATE", 1.0)
+    run_db(_prime)
+    assert report() == []
@@ -0,0 +1,149 @@
+"""Local bearer token verification, key rotation and the verified-token cache"""
+import time
+import jwt
+import pytest
+from core.config import settings
+from utils import jwt_auth
+from utils.jwt_auth import TokenError, key_ring, token_cache, verify_token
+
+SECRET = "test-secret-that-is-long-enough-for-hs256"
+
+
+@pytest.fixture(autouse=True)
+def keys(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_SECRET", SECRET)
+    monkeypatch.setattr(settings, "JWT_KEYS", {})
+    monkeypatch.setattr(settings, "JWT_ALGORITHMS", ["HS256"])
+    monkeypatch.setattr(settings, "AUTH_DEV_BYPASS", False)
+    key_ring.reload()
+    yield
+    monkeypatch.undo()
+    key_ring.reload()
+
+
+def make_token(secret=SECRET, algorithm="HS256", headers=None, **claims):
+    payload = {"sub": "42", "email": "u@example.com", "roles": ["editor"], "exp": int(time.time()) + 300}
+    payload.update(claims)
+    return jwt.encode({k: v for k, v in payload.items() if v is not None}, secret,
+                      algorithm=algorithm, headers=headers)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Number of signature verifications actually performed"""
+    calls = []
+    real = jwt_auth.jwt.decode
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return real(*args, **kwargs)
+    monkeypatch.setattr(jwt_auth.jwt, "decode", counting)
+    return calls
+
+
+def test_valid_token_resolves_the_user():
+    user = verify_token(make_token(roles="admin, editor"))
+    assert (user.id, user.email, user.roles) == ("42", "u@example.com", ("admin", "editor"))
+    assert user.role == "admin" and user.has_role("editor")
+
+
+def test_verified_tokens_are_cached(decodes):
+    token = make_token()
+    assert verify_token(token) == verify_token(token)
+    assert len(decodes) == 1
+    # Keyed by a SHA-256 digest; the raw token is not kept
+    assert list(token_cache._data) == [jwt_auth._token_key(token)]
+
+
+def test_failures_are_not_cached(decodes):
+    token = make_token(secret="another-secret-that-is-long-enough-too")
+    for _ in range(2):
+        with pytest.raises(TokenError):
+            verify_token(token)
+    assert len(decodes) == 2
+
+
+@pytest.mark.parametrize("claims", [
+    {"exp": int(time.time()) - 120},   # expired beyond the leeway
+    {"exp": None},                     # exp is required
+    {"sub": None},                     # sub is required
+])
+def test_invalid_claims_are_rejected(claims):
+    with pytest.raises(TokenError):
+        verify_token(make_token(**claims))
+
+
+def test_wrong_signature_is_rejected():
+    with pytest.raises(TokenError):
+        verify_token(make_token(secret="not-the-secret-but-just-as-long-as-it"))
+
+
+def test_algorithms_outside_the_allow_list_are_rejected():
+    with pytest.raises(TokenError, match="not allowed"):
+        verify_token(make_token(secret=SECRET * 2, algorithm="HS512"))
+    unsigned = jwt.encode({"sub": "42", "exp": int(time.time()) + 60}, None, algorithm="none")
+    with pytest.raises(TokenError, match="not allowed"):
+        verify_token(unsigned)
+
+
+def test_malformed_token():
+    with pytest.raises(TokenError, match="Malformed"):
+        verify_token("not.a.token")
+
+
+def test_issuer_and_audience_are_enforced(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_ISSUER", "https://issuer")
+    monkeypatch.setattr(settings, "JWT_AUDIENCE", "api")
+    assert verify_token(make_token(iss="https://issuer", aud="api")).id == "42"
+    with pytest.raises(TokenError):
+        verify_token(make_token(iss="https://other", aud="api"))
+    with pytest.raises(TokenError):
+        verify_token(make_token(iss="https://issuer", aud="web"))
+
+
+def test_key_rotation_by_kid(monkeypatch):
+    old, new = "old-secret-that-is-long-enough-for-hs256", "new-secret-that-is-long-enough-for-hs256"
+    monkeypatch.setattr(settings, "JWT_SECRET", None)
+    monkeypatch.setattr(settings, "JWT_KEYS", {"old": old, "new": new})
+    key_ring.reload()
+    old_token = make_token(secret=old, headers={"kid": "old"})
+    assert verify_token(make_token(secret=new, headers={"kid": "new"})).id == "42"
+    assert verify_token(old_token).id == "42"
+    with pytest.raises(TokenError, match="Unknown signing key"):
+        verify_token(make_token(secret=new, headers={"kid": "other"}))
+    # A kid signed with the other key does not verify
+    with pytest.raises(TokenError):
+        verify_token(make_token(secret=old, headers={"kid": "new"}))
+
+    # Retiring a key also drops the tokens it verified from the cache
+    monkeypatch.setattr(settings, "JWT_KEYS", {"new": new})
+    key_ring.reload()
+    with pytest.raises(TokenError):
+        verify_token(old_token)
+
+
+def test_cache_entry_does_not_outlive_the_token(monkeypatch):
+    token = make_token(exp=int(time.time()) + 2)
+    verify_token(token)
+    expires_at = token_cache._data[jwt_auth._token_key(token)][0]
+    assert expires_at - time.monotonic() <= 2
+
+
+def test_endpoints_require_a_valid_token(client):
+    response = client.get("/internal/pool")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert client.get("/internal/pool", headers={"Authorization": "Bearer junk"}).status_code == 401
+
+
+def test_admin_routes_check_the_role(client):
+    user = {"Authorization": f"Bearer {make_token()}"}
+    admin = {"Authorization": f"Bearer {make_token(roles=['admin'])}"}
+    assert client.get("/internal/pool", headers=user).status_code == 403
+    assert client.get("/internal/pool", headers=admin).status_code == 200
+    assert client.get("/blog-post-sql/many?id=1", headers=user).status_code == 200
+
+
+def test_dev_bypass_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_DEV_BYPASS", True)
+    assert client.get("/internal/pool").status_code == 200
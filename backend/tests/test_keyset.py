@@ -0,0 +1,75 @@
+import sqlite3
+import pytest
+from conftest import PRIMARY_PATH, post_rows
+
+
+def get_page(client, cursor, sort, order, limit):
+    response = client.get("/blog-post-sql/", params={"_cursor": cursor, "_page": 1, "_limit": limit, "_sort": sort, "_order": order})
+    assert response.status_code == 200, response.text
+    ids = [post["id"] for post in response.json()]
+    assert len(ids) <= limit
+    return ids, response.headers
+
+
+def walk(client, sort, order, limit=7):
+    """Follow X-Next-Cursor to the end, then X-Prev-Cursor back; returns both id sequences"""
+    forward, cursor = [], ""
+    while cursor is not None:
+        ids, headers = get_page(client, cursor, sort, order, limit)
+        forward += ids
+        cursor = headers.get("x-next-cursor")
+
+    backward, cursor = ids, headers.get("x-prev-cursor")
+    while cursor is not None:
+        ids, headers = get_page(client, cursor, sort, order, limit)
+        backward = ids + backward
+        cursor = headers.get("x-prev-cursor")
+    return forward, backward
+
+
+def expected_order(rows, field, order):
+    # NULL sort values come last in either direction
+    present = sorted((r for r in rows if r[field] is not None), key=lambda r: (r[field], r["id"]), reverse=order == "desc")
+    missing = sorted((r for r in rows if r[field] is None), key=lambda r: r["id"], reverse=order == "desc")
+    return [r["id"] for r in present + missing]
+
+
+@pytest.mark.parametrize("sort,order", [("id", "asc"), ("id", "desc"), ("title", "asc"), ("created_at", "desc")])
+def test_cursor_walk_covers_every_row_once(client, sort, order):
+    forward, backward = walk(client, sort, order)
+    assert forward == expected_order(post_rows(), sort, order)
+    assert backward == forward
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_walk_includes_null_sort_values(client, order):
+    with sqlite3.connect(PRIMARY_PATH) as conn:
+        conn.execute("UPDATE blog_posts SET created_at = NULL WHERE id % 4 = 0")
+    rows = [dict(row, created_at=None if row["id"] % 4 == 0 else row["created_at"]) for row in post_rows()]
+
+    forward, backward = walk(client, "created_at", order)
+    assert forward == expected_order(rows, "created_at", order)
+    assert backward == forward
+
+
+def test_total_count_is_the_whole_result(client):
+    response = client.get("/blog-post-sql/", params={"_cursor": "", "_page": 1, "_limit": 5, "_sort": "id", "_order": "asc"})
+    assert response.headers["x-total-count"] == "50"
+    assert "x-prev-cursor" not in response.headers
+
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get("/blog-post-sql/", params={"_cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_cursor_from_another_sort_is_rejected(client):
+    first = client.get("/blog-post-sql/", params={"_cursor": "", "_page": 1, "_limit": 5, "_sort": "title", "_order": "asc"})
+    cursor = first.headers["x-next-cursor"]
+    response = client.get("/blog-post-sql/", params={"_cursor": cursor, "_page": 1, "_limit": 5, "_sort": "id", "_order": "asc"})
+    assert response.status_code == 400
+
+
+def test_cursor_cannot_sort_by_related_column(client):
+    response = client.get("/blog-post-sql/", params={"_cursor": "", "_sort": "category.title", "_order": "asc"})
+    assert response.status_code == 400
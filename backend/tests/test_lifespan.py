@@ -0,0 +1,71 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncConnection
+from api.lifespan import StartupState, startup_state
+from api.main import app
+from core.config import settings
+from utils.query_builder import QueryBuilder
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    state = StartupState()
+    monkeypatch.setattr(startup_state, "__dict__", state.__dict__)
+    return startup_state
+
+
+def wait_until_ready(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.status_code == 200 or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def one_connection_guard(monkeypatch):
+    """
+    Fail concurrent execution on a session bound to a single connection
+
+    aiosqlite serializes the two queries, but asyncpg rejects a second
+    operation while one is in progress on the connection.
+    """
+    original = QueryBuilder._execute_concurrent
+
+    async def guarded(self, db):
+        if isinstance(db.bind, AsyncConnection):
+            raise RuntimeError("another operation is in progress")
+        return await original(self, db)
+    monkeypatch.setattr(QueryBuilder, "_execute_concurrent", guarded)
+
+
+@pytest.mark.parametrize("mode", ["sequential", "window", "concurrent"])
+def test_warmup_becomes_ready(monkeypatch, fresh_state, one_connection_guard, mode):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMUP_CONNECTIONS", 2)
+    monkeypatch.setattr(settings, "LIST_EXECUTION_MODE", mode)
+    with TestClient(app) as client:
+        response = wait_until_ready(client)
+        assert response.status_code == 200, response.json()
+        body = response.json()
+        assert body["attempts"] == 1
+        assert body["error"] is None
+        assert {"engine", "connections", "prime", "warmup"} <= set(body["timings"])
+        # Requests still run in the configured mode after warmup
+        assert client.get("/blog-post-sql/?_start=0&_end=5").headers["x-total-count"] == "50"
+
+
+def test_not_ready_until_warmup_finishes(monkeypatch, fresh_state):
+    monkeypatch.setattr(settings, "WARMUP_ENABLED", True)
+
+    async def never(state):
+        await asyncio.Event().wait()
+    monkeypatch.setattr("api.lifespan._warmup_until_ready", never)
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json()["ready"] is False
@@ -0,0 +1,102 @@
+"""Queued, structured and sampled logging with request ids"""
+import json
+import logging
+import queue
+import sys
+from types import SimpleNamespace
+import pytest
+from core import log_config
+from core.config import settings
+from core.log_config import (
+    DroppingQueueHandler, JsonFormatter, RequestContextFilter, SamplingFilter, request_id_var
+)
+
+
+def make_record(name="app", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def request_id():
+    token = request_id_var.set("req-1")
+    yield "req-1"
+    request_id_var.reset(token)
+
+
+def test_request_id_header_is_generated_or_echoed(client):
+    generated = client.get("/openapi.json").headers["x-request-id"]
+    assert len(generated) == 32
+    assert client.get("/openapi.json", headers={"X-Request-ID": "abc-123"}).headers["x-request-id"] == "abc-123"
+    # Malformed ids are replaced, not reflected
+    assert client.get("/openapi.json", headers={"X-Request-ID": "bad id\t!"}).headers["x-request-id"] != "bad id\t!"
+
+
+def test_records_are_stamped_with_the_request_id(request_id):
+    record = make_record()
+    RequestContextFilter().filter(record)
+    assert record.request_id == "req-1"
+    request_id_var.set(None)
+    RequestContextFilter().filter(record)
+    assert record.request_id == "-"
+
+
+def test_sampling_keeps_warnings_and_uses_the_longest_prefix():
+    sampler = SamplingFilter({"api": 0.0, "api.keep": 1.0})
+    assert sampler.filter(make_record("api.dependencies", logging.WARNING))
+    assert not sampler.filter(make_record("api.dependencies"))
+    assert sampler.filter(make_record("api.keep.child"))
+    assert sampler.filter(make_record("apifoo"))
+
+
+def test_sampling_decides_once_per_request():
+    sampler = SamplingFilter({"api": 0.5})
+    decisions = {
+        request_id: {sampler.filter(make_record("api.x", request_id=request_id)) for _ in range(5)}
+        for request_id in (f"request-{i}" for i in range(40))
+    }
+    assert all(len(kept) == 1 for kept in decisions.values())
+    # ...and roughly half of the requests are kept
+    assert 5 < sum(kept == {True} for kept in decisions.values()) < 35
+
+
+def test_json_formatter_includes_extra_fields_and_exceptions():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(route="/x", duration_ms=1.5, request_id="req-9")
+        record.exc_info = sys.exc_info()
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO" and entry["logger"] == "app"
+    assert (entry["route"], entry["duration_ms"], entry["request_id"]) == ("/x", 1.5, "req-9")
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr(DroppingQueueHandler, "dropped", 0)
+    handler = DroppingQueueHandler(queue.Queue(1))
+    args = ["mutable"]
+    handler.handle(make_record(msg="%s", args=(args,)))
+    handler.handle(make_record())
+    assert DroppingQueueHandler.dropped == 1
+    args.append("changed later")
+    # The message was rendered in the calling thread
+    assert handler.queue.get_nowait().msg == "['mutable']"
+
+
+def test_configure_logging_writes_json_lines_from_the_listener(capsys, request_id):
+    options = SimpleNamespace(LOG_FORMAT="json", LOG_QUEUE_SIZE=100, LOG_SAMPLE_RATES={},
+                              LOG_LEVEL="INFO", LOG_LEVELS={"noisy": "ERROR"})
+    try:
+        log_config.configure_logging(options)
+        logging.getLogger("tests.logging").info("queued %d", 7, extra={"route": "/y"})
+        logging.getLogger("noisy").warning("filtered by its level")
+        log_config._listener.stop()
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    finally:
+        log_config._listener = None
+        log_config.configure_logging(settings)
+        logging.getLogger("noisy").setLevel(logging.NOTSET)
+    assert [(line["message"], line["route"], line["request_id"]) for line in lines] == [("queued 7", "/y", "req-1")]
@@ -0,0 +1,74 @@
+"""Request/DB metrics, the /metrics exposition and per-statement timing"""
+import re
+import pytest
+from sqlalchemy import create_engine, exc, text
+from core.config import settings
+from database.instrumentation import _STARTED_KEY
+from utils.metrics import MetricsRegistry
+
+
+def metric_value(body, name, **labels):
+    """Value of one sample in a Prometheus text exposition, or None"""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = rf"^{re.escape(name)}{re.escape('{' + wanted + '}') if labels else ''} (\S+)$"
+    match = re.search(pattern, body, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_counted_by_route_template(client):
+    before = client.get("/metrics").text
+    labels = {"method": "GET", "route": "/blog-post-sql/{post_id}", "status": "200"}
+    start = metric_value(before, "http_requests_total", **labels) or 0
+    queries = metric_value(before, "db_queries_total", route="/blog-post-sql/{post_id}") or 0
+    for post_id in (1, 2):
+        client.get(f"/blog-post-sql/{post_id}")
+    after = client.get("/metrics").text
+    assert metric_value(after, "http_requests_total", **labels) == start + 2
+    assert metric_value(after, "db_queries_total", route="/blog-post-sql/{post_id}") >= queries + 2
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/blog-post-sql/{post_id}",le="+Inf"}' in after
+
+
+def test_pool_overflow_is_never_negative(client):
+    client.get("/blog-post-sql/1")
+    body = client.get("/metrics").text
+    assert metric_value(body, "db_pool_overflow") == 0
+    assert metric_value(body, "db_pool_checkouts_total") >= 1
+    assert client.get("/internal/pool").json()["overflow"] == 0
+
+
+def test_server_timing_header(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_SERVER_TIMING", True)
+    value = client.get("/blog-post-sql/1").headers["server-timing"]
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"', value)
+
+
+def test_failed_statement_leaves_no_timing_behind():
+    engine = create_engine("sqlite://")
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(exc.OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info[_STARTED_KEY] == []
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.info[_STARTED_KEY] == []
+    finally:
+        engine.dispose()
+
+
+def test_registry_renders_counters_gauges_and_histograms():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits", ("route",))
+    depth = registry.gauge("depth", "Depth")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    hits.inc('/a"b')
+    hits.inc('/a"b', amount=2)
+    depth.inc()
+    depth.dec()
+    latency.observe(0.5)
+    body = registry.render()
+    assert 'hits_total{route="/a\\"b"} 3' in body
+    assert metric_value(body, "depth") == 0
+    assert 'latency_seconds_bucket{le="0.1"} 0' in body
+    assert 'latency_seconds_bucket{le="1"} 1' in body
+    assert metric_value(body, "latency_seconds_count") == 1
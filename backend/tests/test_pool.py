@@ -0,0 +1,78 @@
+"""Engine factory: pool sizing from the connection budget and checkout instrumentation"""
+import asyncio
+import os
+import pytest
+from sqlalchemy import exc, text
+from core.config import settings
+from database import core
+from database.pool import InstrumentedAsyncPool, pool_stats
+
+
+@pytest.mark.parametrize("budget, workers, pool_size, max_overflow, expected", [
+    (30, 1, None, None, (20, 10)),
+    (30, 4, None, None, (4, 3)),
+    (30, 64, None, None, (1, 0)),
+    (30, 2, 5, None, (5, 10)),
+    (30, 2, 5, 2, (5, 2)),
+])
+def test_pool_dimensions_split_the_budget_across_workers(monkeypatch, budget, workers, pool_size, max_overflow, expected):
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", budget)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", workers)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", pool_size)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", max_overflow)
+    assert core.pool_dimensions() == expected
+
+
+def test_asyncpg_engines_get_the_statement_cache_settings(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(core, "create_async_engine", lambda url, **options: captured.update(url=url, **options))
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 250)
+    core.create_async_engine_from_settings("postgresql+asyncpg://u:p@db/app")
+
+    assert captured["url"].query == {"prepared_statement_cache_size": "250"}
+    assert captured["connect_args"]["statement_cache_size"] == 250
+    assert captured["connect_args"]["command_timeout"] == settings.DB_COMMAND_TIMEOUT
+    assert captured["poolclass"] is InstrumentedAsyncPool
+    assert (captured["pool_size"], captured["max_overflow"]) == core.pool_dimensions()
+
+
+def test_other_drivers_get_no_asyncpg_arguments(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(core, "create_async_engine", lambda url, **options: captured.update(url=url, **options))
+    core.create_async_engine_from_settings(os.environ["ASYNC_DATABASE_URL"])
+    assert "connect_args" not in captured
+    assert not captured["url"].query
+
+
+def test_checkouts_and_timeouts_are_recorded(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+
+    async def main():
+        engine = core.create_async_engine_from_settings(os.environ["ASYNC_DATABASE_URL"])
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                # The only connection is checked out: the next checkout times out
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+                busy = pool_stats(engine)
+            return busy, pool_stats(engine)
+        finally:
+            await engine.dispose()
+
+    busy, idle = asyncio.run(main())
+    assert busy["pool_class"] == "InstrumentedAsyncPool"
+    assert busy["checkedout"] == 1
+    assert idle["checkouts"] == 2
+    assert idle["timeouts"] == 1
+    assert idle["max_wait_seconds"] >= 0.05
+    assert idle["checkedout"] == 0
+
+
+def test_pool_endpoint(client):
+    body = client.get("/internal/pool").json()
+    assert body["configured"] == dict(zip(("pool_size", "max_overflow"), core.pool_dimensions()))
+    assert body["pool_class"] == "InstrumentedAsyncPool"
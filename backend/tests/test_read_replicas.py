@@ -0,0 +1,113 @@
+"""Read routing with a primary and a replica, each its own SQLite file"""
+import asyncio
+import sqlite3
+import pytest
+import database.routing
+from database.core import AsyncSessionLocal
+from database.routing import PIN_COOKIE, DatabaseRouter
+from conftest import DATA_DIR, seed_database
+
+REPLICA_PATH = DATA_DIR / "replica.db"
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A replica holding the seed data with every title marked, so reads show where they went"""
+    seed_database(f"sqlite:///{REPLICA_PATH}")
+    with sqlite3.connect(REPLICA_PATH) as conn:
+        conn.execute("UPDATE blog_posts SET title = 'replica ' || title")
+    router = DatabaseRouter(AsyncSessionLocal, [f"sqlite+aiosqlite:///{REPLICA_PATH}"])
+    monkeypatch.setattr(database.routing, "db_router", router)
+    yield router
+    asyncio.run(router.dispose())
+
+
+def test_reads_go_to_the_replica(client, replica):
+    assert client.get("/blog-post-sql/1").json()["title"] == "replica Post 01 misc"
+    assert client.get("/blog-post-sql/?_start=0&_end=1&_sort=id&_order=asc").json()[0]["title"].startswith("replica")
+    assert PIN_COOKIE not in client.cookies
+
+
+def test_write_pins_the_client_to_the_primary(client, replica):
+    response = client.post("/blog-post-sql/bulk", json=[{"title": "fresh", "content": "new"}])
+    assert response.status_code == 201
+    assert PIN_COOKIE in response.cookies
+    assert "httponly" in response.headers["set-cookie"].lower()
+    new_id = response.json()[0]["id"]
+
+    # The writer reads its own write from the primary...
+    assert client.get(f"/blog-post-sql/{new_id}").json()["title"] == "fresh"
+    assert client.get("/blog-post-sql/1").json()["title"] == "Post 01 misc"
+    # ...while other clients keep reading the (lagging) replica
+    client.cookies.clear()
+    assert client.get(f"/blog-post-sql/{new_id}").status_code == 404
+
+
+def test_failed_write_does_not_pin(client, replica):
+    response = client.post("/blog-post-sql/bulk", json=[{"content": "no title"}])
+    assert response.status_code == 422
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_expired_pin_reads_the_replica_again(client, replica):
+    client.cookies.set(PIN_COOKIE, "1")
+    assert client.get("/blog-post-sql/1").json()["title"].startswith("replica")
+
+
+def test_unreachable_replica_falls_back_to_the_primary(client, monkeypatch):
+    router = DatabaseRouter(AsyncSessionLocal, [f"sqlite+aiosqlite:///{DATA_DIR}/missing/replica.db"])
+    monkeypatch.setattr(database.routing, "db_router", router)
+    assert client.get("/blog-post-sql/1").json()["title"] == "Post 01 misc"
+    assert router.describe()["replicas"][0]["healthy"] is False
+
+
+def test_without_replicas_writes_set_no_cookie(client):
+    response = client.post("/blog-post-sql/bulk", json=[{"title": "fresh"}])
+    assert response.status_code == 201
+    assert "set-cookie" not in response.headers
+
+
+def test_pin_cookie_is_set_inside_the_request_id_middleware(client, replica):
+    response = client.delete("/blog-post-sql/bulk?id=1")
+    assert PIN_COOKIE in response.cookies
+    assert response.headers["x-request-id"]
+
+
+def stalled_router(monkeypatch, stall):
+    """A router whose replica's health probe does not answer for `stall` seconds"""
+    router = DatabaseRouter(AsyncSessionLocal, [f"sqlite+aiosqlite:///{REPLICA_PATH}"], probe_timeout=0.05)
+
+    async def lag(replica):
+        await asyncio.sleep(stall)
+        return 0.0
+    monkeypatch.setattr(router, "_replication_lag", lag)
+    return router
+
+
+def test_stalled_probe_times_out(monkeypatch):
+    router = stalled_router(monkeypatch, stall=60)
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        chosen = await router.choose_replica()
+        return chosen, asyncio.get_running_loop().time() - started
+
+    chosen, elapsed = asyncio.run(main())
+    assert chosen is None
+    assert elapsed < 1
+    assert router.describe()["replicas"][0]["healthy"] is False
+
+
+def test_requests_do_not_queue_behind_a_running_probe(monkeypatch):
+    router = stalled_router(monkeypatch, stall=0.03)
+
+    async def main():
+        probing = asyncio.create_task(router.choose_replica())
+        await asyncio.sleep(0)
+        # Meanwhile: last known health (not probed yet, so not used), no waiting
+        waiting = await asyncio.wait_for(router.choose_replica(), 0.01)
+        return waiting, await probing
+
+    waiting, probed = asyncio.run(main())
+    assert waiting is None
+    assert probed is router.replicas[0]
@@ -0,0 +1,59 @@
+from api.resources import resources
+from database.models import Category
+
+
+def test_categories_list(client):
+    response = client.get("/categories/?_start=1&_end=3&_sort=id&_order=asc")
+    assert response.status_code == 200
+    assert response.json() == [{"id": 2, "title": "Science"}, {"id": 3, "title": "Travel"}]
+    assert response.headers["x-total-count"] == "5"
+
+
+def test_categories_filters_and_fields(client):
+    response = client.get(
+        "/categories/?filter[field]=title&filter[operator]=contains&filter[value]=o&_fields=title&_sort=title&_order=desc"
+    )
+    assert response.json() == [{"id": 1, "title": "Technology"}, {"id": 5, "title": "Sports"}, {"id": 4, "title": "Food"}]
+    assert response.headers["x-total-count"] == "3"
+
+
+def test_categories_keyset_cursor(client):
+    first = client.get("/categories/?_cursor=&_page=1&_limit=2&_sort=id&_order=asc")
+    assert [row["id"] for row in first.json()] == [1, 2]
+    cursor = first.headers["x-next-cursor"]
+    second = client.get(f"/categories/?_cursor={cursor}&_page=1&_limit=2&_sort=id&_order=asc")
+    assert [row["id"] for row in second.json()] == [3, 4]
+    assert "x-prev-cursor" in second.headers
+
+
+def test_categories_many_and_detail(client):
+    many = client.get("/categories/many?id=3&id=1&id=9")
+    assert [row["id"] for row in many.json()] == [3, 1]
+    assert many.headers["x-missing-ids"] == "9"
+    assert client.get("/categories/4").json() == {"id": 4, "title": "Food"}
+
+
+def test_unknown_category_is_404(client):
+    response = client.get("/categories/99")
+    assert response.status_code == 404
+    assert response.json()["detail"] == {"error": {"message": "Category not found", "statusCode": 404}}
+
+
+def test_invalid_queries_are_400(client):
+    for url in ("/categories/abc", "/categories/?_sort=nope&_order=asc"):
+        response = client.get(url)
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"]["statusCode"] == 400
+
+
+def test_blog_posts_share_the_error_body(client):
+    response = client.get("/blog-post-sql/?_sort=nope&_order=asc")
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"]["statusCode"] == 400
+
+
+def test_registered_plan(client):
+    plan = resources["categories"]
+    assert plan.model_class is Category
+    assert plan.columns == ["id", "title"]
+    assert not plan.versioned
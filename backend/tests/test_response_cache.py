@@ -0,0 +1,51 @@
+"""Response cache behaviour, using the in-process backend as a stand-in for the shared one"""
+import pytest
+from utils.response_cache import MemoryCacheBackend, response_cache, set_cache_backend
+
+LIST = "/blog-post-sql/?_start=0&_end=5&_sort=id&_order=asc"
+
+
+@pytest.fixture
+def cache():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=1024 * 1024)
+    set_cache_backend(backend)
+    return backend
+
+
+def test_second_request_is_a_hit(client, cache):
+    first = client.get(LIST)
+    second = client.get(LIST)
+    assert "x-cache" not in first.headers
+    assert second.headers["x-cache"] == "hit"
+    assert second.json() == first.json()
+    assert second.headers["x-total-count"] == first.headers["x-total-count"]
+    assert second.headers["etag"] == first.headers["etag"]
+    assert cache.stats.hits == 1
+
+
+def test_query_parameter_order_does_not_matter(client, cache):
+    client.get("/blog-post-sql/?_start=0&_end=5&_sort=id&_order=asc")
+    assert client.get("/blog-post-sql/?_order=asc&_sort=id&_end=5&_start=0").headers.get("x-cache") == "hit"
+
+
+def test_write_invalidates_cached_lists_and_details(client, cache):
+    client.get(LIST)
+    client.get("/blog-post-sql/1")
+    response = client.patch("/blog-post-sql/bulk", json={"ids": [1], "values": {"title": "renamed"}})
+    assert response.status_code == 200
+    assert client.get(LIST).json()[0]["title"] == "renamed"
+    assert client.get("/blog-post-sql/1").json()["title"] == "renamed"
+    assert cache.stats.invalidations >= 2
+
+
+def test_cached_etag_answers_304(client, cache):
+    etag = client.get(LIST).headers["etag"]
+    assert client.get(LIST, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_entries_expire(client):
+    now = [0.0]
+    set_cache_backend(MemoryCacheBackend(max_entries=100, max_bytes=1024 * 1024, clock=lambda: now[0]))
+    client.get(LIST)
+    now[0] += response_cache.ttl + 1
+    assert "x-cache" not in client.get(LIST).headers
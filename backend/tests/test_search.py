@@ -0,0 +1,43 @@
+"""q on SQLite: the ILIKE fallback of utils/search.py"""
+
+
+def search(client, q, **params):
+    response = client.get("/blog-post-sql/", params={"_start": 0, "_end": 100, "q": q, **params})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_every_word_must_match_some_search_column(client):
+    response = search(client, "api")
+    assert sorted(post["id"] for post in response.json()) == list(range(3, 51, 3))
+    assert response.headers["x-total-count"] == "16"
+    # "body" only appears in content and "api" only in titles
+    assert sorted(post["id"] for post in search(client, "api body 4").json()) == [24, 42, 45, 48]
+
+
+def test_search_is_case_insensitive_and_literal(client):
+    assert len(search(client, "API").json()) == 16
+    assert search(client, "100%").json() == []
+
+
+def test_title_matches_rank_first(client):
+    ids = [post["id"] for post in search(client, "post 03").json()]
+    assert ids[0] == 3
+
+
+def test_search_combines_with_filters_and_sorting(client):
+    response = search(client, "api", _sort="id", _order="desc",
+                      **{"filter[field]": "status", "filter[operator]": "eq", "filter[value]": "draft"})
+    assert [post["id"] for post in response.json()] == list(range(48, 0, -3))
+
+
+def test_search_with_cursor_pagination(client):
+    first = search(client, "api", _cursor="", _page=1, _limit=10, _sort="id", _order="asc")
+    second = search(client, "api", _cursor=first.headers["x-next-cursor"], _page=1, _limit=10, _sort="id", _order="asc")
+    assert [post["id"] for post in first.json() + second.json()] == list(range(3, 51, 3))
+
+
+def test_export_applies_search(client):
+    response = client.get("/blog-post-sql/export", params={"q": "api", "format": "csv"})
+    assert response.status_code == 200
+    assert len(response.text.strip().splitlines()) == 17
@@ -0,0 +1,66 @@
+"""FAST_SERIALIZATION: row mappings encoded directly, same JSON as the ORM path"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+import json
+import pytest
+from api import blog_post_sql
+from core.config import settings
+from utils import serialization
+
+URLS = [
+    "/blog-post-sql/?_start=0&_end=10&_sort=id&_order=asc",
+    "/blog-post-sql/?_start=0&_end=10&_sort=id&_order=asc&_embed=category",
+    "/blog-post-sql/7",
+    "/blog-post-sql/7?_embed=category",
+    "/blog-post-sql/10?_embed=category",
+]
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_fast_path_matches_the_orm_path(client, monkeypatch, url):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+    expected = client.get(url)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    fast = client.get(url)
+    assert fast.status_code == expected.status_code == 200
+    assert fast.json() == expected.json()
+    assert fast.headers.get("x-total-count") == expected.headers.get("x-total-count")
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_fast_path_skips_jsonable_encoder(client, monkeypatch, url):
+    def fail(*args, **kwargs):
+        raise AssertionError("jsonable_encoder called")
+    monkeypatch.setattr(blog_post_sql, "jsonable_encoder", fail)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    assert client.get(url).status_code == 200
+
+
+VALUES = {
+    "when": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    "naive": datetime(2024, 5, 1, 12, 30),
+    "price": Decimal("1.50"),
+    "uuid": UUID("12345678-1234-5678-1234-567812345678"),
+    "text": "café",
+    "none": None,
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_encodes_common_column_types(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(serialization.dumps(VALUES)) == {
+        "when": "2024-05-01T12:30:00+00:00",
+        "naive": "2024-05-01T12:30:00",
+        "price": "1.50",
+        "uuid": "12345678-1234-5678-1234-567812345678",
+        "text": "café",
+        "none": None,
+    }
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        serialization.dumps({"value": object()})
@@ -0,0 +1,134 @@
+import asyncio
+import os
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from database.models import BlogPost
+from utils.count_strategy import CountStrategy
+from utils.query_builder import QueryBuilder
+from utils.single_flight import SingleFlight, list_flights
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def main():
+        flights = SingleFlight("test")
+        release = asyncio.Event()
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.create_task(flights.do("key", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flights.in_flight() == 1
+        release.set()
+        results = await asyncio.gather(*tasks)
+        assert flights.in_flight() == 0
+        return results
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == "value" for value, _ in results)
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flights = SingleFlight("test")
+
+        async def fetch(value):
+            await asyncio.sleep(0)
+            return value
+        return await asyncio.gather(flights.do("a", lambda: fetch(1)), flights.do("b", lambda: fetch(2)))
+
+    assert asyncio.run(main()) == [(1, False), (2, False)]
+
+
+def test_errors_reach_every_waiter():
+    async def main():
+        flights = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+        return await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_waiter_takes_over_when_the_leader_is_cancelled():
+    calls = []
+
+    async def main():
+        flights = SingleFlight("test")
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        leader = asyncio.create_task(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flights.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == (2, False)
+
+
+def test_nothing_is_kept_after_the_flight():
+    async def main():
+        flights = SingleFlight("test")
+        counter = iter(range(10))
+
+        async def fetch():
+            return next(counter)
+        first = await flights.do("key", fetch)
+        second = await flights.do("key", fetch)
+        return first, second
+
+    assert asyncio.run(main()) == ((0, False), (1, False))
+
+
+def _concurrent_pages(mappings):
+    async def main():
+        engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"], poolclass=NullPool)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+        async def page():
+            async with AsyncSession(engine) as session:
+                query_builder = (QueryBuilder(BlogPost).apply_sorting("id ASC").apply_pagination(0, 5)
+                                 .use_count_strategy(CountStrategy.EXACT))
+                if mappings:
+                    query_builder.as_mappings()
+                return await query_builder.execute(session)
+        try:
+            results = await asyncio.gather(*(page() for _ in range(4)))
+        finally:
+            await engine.dispose()
+        return results, statements
+
+    return asyncio.run(main())
+
+
+def test_identical_mapping_queries_are_coalesced():
+    results, statements = _concurrent_pages(mappings=True)
+    assert all(([item["id"] for item in items], total) == ([1, 2, 3, 4, 5], 50) for items, total in results)
+    # One count and one page for all four callers
+    assert len(statements) == 2
+    # ...but every caller gets its own row dicts
+    assert len({id(items[0]) for items, _ in results}) == 4
+    assert list_flights.in_flight() == 0
+
+
+def test_orm_queries_are_not_coalesced():
+    # Entities belong to the session that loaded them, so each caller runs its own
+    results, statements = _concurrent_pages(mappings=False)
+    assert all(([item.id for item in items], total) == ([1, 2, 3, 4, 5], 50) for items, total in results)
+    assert len(statements) == 8
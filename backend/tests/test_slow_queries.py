@@ -0,0 +1,75 @@
+"""Slow query log: statements grouped by shape, exposed at /internal/slow-queries"""
+from types import SimpleNamespace
+import pytest
+from core.config import settings
+from database.slow_queries import SlowQueryRecorder, normalize_sql, parameter_shape, slow_query_recorder
+
+SQLITE_CONN = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+POSTGRES_CONN = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+
+@pytest.fixture(autouse=True)
+def empty_log():
+    slow_query_recorder.reset()
+    yield
+    slow_query_recorder.reset()
+
+
+def test_statements_are_reduced_to_their_shape():
+    assert normalize_sql("SELECT *\n  FROM t WHERE a = 'x''y' AND b IN ($1, $2, $3) AND c > -1.5") == \
+        "SELECT * FROM t WHERE a = ? AND b IN (...) AND c > ?"
+    assert normalize_sql("SELECT * FROM t WHERE b IN (?, ?)") == normalize_sql("SELECT * FROM t WHERE b IN (?, ?, ?, ?)")
+    # Identifiers ending in digits are not literals
+    assert normalize_sql("SELECT col1 FROM t2") == "SELECT col1 FROM t2"
+
+
+def test_parameter_shapes_never_include_values():
+    assert parameter_shape({"title_1": "secret", "ids": [1, 2]}) == "{title_1: str, ids: list[int]}"
+    assert parameter_shape(("secret", 5, None)) == "(str, int, NoneType)"
+
+
+def test_recorder_aggregates_by_shape():
+    recorder = SlowQueryRecorder()
+    recorder.record(SQLITE_CONN, "SELECT * FROM t WHERE id = 1", {"id": 1}, 300.0, "/a")
+    recorder.record(SQLITE_CONN, "SELECT * FROM t WHERE id = 2", {"id": 2}, 500.0, "/b")
+    (shape,) = recorder.worst()
+    assert shape["sql"] == "SELECT * FROM t WHERE id = ?"
+    assert (shape["count"], shape["total_ms"], shape["max_ms"], shape["avg_ms"]) == (2, 800.0, 500.0, 400.0)
+    assert shape["routes"] == {"/a": 1, "/b": 1}
+    assert shape["parameter_shapes"] == {"{id: int}": 2}
+
+
+def test_cheapest_shape_is_evicted_when_full():
+    recorder = SlowQueryRecorder(max_shapes=2)
+    for table, ms in (("a", 300.0), ("b", 100.0), ("c", 200.0)):
+        recorder.record(SQLITE_CONN, f"SELECT * FROM {table}", {}, ms, "/")
+    assert [shape["sql"] for shape in recorder.worst()] == ["SELECT * FROM a", "SELECT * FROM c"]
+
+
+def test_only_sampled_postgres_reads_are_explained(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1.0)
+    recorder = SlowQueryRecorder()
+    assert recorder._should_explain(POSTGRES_CONN, "  with x as (select 1) select * from x")
+    assert not recorder._should_explain(POSTGRES_CONN, "UPDATE t SET a = 1")
+    assert not recorder._should_explain(SQLITE_CONN, "SELECT 1")
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.0)
+    assert not recorder._should_explain(POSTGRES_CONN, "SELECT 1")
+
+
+def test_requests_over_the_threshold_are_listed(client, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    client.get("/blog-post-sql/1")
+    client.get("/blog-post-sql/2")
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e9)
+
+    shapes = client.get("/internal/slow-queries?order_by=count").json()
+    detail = [shape for shape in shapes if "/blog-post-sql/{post_id}" in shape["routes"]]
+    assert detail and detail[0]["count"] == 2
+    assert "FROM blog_posts" in detail[0]["sql"]
+
+    assert client.delete("/internal/slow-queries").status_code == 204
+    assert client.get("/internal/slow-queries").json() == []
+
+
+def test_unknown_order_is_rejected(client):
+    assert client.get("/internal/slow-queries?order_by=sql").status_code == 422
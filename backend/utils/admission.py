@@ -0,0 +1,186 @@
+"""
+Admission control in front of the database pool
+
+Requests are admitted while there is capacity: a global limit sized to the
+pool (pool_size + max_overflow per worker) and a per-route limit, so one
+expensive list endpoint cannot hold every connection. Everything else waits
+in one bounded queue, ordered by priority class and then arrival:
+
+    detail  single-row reads (/{id}, GET or POST /many): cheap, served first
+    write   other POST/PATCH/DELETE
+    list    list/count queries and exports: expensive, served last
+
+A waiter gives up after ADMISSION_QUEUE_TIMEOUT (well under the pool's own
+timeout), and when the queue is full a new request either displaces the
+lowest-priority waiter or is shed straight away. Shed requests get a fast
+503 with Retry-After instead of queueing inside SQLAlchemy's pool.
+"""
+from bisect import insort
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import asyncio
+import itertools
+import math
+import time
+from core.config import settings
+from database.core import pool_dimensions
+from utils.metrics import registry
+
+# Lower is served first
+PRIORITIES = {"detail": 0, "write": 1, "list": 2}
+
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for a database slot, by class", ("class",))
+admission_in_flight = registry.gauge(
+    "admission_in_flight", "Admitted requests currently running, by class", ("class",))
+admission_shed_total = registry.counter(
+    "admission_shed_total", "Requests rejected with 503, by class and reason", ("class", "reason"))
+admission_wait_seconds = registry.histogram(
+    "admission_wait_seconds", "Time queued before admission, by class", ("class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+
+class Saturated(Exception):
+    """Raised when a request is shed; reason is queue_full, evicted or timeout"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    route: str = field(compare=False)
+    kind: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.perf_counter)
+
+
+class AdmissionController:
+    """
+    Concurrency slots with a bounded priority wait queue
+
+    Invariant: no queued waiter could run right now (release() hands freed
+    slots to eligible waiters immediately), so a new request that fits is
+    admitted without looking at the queue.
+    """
+
+    def __init__(self, max_concurrency: int, queue_size: int, queue_timeout: float,
+                 list_share: float = 0.5, route_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        # Expensive classes may use this many slots per route; detail reads all of them
+        self.shared_limit = max(1, math.ceil(self.max_concurrency * list_share))
+        self.route_limits = dict(route_limits or {})
+        self.in_flight = 0
+        self._by_route: Dict[str, int] = {}
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+
+    def limit_for(self, route: str, kind: str) -> int:
+        if route in self.route_limits:
+            return self.route_limits[route]
+        return self.max_concurrency if kind == "detail" else self.shared_limit
+
+    def _fits(self, route: str, kind: str) -> bool:
+        return (self.in_flight < self.max_concurrency
+                and self._by_route.get(route, 0) < self.limit_for(route, kind))
+
+    def _take(self, route: str, kind: str) -> None:
+        self.in_flight += 1
+        self._by_route[route] = self._by_route.get(route, 0) + 1
+        admission_in_flight.inc(kind)
+
+    def _shed(self, kind: str, reason: str) -> Saturated:
+        admission_shed_total.inc(kind, reason)
+        return Saturated(reason)
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        self._queue.remove(waiter)
+        admission_queue_depth.dec(waiter.kind)
+
+    async def acquire(self, route: str, kind: str) -> None:
+        """Wait for a slot; raises Saturated if the request should be shed"""
+        if self._fits(route, kind):
+            self._take(route, kind)
+            admission_wait_seconds.observe(0.0, kind)
+            return
+
+        if len(self._queue) >= self.queue_size:
+            worst = self._queue[-1] if self._queue else None
+            if worst is None or worst.priority <= PRIORITIES[kind]:
+                raise self._shed(kind, "queue_full")
+            # A cheaper request displaces the most expensive, most recent waiter
+            self._dequeue(worst)
+            worst.future.set_exception(self._shed(worst.kind, "evicted"))
+
+        waiter = _Waiter(PRIORITIES[kind], next(self._sequence), route, kind,
+                         asyncio.get_running_loop().create_future())
+        insort(self._queue, waiter)
+        admission_queue_depth.inc(kind)
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            raise self._shed(kind, "timeout") from None
+        except asyncio.CancelledError:
+            # Client went away while queued (or just after being granted)
+            self._abandon(waiter)
+            raise
+        admission_wait_seconds.observe(time.perf_counter() - waiter.queued_at, kind)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Undo a wait that ends without admission, returning a slot granted meanwhile"""
+        if waiter in self._queue:
+            self._dequeue(waiter)
+        elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            # release() granted the slot just as the wait ended
+            self.release(waiter.route, waiter.kind)
+
+    def release(self, route: str, kind: str) -> None:
+        self.in_flight -= 1
+        self._by_route[route] -= 1
+        if not self._by_route[route]:
+            del self._by_route[route]
+        admission_in_flight.dec(kind)
+        # Hand freed capacity to the best waiters that fit, in priority order
+        for waiter in list(self._queue):
+            if self.in_flight >= self.max_concurrency:
+                break
+            if waiter.future.done() or not self._fits(waiter.route, waiter.kind):
+                continue
+            self._dequeue(waiter)
+            self._take(waiter.route, waiter.kind)
+            waiter.future.set_result(None)
+
+    def describe(self) -> dict:
+        queued: Dict[str, int] = {}
+        for waiter in self._queue:
+            queued[waiter.kind] = queued.get(waiter.kind, 0) + 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "shared_limit": self.shared_limit,
+            "route_limits": self.route_limits,
+            "in_flight": self.in_flight,
+            "in_flight_by_route": dict(self._by_route),
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "queued": queued,
+        }
+
+
+def controller_from_settings() -> AdmissionController:
+    pool_size, max_overflow = pool_dimensions()
+    return AdmissionController(
+        max_concurrency=settings.ADMISSION_MAX_CONCURRENCY or pool_size + max_overflow,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        list_share=settings.ADMISSION_LIST_SHARE,
+        route_limits=settings.ADMISSION_ROUTE_LIMITS,
+    )
+
+
+admission_controller = controller_from_settings()
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Union
+import hashlib
+from fastapi import Request
+from fastapi.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from the given version parts"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    """Format a timestamp for Last-Modified"""
+    if value is None:
+        return None
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Union[datetime, str, None]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (RFC 9110 section 13.2.2)
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it, at one-second resolution.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            if isinstance(last_modified, str):
+                last_modified = parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def has_conditional_headers(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(headers: dict) -> Response:
+    """Empty 304 carrying the validators"""
+    return Response(status_code=304, headers=headers)
+
+
+# Headers that are part of a list page's representation besides the body
+PAGE_HEADERS = ("x-total-count", "x-next-cursor", "x-prev-cursor")
+
+
+def page_etag(response: Response) -> str:
+    """Strong ETag of a rendered list page: its body plus the pagination headers"""
+    return make_etag(hashlib.sha256(response.body).hexdigest(),
+                     *(response.headers.get(name, "") for name in PAGE_HEADERS))
+
+
+def with_page_validators(request: Request, response: Response, validators: dict) -> Response:
+    """
+    Attach validators to a rendered list page, or answer 304
+
+    Also used for any response whose version does not cover everything in
+    its body (e.g. a post with its category embedded).
+
+    validators are the version-based ones of a conditional request (empty
+    otherwise, so plain requests never pay for the version query); without
+    them the page's own hash is the ETag. A client revalidating with such a
+    hash gets 304 when the freshly rendered page hashes the same.
+    """
+    etag = page_etag(response)
+    if is_not_modified(request, etag, None):
+        # Hand back the version ETag when there is one, so the client's next
+        # revalidation is answered from the version query alone
+        return not_modified({"ETag": etag, **validators})
+    for name, value in (validators or {"ETag": etag}).items():
+        response.headers[name] = value
+    return response
@@ -0,0 +1,138 @@
+from enum import Enum
+from typing import Hashable, Optional
+import json
+import logging
+from sqlalchemy import select, func, text
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from core.config import settings
+from database.events import on_table_write
+from utils.ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+class CountStrategy(str, Enum):
+    """How the total behind x-total-count is obtained"""
+    EXACT = "exact"        # SELECT count(*) on every request
+    CACHED = "cached"      # exact count, memoised per filter set until TTL or a write
+    ESTIMATE = "estimate"  # planner estimate (Postgres), exact count elsewhere
+    AUTO = "auto"          # estimate for large/broad result sets, cached exact otherwise
+
+# Exact counts keyed by (table name, normalized filter set)
+count_cache = TTLCache(maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL)
+
+@on_table_write
+def _invalidate_counts(tables):
+    """Forget cached counts for tables written by a committed transaction"""
+    removed = count_cache.invalidate(lambda key: key[0] in tables)
+    if removed:
+        logger.debug("Invalidated %d cached counts for %s", removed, sorted(tables))
+
+async def exact_count(db: AsyncSession, base_query: Select) -> int:
+    """Run SELECT count(*) over the unpaginated query"""
+    count_result = await db.execute(
+        select(func.count()).select_from(base_query.order_by(None).alias())
+    )
+    return count_result.scalar()
+
+async def cached_count(db: AsyncSession, base_query: Select, cache_key: Hashable) -> int:
+    """Exact count served from the in-process cache when possible"""
+    total = count_cache.get(cache_key)
+    if total is MISSING:
+        total = await exact_count(db, base_query)
+        count_cache.set(cache_key, total)
+    return total
+
+async def table_row_estimate(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner's row estimate for a whole table from pg_class.reltuples"""
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    )
+    estimate = result.scalar()
+    # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+    if estimate is None or estimate <= 0:
+        return None
+    return int(estimate)
+
+def explain_statement(base_query: Select, dialect) -> Optional[tuple]:
+    """
+    EXPLAIN (FORMAT JSON) text and driver parameters for the unpaginated query
+
+    Expanding parameters (in/nin filters) are rendered into individual
+    placeholders, so positional parameters line up with the SQL text.
+    None if the statement cannot be compiled that way.
+    """
+    try:
+        compiled = base_query.order_by(None).compile(
+            dialect=dialect, compile_kwargs={"render_postcompile": True}
+        )
+    except CompileError as e:
+        logger.debug("Cannot inline statement for EXPLAIN: %s", e)
+        return None
+    if compiled.positiontup is not None:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    return f"EXPLAIN (FORMAT JSON) {compiled.string}", params
+
+async def query_row_estimate(db: AsyncSession, base_query: Select) -> Optional[int]:
+    """Planner's row estimate for a filtered query from EXPLAIN (FORMAT JSON)"""
+    conn = await db.connection()
+    explain = explain_statement(base_query, conn.dialect)
+    if explain is None:
+        return None
+    result = await conn.exec_driver_sql(*explain)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+async def resolve_total(
+    db: AsyncSession,
+    base_query: Select,
+    table_name: str,
+    filter_key: tuple,
+    strategy: CountStrategy
+) -> int:
+    """
+    Compute the total row count for a list query using the requested strategy
+
+    Estimates are only available on PostgreSQL; other dialects, unanalyzed
+    tables and small results fall back to the (cached) exact count so the
+    x-total-count contract never changes shape. The count cache is per
+    process, so with several workers that fallback is a plain exact count
+    unless CACHED is asked for explicitly.
+    """
+    cache_key = (table_name, filter_key)
+    if strategy == CountStrategy.EXACT:
+        return await exact_count(db, base_query)
+    if strategy == CountStrategy.CACHED:
+        return await cached_count(db, base_query, cache_key)
+
+    use_cache = settings.WEB_CONCURRENCY <= 1
+    if use_cache and strategy == CountStrategy.AUTO:
+        # A cached exact count beats another estimate round trip
+        total = count_cache.get(cache_key)
+        if total is not MISSING:
+            return total
+
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        if filter_key:
+            estimate = await query_row_estimate(db, base_query)
+        else:
+            estimate = await table_row_estimate(db, table_name)
+        if estimate is not None:
+            if strategy == CountStrategy.ESTIMATE:
+                return estimate
+            # AUTO: only trust the planner where an exact count is expensive
+            if estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+
+    if use_cache:
+        return await cached_count(db, base_query, cache_key)
+    return await exact_count(db, base_query)
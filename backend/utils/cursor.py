@@ -0,0 +1,52 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def _json_default(value: Any):
+    """Serialize the non-JSON types that can appear as sort keys"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(sort_field: str, order: str, value: Any, row_id: Any, direction: str) -> str:
+    """
+    Build an opaque keyset cursor
+
+    The cursor pins the sort field and order it was issued for so that it
+    cannot silently be replayed against a different ordering.
+    """
+    payload = {"f": sort_field, "o": order, "v": value, "id": row_id, "d": direction}
+    raw = json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[dict]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Returns None for an empty cursor (first page) and raises
+    InvalidCursorError for anything that was not issued by this API.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+    if not isinstance(payload, dict) or not {"f", "o", "v", "id", "d"} <= payload.keys():
+        raise InvalidCursorError("Malformed cursor")
+    if payload["d"] not in ("next", "prev"):
+        raise InvalidCursorError("Malformed cursor")
+    return payload
@@ -0,0 +1,279 @@
+"""
+Index advisor: records the filter/sort shapes list requests actually use and
+suggests btree indexes (composite, or partial for IS [NOT] NULL filters) for
+hot shapes no existing index serves.
+
+Shapes follow the usual btree rule: equality columns first, then either the
+sort columns or one range column. Substring filters are left to the pg_trgm
+indexes and OR groups are not indexable by a single btree, so both are
+ignored here.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+import json
+import threading
+
+EQUALITY_OPERATORS = frozenset({"eq", "in"})
+RANGE_OPERATORS = frozenset({"lt", "lte", "gt", "gte", "between"})
+NULL_PREDICATES = {"null": "IS NULL", "nnull": "IS NOT NULL"}
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Columns one list request filtered and sorted on, without values"""
+    table: str
+    equality: Tuple[str, ...] = ()
+    ranges: Tuple[str, ...] = ()
+    # (column, "IS NULL" | "IS NOT NULL")
+    null_checks: Tuple[Tuple[str, str], ...] = ()
+    # (column, "asc" | "desc")
+    sort: Tuple[Tuple[str, str], ...] = ()
+
+    def describe(self) -> dict:
+        return {
+            "table": self.table,
+            "equality": list(self.equality),
+            "ranges": list(self.ranges),
+            "null_checks": [f"{column} {predicate}" for column, predicate in self.null_checks],
+            "sort": [f"{column} {direction}" for column, direction in self.sort],
+        }
+
+
+@dataclass(frozen=True)
+class IndexSuggestion:
+    table: str
+    columns: Tuple[str, ...]
+    where: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"ix_{self.table}_{'_'.join(self.columns)}" + ("_partial" if self.where else "")
+
+    def describe(self) -> dict:
+        return {"name": self.name, "table": self.table, "columns": list(self.columns), "where": self.where}
+
+
+def _leaves(keys: Iterable[Any]):
+    """(column, operator) for every AND-ed leaf filter key"""
+    for key in keys:
+        if len(key) == 2 and key[0] == "and":
+            yield from _leaves(key[1])
+        elif len(key) == 3 and key[0] != "q":
+            yield key[0], key[1]
+
+
+def shape_of(table: str, filter_keys: Sequence[Any], sort: Sequence[Tuple[str, str]]) -> QueryShape:
+    """Build a QueryShape from QueryBuilder's normalized filter keys and sort columns"""
+    equality, ranges, null_checks = set(), set(), set()
+    for column, operator in _leaves(filter_keys):
+        if "." in column:
+            continue  # a joined table's column ("category.title"): that table's indexes apply
+        if operator in EQUALITY_OPERATORS:
+            equality.add(column)
+        elif operator in RANGE_OPERATORS:
+            ranges.add(column)
+        elif operator in NULL_PREDICATES:
+            null_checks.add((column, NULL_PREDICATES[operator]))
+        # ne/nin/negated and substring operators cannot use a btree seek
+    return QueryShape(
+        table=table,
+        equality=tuple(sorted(equality)),
+        ranges=tuple(sorted(ranges - equality)),
+        null_checks=tuple(sorted(null_checks)),
+        sort=tuple((column, direction) for column, direction in sort if "." not in column),
+    )
+
+
+def index_serves(columns: Sequence[str], where: Optional[str], shape: QueryShape, ordered: bool = True) -> bool:
+    """
+    Whether an index on `columns` (optionally partial) can serve the shape
+
+    Unordered (GIN) indexes only serve equality lookups.
+    """
+    if not ordered and (shape.sort or shape.ranges or len(shape.equality) != 1):
+        return False
+    if where is not None and where not in {f"{c} {p}" for c, p in shape.null_checks}:
+        return False
+    position = 0
+    remaining = set(shape.equality)
+    while position < len(columns) and columns[position] in remaining:
+        remaining.discard(columns[position])
+        position += 1
+    if remaining:
+        return False
+    rest = list(columns[position:])
+    if shape.sort:
+        sort_columns = [column for column, _ in shape.sort]
+        directions = {direction for _, direction in shape.sort}
+        # Mixed directions need a matching DESC definition; treat as unserved
+        return rest[:len(sort_columns)] == sort_columns and len(directions) == 1
+    if shape.ranges:
+        return bool(rest) and rest[0] in shape.ranges
+    # Equality only, or NULL checks matched by the partial predicate above
+    return position > 0 or where is not None
+
+
+def suggest_for(shape: QueryShape) -> Optional[IndexSuggestion]:
+    columns = list(shape.equality)
+    if shape.sort:
+        columns += [column for column, _ in shape.sort if column not in columns]
+    elif shape.ranges:
+        columns.append(shape.ranges[0])
+    where = " AND ".join(f"{c} {p}" for c, p in shape.null_checks) or None
+    if not columns:
+        if where is None:
+            return None
+        # Only NULL checks: index the checked column, restricted to matching rows
+        columns = [shape.null_checks[0][0]]
+    return IndexSuggestion(shape.table, tuple(columns), where)
+
+
+def existing_indexes(table) -> List[Tuple[Tuple[str, ...], Optional[str], bool]]:
+    """(columns, partial predicate, ordered) for the indexes declared on a Table"""
+    indexes = [(tuple(column.key for column in table.primary_key.columns), None, True)]
+    indexes += [((column.key,), None, True) for column in table.columns if column.index or column.unique]
+    # pg_trgm GIN indexes created by migration (see model_metadata.ColumnInfo)
+    indexes += [((column.key,), None, False) for column in table.columns if column.info.get("trigram_indexed")]
+    for index in table.indexes:
+        ordered = index.kwargs.get("postgresql_using", "btree") == "btree"
+        where = index.dialect_options["postgresql"].get("where")
+        indexes.append((
+            tuple(column.key for column in index.columns),
+            str(where) if where is not None else None,
+            ordered,
+        ))
+    return indexes
+
+
+def _unique_columns(table) -> set:
+    names = {column.key for column in table.columns if column.unique}
+    if len(table.primary_key.columns) == 1:
+        names |= {column.key for column in table.primary_key.columns}
+    return names
+
+
+class IndexAdvisor:
+    """Counts observed shapes (bounded) and turns hot unserved ones into suggestions"""
+
+    def __init__(self, max_shapes: int = 500):
+        self.max_shapes = max_shapes
+        self._shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, shape: QueryShape) -> None:
+        if not (shape.equality or shape.ranges or shape.null_checks or shape.sort):
+            return
+        with self._lock:
+            if shape not in self._shapes and len(self._shapes) >= self.max_shapes:
+                return
+            self._shapes[shape] += 1
+
+    def report(self, tables: dict, min_hits: int = 1) -> List[dict]:
+        """
+        Observed shapes, hottest first, each with whether an existing index
+        serves it and a suggested index when none does
+
+        tables maps table name to its SQLAlchemy Table.
+        """
+        with self._lock:
+            shapes = self._shapes.most_common()
+        report = []
+        for shape, hits in shapes:
+            if hits < min_hits or shape.table not in tables:
+                continue
+            table = tables[shape.table]
+            # Equality on a unique key matches at most one row; nothing to add
+            served = bool(set(shape.equality) & _unique_columns(table)) or any(
+                index_serves(columns, where, shape, ordered)
+                for columns, where, ordered in existing_indexes(table)
+            )
+            suggestion = None if served else suggest_for(shape)
+            report.append({
+                "shape": shape.describe(),
+                "hits": hits,
+                "served": served,
+                "suggestion": suggestion.describe() if suggestion else None,
+            })
+        return report
+
+    def suggestions(self, tables: dict, min_hits: int = 1) -> List[IndexSuggestion]:
+        unique = {}
+        for entry in self.report(tables, min_hits):
+            suggestion = entry["suggestion"]
+            if suggestion:
+                unique.setdefault(suggestion["name"], IndexSuggestion(
+                    suggestion["table"], tuple(suggestion["columns"]), suggestion["where"]
+                ))
+        return list(unique.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+MIGRATION_TEMPLATE = '''"""{message}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {created}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = {revision!r}
+down_revision: Union[str, None] = {down_revision!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build indexes without locking out writes on a populated table
+    with op.get_context().autocommit_block():
+{upgrade}
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+{downgrade}
+'''
+
+
+def render_migration(
+    suggestions: Sequence[IndexSuggestion],
+    revision: str,
+    down_revision: Optional[str],
+    message: str = "Add indexes suggested by the index advisor",
+) -> str:
+    """Alembic revision creating the suggested indexes concurrently"""
+    upgrade, downgrade = [], []
+    for suggestion in suggestions:
+        # json.dumps quotes the way hand-written migrations here do
+        name, table, columns = (json.dumps(v) for v in (suggestion.name, suggestion.table, list(suggestion.columns)))
+        where = f", postgresql_where=sa.text({json.dumps(suggestion.where)})" if suggestion.where else ""
+        upgrade.append(
+            f"        op.create_index(\n"
+            f"            {name}, {table}, {columns},\n"
+            f"            postgresql_concurrently=True, if_not_exists=True{where}\n"
+            f"        )"
+        )
+        downgrade.insert(0,
+            f"        op.drop_index({name}, table_name={table}, postgresql_concurrently=True, if_exists=True)"
+        )
+    return MIGRATION_TEMPLATE.format(
+        message=message,
+        revision=revision,
+        down_revision=down_revision,
+        created=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f"),
+        upgrade="\n".join(upgrade) or "        pass",
+        downgrade="\n".join(downgrade) or "        pass",
+    )
+
+
+index_advisor = IndexAdvisor()
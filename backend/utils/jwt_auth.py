@@ -0,0 +1,173 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import threading
+import time
+from core.config import settings
+from .ttl_cache import TTLCache, MISSING
+
+try:
+    import jwt
+except ImportError:  # pragma: no cover - PyJWT is only needed once auth is enabled
+    jwt = None
+
+logger = logging.getLogger(__name__)
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class TokenError(ValueError):
+    """Raised when a bearer token cannot be verified"""
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Identity resolved from verified token claims (no database lookup)"""
+    id: str
+    email: Optional[str]
+    roles: Tuple[str, ...]
+    claims: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def role(self) -> str:
+        # Highest privilege first, for code that expects a single role
+        return "admin" if "admin" in self.roles else (self.roles[0] if self.roles else "user")
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+
+def _roles_from_claims(claims: Dict[str, Any]) -> Tuple[str, ...]:
+    value = claims.get(settings.JWT_ROLE_CLAIM, ())
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    return tuple(str(role) for role in value)
+
+
+def _load_key(material: str, algorithm: str):
+    """HMAC secrets are used as-is; PEM public keys are parsed once here"""
+    if algorithm in HMAC_ALGORITHMS:
+        return material
+    return jwt.algorithms.get_default_algorithms()[algorithm].prepare_key(material)
+
+
+class KeyRing:
+    """
+    Verification keys by kid, loaded once and swapped atomically on reload
+
+    Keys come from JWT_SECRET (kid "default"), JWT_KEYS ({kid: secret or
+    PEM}) and JWT_JWKS_FILE. Rotation: publish the new key under a new kid
+    alongside the old one, issue tokens with the new kid, then drop the old
+    kid and call reload() (or restart) once its tokens have expired.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, List[Tuple[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def reload(self) -> None:
+        keys: Dict[str, List[Tuple[str, Any]]] = {}
+        material = dict(settings.JWT_KEYS)
+        if settings.JWT_SECRET:
+            material.setdefault("default", settings.JWT_SECRET)
+        for kid, value in material.items():
+            is_pem = value.lstrip().startswith("-----BEGIN")
+            for algorithm in settings.JWT_ALGORITHMS:
+                if (algorithm in HMAC_ALGORITHMS) == is_pem:
+                    continue
+                try:
+                    keys.setdefault(kid, []).append((algorithm, _load_key(value, algorithm)))
+                except Exception as e:
+                    logger.warning("Skipping JWT key %s for %s: %s", kid, algorithm, e)
+        if settings.JWT_JWKS_FILE:
+            with open(settings.JWT_JWKS_FILE, encoding="utf-8") as f:
+                for jwk in jwt.PyJWKSet.from_dict(json.load(f)).keys:
+                    algorithm = jwk.algorithm_name
+                    if algorithm in settings.JWT_ALGORITHMS:
+                        keys.setdefault(jwk.key_id or "default", []).append((algorithm, jwk.key))
+        with self._lock:
+            self._keys = keys
+            self.loaded = True
+        # Tokens signed by a key that was just removed must not stay valid
+        token_cache.clear()
+
+    def candidates(self, kid: Optional[str], algorithm: str) -> List[Any]:
+        if not self.loaded:
+            self.reload()
+        if kid is not None:
+            entries = self._keys.get(kid, [])
+        else:
+            entries = [entry for kid_entries in self._keys.values() for entry in kid_entries]
+        return [key for key_algorithm, key in entries if key_algorithm == algorithm]
+
+
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+key_ring = KeyRing()
+
+
+def _token_key(token: str) -> bytes:
+    # Never keep raw tokens in memory longer than the request
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    if jwt is None:
+        raise TokenError("Token verification requires PyJWT")
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as e:
+        raise TokenError(f"Malformed token: {e}") from e
+    algorithm = header.get("alg")
+    if algorithm not in settings.JWT_ALGORITHMS:
+        raise TokenError(f"Algorithm {algorithm!r} not allowed")
+
+    keys = key_ring.candidates(header.get("kid"), algorithm)
+    if not keys:
+        raise TokenError("Unknown signing key")
+    options = {"require": ["exp", "sub"]}
+    last_error: Optional[Exception] = None
+    for key in keys:
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=settings.JWT_AUDIENCE,
+                issuer=settings.JWT_ISSUER,
+                leeway=settings.JWT_LEEWAY,
+                options=options,
+            )
+        except jwt.InvalidSignatureError as e:
+            last_error = e  # try the next key without a kid match
+        except jwt.PyJWTError as e:
+            raise TokenError(str(e)) from e
+    raise TokenError(f"Invalid token: {last_error}")
+
+
+def verify_token(token: str) -> AuthUser:
+    """
+    Verify a bearer token locally and return its user
+
+    Verified tokens are cached by hash until the earlier of their `exp` and
+    TOKEN_CACHE_TTL, so repeat requests skip signature checking entirely.
+    Failures are not cached.
+    """
+    cache_key = _token_key(token)
+    user = token_cache.get(cache_key)
+    if user is not MISSING:
+        return user
+
+    claims = _decode(token)
+    user = AuthUser(
+        id=str(claims["sub"]),
+        email=claims.get("email"),
+        roles=_roles_from_claims(claims),
+        claims=claims,
+    )
+    remaining = float(claims["exp"]) - time.time()
+    if remaining > 0:
+        token_cache.set(cache_key, user, ttl=min(settings.TOKEN_CACHE_TTL, remaining))
+    return user
@@ -0,0 +1,356 @@
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Set, Tuple
+from sqlalchemy import and_, or_, not_
+from sqlalchemy.types import String, Text
+
+
+# Refine CrudOperators, grouped by how the value is interpreted
+COMPARISON_OPERATORS = frozenset({"eq", "ne", "lt", "lte", "gt", "gte"})
+LIST_OPERATORS = frozenset({"in", "nin", "between", "nbetween"})
+NULL_OPERATORS = frozenset({"null", "nnull"})
+STRING_OPERATORS = frozenset({
+    "contains", "ncontains", "containss", "ncontainss",
+    "startswith", "nstartswith", "startswiths", "nstartswiths",
+    "endswith", "nendswith", "endswiths", "nendswiths",
+})
+LOGICAL_OPERATORS = frozenset({"and", "or"})
+
+LIKE_ESCAPE = "\\"
+
+# What a pg_trgm GIN index can serve on a column without a btree index
+TRIGRAM_OPERATORS = STRING_OPERATORS | {"eq"}
+
+
+class FieldNotAllowedError(ValueError):
+    """Raised when a request filters or sorts on a column outside the model's whitelist"""
+
+
+class InvalidFilterError(ValueError):
+    """Raised for a filter on an unknown field, with an unsupported operator or an unconvertible value"""
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return (value
+        .replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_"))
+
+
+def _like(pattern: Callable[[str], str], case_sensitive: bool, negate: bool):
+    """Build a LIKE/ILIKE operator with a single bound pattern parameter"""
+    def apply(column, value):
+        term = pattern(_escape_like(str(value)))
+        condition = column.like(term, escape=LIKE_ESCAPE) if case_sensitive else column.ilike(term, escape=LIKE_ESCAPE)
+        return not_(condition) if negate else condition
+    return apply
+
+
+def _between(column, value):
+    low, high = value
+    return column.between(low, high)
+
+
+# Operator dispatch, built once at import time
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "eq": lambda c, v: c == v,
+    "ne": lambda c, v: c != v,
+    "lt": lambda c, v: c < v,
+    "lte": lambda c, v: c <= v,
+    "gt": lambda c, v: c > v,
+    "gte": lambda c, v: c >= v,
+    "in": lambda c, v: c.in_(v),
+    "nin": lambda c, v: c.not_in(v),
+    "between": _between,
+    "nbetween": lambda c, v: not_(_between(c, v)),
+    "null": lambda c, v: c.is_(None),
+    "nnull": lambda c, v: c.is_not(None),
+    "contains": _like(lambda v: f"%{v}%", False, False),
+    "ncontains": _like(lambda v: f"%{v}%", False, True),
+    "containss": _like(lambda v: f"%{v}%", True, False),
+    "ncontainss": _like(lambda v: f"%{v}%", True, True),
+    "startswith": _like(lambda v: f"{v}%", False, False),
+    "nstartswith": _like(lambda v: f"{v}%", False, True),
+    "startswiths": _like(lambda v: f"{v}%", True, False),
+    "nstartswiths": _like(lambda v: f"{v}%", True, True),
+    "endswith": _like(lambda v: f"%{v}", False, False),
+    "nendswith": _like(lambda v: f"%{v}", False, True),
+    "endswiths": _like(lambda v: f"%{v}", True, False),
+    "nendswiths": _like(lambda v: f"%{v}", True, True),
+}
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text_value = str(value).strip().lower()
+    if text_value in ("true", "1", "yes"):
+        return True
+    if text_value in ("false", "0", "no"):
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    # Accept the trailing Z JavaScript's toISOString() produces
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _to_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def _to_time(value: Any) -> time:
+    return value if isinstance(value, time) else time.fromisoformat(str(value))
+
+
+# Checked in order: bool before int and datetime before date (subclasses first)
+CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    bool: _to_bool,
+    int: int,
+    float: float,
+    Decimal: lambda v: Decimal(str(v)),
+    datetime: _to_datetime,
+    date: _to_date,
+    time: _to_time,
+    str: str,
+}
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    """Precomputed facts about one filterable/sortable column"""
+    name: str
+    attribute: Any
+    convert: Callable[[Any], Any]
+    operators: FrozenSet[str]
+    nullable: bool
+    # A pg_trgm GIN index serves contains/startswith/endswith on this column
+    trigram_indexed: bool = False
+    # Whitelist: only columns an index can serve may be sorted or filtered on
+    sortable: bool = False
+    filterable: bool = False
+    # Set on "relation.column" infos: the relation to join to reach the column
+    relation: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RelationInfo:
+    """A many-to-one relationship that can be joined, filtered/sorted on and embedded"""
+    name: str
+    attribute: Any
+    target: Any
+    # Foreign key column on this model and the target column it references
+    local_key: str
+    remote_key: str
+
+
+@dataclass
+class ModelMetadata:
+    """
+    Column metadata and operator dispatch for one model, computed once
+
+    QueryBuilder instances share this so that per-request work is limited
+    to converting values and assembling expressions from bound parameters.
+    """
+    model_class: Any
+    columns: Dict[str, ColumnInfo] = field(default_factory=dict)
+    primary_key: str = "id"
+    # Full-text search configuration declared on the model, if any
+    search_vector: Optional[str] = None
+    search_columns: Tuple[str, ...] = ()
+    search_language: str = "english"
+    # Timestamp column whose max() versions a result set (updated_at, else created_at)
+    version_column: Optional[str] = None
+    relations: Dict[str, RelationInfo] = field(default_factory=dict)
+    # Resolved "relation.column" names; unknown names are not cached, as
+    # they come straight from request parameters
+    _related_columns: Dict[str, ColumnInfo] = field(default_factory=dict, repr=False)
+
+    def column(self, name: str) -> Optional[ColumnInfo]:
+        return self.columns.get(name)
+
+    def resolve(self, name: str) -> Optional[ColumnInfo]:
+        """
+        A column of this model, or "relation.column" of a many-to-one target
+
+        The referenced key ("category.id") resolves to the local foreign key
+        column, which needs no join; other related columns carry the relation
+        to join and take their whitelist flags from the target model.
+        """
+        if "." not in name:
+            return self.columns.get(name)
+        info = self._related_columns.get(name)
+        if info is not None:
+            return info
+        relation_name, _, column_name = name.partition(".")
+        relation = self.relations.get(relation_name)
+        if relation is None:
+            return None
+        if column_name == relation.remote_key:
+            info = self.columns[relation.local_key]
+        else:
+            target_info = get_model_metadata(relation.target).column(column_name)
+            if target_info is None:
+                return None
+            info = replace(target_info, name=name, relation=relation_name)
+        self._related_columns[name] = info
+        return info
+
+    def can_filter(self, info: ColumnInfo, operator: str) -> bool:
+        if info.filterable:
+            return True
+        return info.trigram_indexed and operator in TRIGRAM_OPERATORS
+
+    def convert(self, name: str, value: Any) -> Any:
+        """Convert a raw (usually string) value to the column's Python type"""
+        return self.columns[name].convert(value)
+
+    def compile_filter(self, crud_filter: Dict, depth: int = 0, enforce_whitelist: bool = False,
+                       joins: Optional[Set[str]] = None) -> Optional[Tuple[Any, Any]]:
+        """
+        Turn one Refine CrudFilter into (condition, normalized key)
+
+        Logical filters ({"operator": "and"|"or", "value": [...]}) recurse;
+        an empty group returns None. Filters on unknown fields, unsupported
+        operators or unconvertible values raise InvalidFilterError, as
+        sorting does, rather than silently widening the result. The
+        normalized key identifies the filter for caching.
+
+        With enforce_whitelist, filtering on a column no index can serve
+        raises FieldNotAllowedError instead. Relations that must be joined
+        for "relation.column" filters are added to joins.
+        """
+        operator = crud_filter.get("operator")
+        if operator in LOGICAL_OPERATORS:
+            compiled = [
+                self.compile_filter(child, depth + 1, enforce_whitelist, joins)
+                for child in crud_filter.get("value") or []
+            ]
+            compiled = [c for c in compiled if c is not None]
+            if not compiled:
+                return None
+            combine = and_ if operator == "and" else or_
+            keys = tuple(sorted((key for _, key in compiled), key=repr))
+            return combine(*(condition for condition, _ in compiled)), (operator, keys)
+
+        name = crud_filter.get("field") or ""
+        info = self.resolve(name)
+        if info is None:
+            raise InvalidFilterError(f"Cannot filter by unknown field '{name}'")
+        if operator not in info.operators:
+            raise InvalidFilterError(f"Operator '{operator}' is not supported for field '{info.name}'")
+        if enforce_whitelist and not self.can_filter(info, operator):
+            raise FieldNotAllowedError(f"Filtering on '{info.name}' with '{operator}' is not supported")
+
+        try:
+            value = self._convert_operand(info, operator, crud_filter.get("value"))
+        except (ValueError, TypeError) as e:
+            raise InvalidFilterError(f"Invalid value for field '{info.name}': {e}") from e
+
+        if info.relation is not None and joins is not None:
+            joins.add(info.relation)
+        condition = OPERATORS[operator](info.attribute, value)
+        return condition, (info.name, operator, repr(value))
+
+    def _convert_operand(self, info: ColumnInfo, operator: str, value: Any) -> Any:
+        if operator in NULL_OPERATORS:
+            return None
+        if operator in LIST_OPERATORS:
+            if isinstance(value, str):
+                value = [part for part in value.split(",") if part != ""]
+            if not isinstance(value, (list, tuple)) or not value:
+                raise ValueError(f"{operator} expects a non-empty list")
+            converted = tuple(info.convert(item) for item in value)
+            if operator in ("between", "nbetween") and len(converted) != 2:
+                raise ValueError(f"{operator} expects exactly two values")
+            return converted
+        if operator in STRING_OPERATORS:
+            return str(value)
+        if value is None:
+            raise ValueError("Missing filter value")
+        return info.convert(value)
+
+
+def _converter_for(column) -> Callable[[Any], Any]:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return str
+    for base, converter in CONVERTERS.items():
+        if issubclass(python_type, base):
+            return converter
+    return str
+
+
+def indexed_columns(table) -> Set[str]:
+    """Columns a btree index can serve on its own: primary key, indexed/unique and index leaders"""
+    names = {column.key for column in table.primary_key.columns}
+    names |= {column.key for column in table.columns if column.index or column.unique}
+    for index in table.indexes:
+        expressions = list(index.columns)
+        if expressions and index.kwargs.get("postgresql_using", "btree") == "btree":
+            names.add(expressions[0].key)
+    return names
+
+
+def _column_info(model_class, column, sortable: bool, filterable: bool) -> ColumnInfo:
+    convert = _converter_for(column)
+
+    operators = COMPARISON_OPERATORS | LIST_OPERATORS
+    if column.nullable:
+        operators |= NULL_OPERATORS
+    if isinstance(column.type, (String, Text)):
+        operators |= STRING_OPERATORS
+
+    return ColumnInfo(
+        name=column.key,
+        attribute=getattr(model_class, column.key),
+        convert=convert,
+        operators=frozenset(operators),
+        nullable=bool(column.nullable),
+        trigram_indexed=bool(column.info.get("trigram_indexed")),
+        sortable=sortable,
+        filterable=filterable,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_model_metadata(model_class) -> ModelMetadata:
+    """Build (once per model) the metadata QueryBuilder needs"""
+    metadata = ModelMetadata(
+        model_class=model_class,
+        primary_key=model_class.__mapper__.primary_key[0].key,
+        search_vector=getattr(model_class, "__search_vector__", None),
+        search_columns=tuple(getattr(model_class, "__search_columns__", ())),
+        search_language=getattr(model_class, "__search_language__", "english"),
+    )
+    # Models may list their whitelists explicitly; otherwise indexed columns qualify
+    indexed = indexed_columns(model_class.__table__)
+    sortable = set(getattr(model_class, "__sortable__", indexed))
+    filterable = set(getattr(model_class, "__filterable__", indexed))
+    for column in model_class.__table__.columns:
+        metadata.columns[column.key] = _column_info(
+            model_class, column, column.key in sortable, column.key in filterable
+        )
+    for relationship in model_class.__mapper__.relationships:
+        # Only single-column many-to-one references can be joined without fanning out rows
+        if relationship.direction.name != "MANYTOONE" or len(relationship.local_remote_pairs) != 1:
+            continue
+        local, remote = relationship.local_remote_pairs[0]
+        metadata.relations[relationship.key] = RelationInfo(
+            name=relationship.key,
+            attribute=getattr(model_class, relationship.key),
+            target=relationship.mapper.class_,
+            local_key=local.key,
+            remote_key=remote.key,
+        )
+    metadata.version_column = next(
+        (name for name in ("updated_at", "created_at") if name in metadata.columns), None
+    )
+    return metadata
@@ -1,104 +1,582 @@
-from typing import List, Dict, Any
-from sqlalchemy import select, func, text
+from typing import List, Dict, Any, Optional, AsyncIterator
+from enum import Enum
+import asyncio
+import random
+from sqlalchemy import select, func, tuple_, and_, or_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import Select
-from datetime import datetime
-from sqlalchemy.types import String, Text
 import logging
+from utils.cursor import decode_cursor, encode_cursor, InvalidCursorError
+from utils.count_strategy import CountStrategy, resolve_total, exact_count
+from utils.serialization import rows_to_dicts
+from utils.model_metadata import get_model_metadata, FieldNotAllowedError, InvalidFilterError, RelationInfo
+from utils.index_advisor import index_advisor, shape_of
+from utils.search import build_search
+from utils.single_flight import list_flights
+from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+class InvalidQueryError(ValueError):
+    """Raised when client supplied query parameters cannot be applied"""
+
+class ExecutionMode(str, Enum):
+    """How execute() schedules the count and page queries"""
+    SEQUENTIAL = "sequential"  # count, then page, on the same session
+    WINDOW = "window"          # one statement carrying count(*) OVER ()
+    CONCURRENT = "concurrent"  # count and page at once on two pooled connections
+
 class QueryBuilder:
     def __init__(self, model_class):
         self.model_class = model_class
+        # Column metadata and operator dispatch are computed once per model
+        self.metadata = get_model_metadata(model_class)
         self.base_query = select(model_class)
         self.query = self.base_query
+        self._keyset = None
+        self.next_cursor = None
+        self.prev_cursor = None
+        self.count_strategy = CountStrategy(settings.COUNT_STRATEGY)
+        self.execution_mode = ExecutionMode(settings.LIST_EXECUTION_MODE)
+        # Normalized filter keys; identify the filter set for the count cache
+        self._applied_filters = []
+        # Whether execute() may sample this query's shape for the index advisor
+        self._advised = True
+        # Column names when a sparse fieldset was requested, None for full entities
+        self.fields = None
+        self._search_term = None
+        self._search_attached = False
+        self._sorted = False
+        # (column, direction) pairs, recorded with the filter shape for the index advisor
+        self._sort_columns = []
+        # Relations outer-joined for "relation.column" filters and sorting
+        self._joined = set()
+        # Relations embedded in each item, loaded once per page
+        self._embedded: List[RelationInfo] = []
+        self._embeds_attached = False
 
     def apply_filters(self, filters: List[Dict]) -> 'QueryBuilder':
-        """Apply filters to query based on filter parameters"""
+        """
+        Apply Refine CrudFilters (top-level entries are AND-ed)
+
+        Each entry is either a logical filter {field, operator, value} or a
+        conditional group {operator: "and"|"or", value: [...]}. Values are
+        always bound parameters, so statements with the same filter shape
+        share one entry in SQLAlchemy's compiled cache.
+        """
+        conditions = []
+        joins = set()
         for f in filters:
-            field = getattr(self.model_class, f["field"], None)
-            if not field:
-                continue
-                
-            value = self._convert_field_type(field, f["value"])
-            if value is None:
+            try:
+                compiled = self.metadata.compile_filter(
+                    f, enforce_whitelist=settings.QUERY_WHITELIST_ENFORCED, joins=joins
+                )
+            except (FieldNotAllowedError, InvalidFilterError) as e:
+                raise InvalidQueryError(str(e)) from e
+            if compiled is None:
                 continue
+            condition, key = compiled
+            conditions.append(condition)
+            self._applied_filters.append(key)
 
-            # Apply operator to both base_query and query
-            condition = self._get_filter_condition(field, f["operator"], value)
-            if condition is not None:
-                self.base_query = self.base_query.where(condition)
-                self.query = self.query.where(condition)
+        for relation in sorted(joins):
+            self._join(relation)
+        if conditions:
+            # Apply to both base_query and query
+            condition = and_(*conditions)
+            self.base_query = self.base_query.where(condition)
+            self.query = self.query.where(condition)
 
         return self
 
-    def _convert_field_type(self, field, value):
-        """Convert value to appropriate field type"""
-        try:
-            field_type = str(field.type)
-            if field_type in ('INTEGER', 'BIGINT'):
-                return int(value)
-            elif field_type == 'FLOAT':
-                return float(value)
-            elif field_type == 'DATETIME':
-                return datetime.fromisoformat(value)
-            return value
-        except (ValueError, TypeError):
-            logger.warning(f"Type conversion failed for field {field} with value {value}")
-            return None
+    def _join(self, relation: str) -> None:
+        """
+        LEFT OUTER JOIN a many-to-one relation (once), so rows without a
+        related row still match unrelated filters and sort last or first
+        """
+        if relation in self._joined:
+            return
+        self._joined.add(relation)
+        attribute = self.metadata.relations[relation].attribute
+        self.base_query = self.base_query.outerjoin(attribute)
+        self.query = self.query.outerjoin(attribute)
 
-    def _get_filter_condition(self, field, operator: str, value: Any):
-        """Get filter condition without modifying query"""
-        operators = {
-            "eq": lambda f, v: f == v,
-            "ne": lambda f, v: f != v,
-            "lt": lambda f, v: f < v,
-            "lte": lambda f, v: f <= v,
-            "gt": lambda f, v: f > v,
-            "gte": lambda f, v: f >= v,
-        }
+    def embed(self, relations: Optional[List[str]]) -> 'QueryBuilder':
+        """
+        Include the named many-to-one relations in every item
 
-        string_operators = {
-            "contains": lambda f, v: f.ilike(f"%{v}%"),
-            "ncontains": lambda f, v: ~f.ilike(f"%{v}%"),
-            "startswith": lambda f, v: f.ilike(f"{v}%"),
-            "nstartswith": lambda f, v: ~f.ilike(f"{v}%"),
-            "endswith": lambda f, v: f.ilike(f"%{v}"),
-            "nendswith": lambda f, v: ~f.ilike(f"%{v}")
-        }
+        Related rows are loaded with one batched IN query per page rather
+        than per row: selectinload for ORM entities, a single select of the
+        referenced keys for row mappings.
+        """
+        for name in relations or []:
+            relation = self.metadata.relations.get(name)
+            if relation is None:
+                raise InvalidQueryError(f"Cannot embed unknown relation '{name}'")
+            if relation not in self._embedded:
+                self._embedded.append(relation)
+        return self
+
+    def embed_options(self) -> list:
+        """Loader options embedding the relations into ORM entities"""
+        return [selectinload(relation.attribute) for relation in self._embedded]
+
+    def _attach_embeds(self) -> None:
+        if self._embeds_attached or not self._embedded:
+            return
+        self._embeds_attached = True
+        if self.fields is None:
+            self.query = self.query.options(*self.embed_options())
+        else:
+            for relation in self._embedded:
+                self._ensure_selected(relation.local_key)
+
+    async def load_embedded(self, db: AsyncSession, items: List[dict]) -> None:
+        """Add the embedded relations to row mappings in place, one query per relation"""
+        for relation in self._embedded:
+            target = get_model_metadata(relation.target)
+            keys = sorted({item[relation.local_key] for item in items if item[relation.local_key] is not None})
+            related = {}
+            if keys:
+                remote = target.columns[relation.remote_key].attribute
+                columns = [info.attribute for info in target.columns.values()]
+                result = await db.execute(select(*columns).where(remote.in_(keys)))
+                related = {row[relation.remote_key]: row for row in rows_to_dicts(result.mappings())}
+            for item in items:
+                item[relation.name] = related.get(item[relation.local_key])
+
+    def select_fields(self, fields: Optional[List[str]]) -> 'QueryBuilder':
+        """
+        Restrict the select to the given model columns (sparse fieldset)
+
+        The primary key is always included so rows stay addressable. Results
+        then come back as plain dicts instead of ORM entities, which skips
+        identity-map bookkeeping and never loads the unrequested columns.
+        """
+        if not fields:
+            return self
+        unknown = [name for name in fields if self.metadata.column(name) is None]
+        if unknown:
+            raise InvalidQueryError(f"Unknown field(s): {', '.join(unknown)}")
+
+        pk = self.model_class.__mapper__.primary_key[0].key
+        names = [pk] + [name for name in dict.fromkeys(fields) if name != pk]
+        self.fields = names
+        selected = [getattr(self.model_class, name) for name in names]
+        self.base_query = self.base_query.with_only_columns(*selected)
+        self.query = self.query.with_only_columns(*selected)
+        return self
+
+    def as_mappings(self) -> 'QueryBuilder':
+        """Select every column as a Core row mapping instead of hydrating ORM entities"""
+        if self.fields is None:
+            self.select_fields([column.key for column in self.model_class.__table__.columns])
+        return self
+
+    def _ensure_selected(self, name: str) -> None:
+        """Add a column to a sparse fieldset (keyset cursors need the sort key)"""
+        if self.fields is None or name in self.fields:
+            return
+        self.fields.append(name)
+        column = getattr(self.model_class, name)
+        self.base_query = self.base_query.add_columns(column)
+        self.query = self.query.add_columns(column)
 
-        if operator in operators:
-            return operators[operator](field, value)
-        
-        if operator in string_operators and isinstance(field.type, (String, Text)):
-            return string_operators[operator](field, value)
-            
-        return None
+    def _rows_to_items(self, result) -> List:
+        """Entities for full selects, dicts for sparse fieldsets"""
+        if self.fields is None:
+            return result.scalars().all()
+        return rows_to_dicts(result.mappings())
+
+    def use_count_strategy(self, strategy: Optional[CountStrategy]) -> 'QueryBuilder':
+        """Choose how execute() obtains the total count (None keeps the configured default)"""
+        if strategy is not None:
+            self.count_strategy = CountStrategy(strategy)
+        return self
+
+    def use_execution_mode(self, mode: Optional[ExecutionMode]) -> 'QueryBuilder':
+        """
+        Choose how execute() runs the count and page queries (None keeps the configured default)
+
+        WINDOW and CONCURRENT only change anything when an exact count is
+        actually executed; cached or estimated totals never need a count
+        statement, so those requests always run sequentially.
+        """
+        if mode is not None:
+            self.execution_mode = ExecutionMode(mode)
+        return self
+
+    def without_index_advice(self) -> 'QueryBuilder':
+        """Keep this query out of the index advisor (synthetic traffic such as warmup)"""
+        self._advised = False
+        return self
 
     def apply_sorting(self, order_by: str) -> 'QueryBuilder':
-        """Apply sorting to query"""
+        """
+        Apply sorting to query
+
+        order_by is "field[,field...] ASC|DESC" as built by get_pagination_params.
+        Fields are resolved to model columns rather than spliced into SQL text.
+        """
         if order_by:
-            self.base_query = self.base_query.order_by(text(order_by))
-            self.query = self.query.order_by(text(order_by))
+            names, _, direction = order_by.rpartition(" ")
+            if not names:
+                names, direction = direction, "ASC"
+            descending = direction.upper() == "DESC"
+            ordering = []
+            for name in names.split(","):
+                info = self.metadata.resolve(name.strip())
+                if info is None:
+                    raise InvalidQueryError(f"Cannot sort by unknown field '{name.strip()}'")
+                self._check_sortable(info)
+                if info.relation is not None:
+                    self._join(info.relation)
+                ordering.append(info.attribute.desc() if descending else info.attribute.asc())
+                self._sort_columns.append((info.name, "desc" if descending else "asc"))
+            self.base_query = self.base_query.order_by(*ordering)
+            self.query = self.query.order_by(*ordering)
+            self._sorted = True
         return self
 
+    def _check_sortable(self, info) -> None:
+        if settings.QUERY_WHITELIST_ENFORCED and not info.sortable:
+            raise InvalidQueryError(f"Sorting by '{info.name}' is not supported")
+
+    def apply_search(self, term: Optional[str]) -> 'QueryBuilder':
+        """
+        Restrict to rows matching a free-text search term
+
+        The condition is dialect specific (tsvector + trigram on PostgreSQL,
+        ILIKE elsewhere), so it is attached in execute() once the database is
+        known. Unless an explicit sort was applied, results are ordered by rank.
+        """
+        if term and term.strip():
+            self._search_term = term.strip()
+            self._applied_filters.append(("q", "search", self._search_term))
+        return self
+
+    def _attach_search(self, dialect_name: str) -> None:
+        if self._search_attached:
+            return
+        self._search_attached = True
+        search = build_search(self.metadata, self._search_term, dialect_name)
+        if search is None:
+            return
+        condition, rank = search
+        self.base_query = self.base_query.where(condition)
+        self.query = self.query.where(condition)
+        # Keyset pages are ordered by their seek key, never by rank
+        if not self._sorted and not self._keyset:
+            pk = getattr(self.model_class, self.metadata.primary_key)
+            self.query = self.query.order_by(rank.desc(), pk.asc())
+
     def apply_pagination(self, skip: int, limit: int) -> 'QueryBuilder':
         """Apply pagination to query"""
         # Only apply pagination to the working query, not the base query
         self.query = self.base_query.offset(skip).limit(limit)
         return self
 
+    def apply_keyset_pagination(
+        self,
+        cursor: Optional[str],
+        sort_field: Optional[str],
+        order: Optional[str],
+        limit: int
+    ) -> 'QueryBuilder':
+        """
+        Apply keyset (seek) pagination instead of OFFSET/LIMIT
+
+        Rows are ordered by (sort_field, primary key) and the page starts
+        right after the row encoded in the cursor, so the database can seek
+        through an index rather than scanning and discarding skipped rows.
+        NULL sort values come last in display order (NULLS LAST, reversed
+        when walking backwards); nullable columns then seek with an explicit
+        predicate instead of the row-value comparison, so no row is skipped.
+        """
+        pk = self.model_class.__mapper__.primary_key[0]
+        sort_field = sort_field or pk.key
+        order = (order or "asc").lower()
+        if "." in sort_field:
+            raise InvalidQueryError(f"Cursor pagination cannot sort by related field '{sort_field}'")
+        if self.metadata.column(sort_field) is None:
+            raise InvalidQueryError(f"Cannot sort by unknown field '{sort_field}'")
+        sort_info = self.metadata.column(sort_field)
+        self._check_sortable(sort_info)
+        sort_column = getattr(self.model_class, sort_field)
+        id_column = getattr(self.model_class, pk.key)
+        self._ensure_selected(sort_field)
+
+        try:
+            position = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise InvalidQueryError(str(e)) from e
+        if position and (position["f"] != sort_field or position["o"] != order):
+            raise InvalidQueryError("Cursor was issued for a different sort order")
+
+        direction = position["d"] if position else "next"
+        # Walking backwards flips the comparison and ordering; execute()
+        # restores display order afterwards
+        descending = (order == "desc") != (direction == "prev")
+
+        nullable = sort_field != pk.key and sort_info.nullable
+        # NULLs trail the display order, so they lead when walking backwards
+        nulls_last = direction == "next"
+
+        query = self.base_query.order_by(None)
+        if position:
+            try:
+                sort_value = None if position["v"] is None else self.metadata.convert(sort_field, position["v"])
+                id_value = self.metadata.convert(pk.key, position["id"])
+            except (ValueError, TypeError) as e:
+                raise InvalidQueryError("Malformed cursor") from e
+            if sort_field == pk.key:
+                current, boundary = id_column, id_value
+                query = query.where(current < boundary if descending else current > boundary)
+            elif nullable:
+                query = query.where(self._nullable_seek(
+                    sort_column, id_column, sort_value, id_value, descending, nulls_last
+                ))
+            else:
+                current = tuple_(sort_column, id_column)
+                boundary = tuple_(sort_value, id_value)
+                query = query.where(current < boundary if descending else current > boundary)
+
+        if sort_field == pk.key:
+            ordering = [id_column.desc() if descending else id_column.asc()]
+        else:
+            sort_order = sort_column.desc() if descending else sort_column.asc()
+            if nullable:
+                sort_order = sort_order.nulls_last() if nulls_last else sort_order.nulls_first()
+            ordering = [sort_order, id_column.desc() if descending else id_column.asc()]
+
+        self._sort_columns = [(sort_field, order)] + ([] if sort_field == pk.key else [(pk.key, order)])
+        # Fetch one extra row to learn whether another page exists
+        self.query = query.order_by(*ordering).limit(limit + 1)
+        self._keyset = {
+            "sort_field": sort_field,
+            "order": order,
+            "direction": direction,
+            "limit": limit,
+            "has_cursor": position is not None,
+            "pk": pk.key,
+        }
+        return self
+
+    @staticmethod
+    def _nullable_seek(sort_column, id_column, sort_value, id_value, descending: bool, nulls_last: bool):
+        """Rows after (sort_value, id_value) in the traversal order, NULL sort values included"""
+        past = (lambda c, v: c < v) if descending else (lambda c, v: c > v)
+        if sort_value is None:
+            in_nulls = and_(sort_column.is_(None), past(id_column, id_value))
+            # Walking towards the NULLs they are all behind us; away from them, every value is ahead
+            return in_nulls if nulls_last else or_(sort_column.is_not(None), in_nulls)
+        ahead = or_(
+            past(sort_column, sort_value),
+            and_(sort_column == sort_value, past(id_column, id_value)),
+        )
+        return or_(ahead, sort_column.is_(None)) if nulls_last else ahead
+
+    def _set_page_cursors(self, items: List) -> List:
+        """Trim the look-ahead row and compute next/prev cursors for a keyset page"""
+        keyset = self._keyset
+        has_more = len(items) > keyset["limit"]
+        items = list(items[:keyset["limit"]])
+        backward = keyset["direction"] == "prev"
+        if backward:
+            items.reverse()
+
+        def value_of(item, name):
+            return item[name] if isinstance(item, dict) else getattr(item, name)
+
+        def cursor_for(item, direction):
+            return encode_cursor(
+                keyset["sort_field"],
+                keyset["order"],
+                value_of(item, keyset["sort_field"]),
+                value_of(item, keyset["pk"]),
+                direction
+            )
+
+        if items:
+            # Going forward there is a next page when the look-ahead row came
+            # back; going backward there always is one (we came from it)
+            if has_more or backward:
+                self.next_cursor = cursor_for(items[-1], "next")
+            if (has_more and backward) or (not backward and keyset["has_cursor"]):
+                self.prev_cursor = cursor_for(items[0], "prev")
+        return items
+
+    async def _resolve_total(self, db: AsyncSession) -> int:
+        """Total rows matching the filters, via the selected count strategy"""
+        return await resolve_total(
+            db,
+            self.base_query,
+            self.model_class.__table__.name,
+            tuple(sorted(self._applied_filters)),
+            self.count_strategy
+        )
+
+    async def _execute_window(self, db: AsyncSession) -> tuple[List, int]:
+        """Fetch the page and the total in one statement using count(*) OVER ()"""
+        # The window is evaluated before OFFSET/LIMIT, so every row carries the full total
+        result = await db.execute(self.query.add_columns(func.count().over().label("total_count")))
+        rows = result.all()
+        if rows:
+            if self.fields is None:
+                items = [row[0] for row in rows]
+            else:
+                items = [{name: row._mapping[name] for name in self.fields} for row in rows]
+            return items, rows[0].total_count
+        # An empty page (e.g. past the end) carries no total; count separately
+        return [], await exact_count(db, self.base_query)
+
+    async def _execute_concurrent(self, db: AsyncSession) -> tuple[List, int]:
+        """Run the count on a second pooled connection while the page runs on db"""
+        async with AsyncSession(db.bind, expire_on_commit=False) as count_session:
+            total, result = await asyncio.gather(
+                exact_count(count_session, self.base_query),
+                db.execute(self.query)
+            )
+        return self._rows_to_items(result), total
+
+    async def fetch_many(self, db: AsyncSession, ids: List[Any]) -> tuple[List, List]:
+        """
+        Fetch rows by primary key in one query; returns (items in request order, missing ids)
+
+        On PostgreSQL the ids travel as a single array parameter
+        (`id = ANY($1)`), so the statement text is identical for any number
+        of ids and stays in the prepared-statement cache; other dialects use
+        an expanding IN. Duplicate ids are returned once.
+        """
+        pk_name = self.metadata.primary_key
+        pk = self.metadata.columns[pk_name]
+        try:
+            wanted = list(dict.fromkeys(pk.convert(value) for value in ids))
+        except (ValueError, TypeError) as e:
+            raise InvalidQueryError(f"Invalid id: {e}") from e
+        if not wanted:
+            return [], []
+
+        if db.bind.dialect.name == "postgresql":
+            condition = pk.attribute == any_(bindparam("ids", wanted, type_=ARRAY(pk.attribute.type)))
+        else:
+            condition = pk.attribute.in_(wanted)
+        result = await db.execute(self.query.where(condition))
+        items = self._rows_to_items(result)
+
+        def key_of(item):
+            return item[pk_name] if isinstance(item, dict) else getattr(item, pk_name)
+
+        by_id = {key_of(item): item for item in items}
+        return [by_id[i] for i in wanted if i in by_id], [i for i in wanted if i not in by_id]
+
+    async def stream(self, db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[List[dict]]:
+        """
+        Yield the full (unpaginated) result as batches of row dicts
+
+        Rows come from a server-side cursor fetched batch_size at a time, so
+        memory stays flat whatever the result size. No count is run.
+        """
+        self.as_mappings()
+        if self._search_term:
+            self._attach_search(db.bind.dialect.name)
+        result = await db.stream(self.query.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions():
+            yield rows_to_dicts(partition)
+
+    def version_expression(self):
+        """The model's version column (updated_at when it has one), or None"""
+        if self.metadata.version_column is None:
+            return None
+        return self.metadata.columns[self.metadata.version_column].attribute
+
+    @property
+    def version_covers_result(self) -> bool:
+        """
+        Whether resolve_version() reflects every row the result depends on
+
+        Not when related rows are embedded or filtered/sorted on: a change to
+        a category moves neither the posts' count nor their newest version.
+        """
+        return self.version_expression() is not None and not self._embedded and not self._joined
+
+    async def resolve_version(self, db: AsyncSession) -> tuple[int, Any]:
+        """
+        Validator for the filtered result set: (exact row count, newest row version)
+
+        Both come from one count(*)/max() statement, so a conditional list
+        request is answered without fetching or serializing the page. The
+        count is always exact, whatever the count strategy: it is what
+        changes when a row other than the newest is deleted, and an
+        estimated or cached total would hand out a stale 304.
+        """
+        if self._search_term:
+            self._attach_search(db.bind.dialect.name)
+        version = self.version_expression()
+        columns = [func.count()] + ([func.max(version)] if version is not None else [])
+        result = await db.execute(self.base_query.order_by(None).with_only_columns(*columns))
+        row = result.one()
+        return row[0], (row[1] if version is not None else None)
+
     async def execute(self, db: AsyncSession) -> tuple[List, int]:
         """Execute query and return results with total count"""
+        if self._search_term:
+            self._attach_search(db.bind.dialect.name)
+        self._attach_embeds()
+        # Only plain dict rows are shared: ORM entities belong to the leader's session
+        coalesce = settings.SINGLE_FLIGHT_ENABLED and self.fields is not None
+        key = self._flight_key(db) if coalesce else None
+        if key is None:
+            items, total = await self._fetch(db)
+        else:
+            # Identical concurrent pages share one count + page execution
+            (items, total), shared = await list_flights.do(key, lambda: self._fetch(db))
+            items = [dict(item) for item in items] if shared else list(items)
+
+        if self._keyset:
+            items = self._set_page_cursors(items)
+
+        return items, total
+
+    def _flight_key(self, db: AsyncSession) -> Optional[tuple]:
+        """
+        Canonical identity of what _fetch() returns: the statement's structural
+        cache key, its bound values, how the total is obtained and the bind
+        that answers (primary or replica engine, or a dedicated connection);
+        None if not cacheable. Only used for as_mappings() builders, whose
+        rows are plain dicts that waiters can safely share
+        """
+        cache_key = self.query._generate_cache_key()
+        if cache_key is None:
+            return None
+        values = tuple(repr(bind.effective_value) for bind in cache_key.bindparams)
+        return (db.bind, cache_key.key, values, self.count_strategy, self.execution_mode,
+                tuple(relation.name for relation in self._embedded))
+
+    async def _fetch(self, db: AsyncSession) -> tuple[List, int]:
+        """The page and total, with embedded relations"""
+        # Only executions are sampled: coalesced waiters ran no query of their own
+        if self._advised and random.random() < settings.INDEX_ADVISOR_SAMPLE_RATE:
+            index_advisor.record(shape_of(self.model_class.__tablename__, self._applied_filters, self._sort_columns))
+        items, total = await self._fetch_page(db)
+        if self._embedded and self.fields is not None:
+            await self.load_embedded(db, items)
+        return items, total
+
+    async def _fetch_page(self, db: AsyncSession) -> tuple[List, int]:
+        """The page and total, per count strategy and execution mode"""
+        exact = self.count_strategy == CountStrategy.EXACT
+        # A keyset page only sees rows past the cursor, so its window count
+        # would not be the total; keyset pages never use WINDOW
+        if exact and self.execution_mode == ExecutionMode.WINDOW and not self._keyset:
+            return await self._execute_window(db)
+        if exact and self.execution_mode == ExecutionMode.CONCURRENT:
+            return await self._execute_concurrent(db)
         # Use base_query for count to get total without pagination
-        count_result = await db.execute(
-            select(func.count()).select_from(self.base_query.alias())
-        )
-        total = count_result.scalar()
+        total = await self._resolve_total(db)
 
         # Use paginated query for actual results
         result = await db.execute(self.query)
-        items = result.scalars().all()
-
-        return items, total 
\ No newline at end of file
+        return self._rows_to_items(result), total 
\ No newline at end of file
@@ -0,0 +1,242 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from fastapi import Request
+from fastapi.responses import Response
+from core.config import settings
+from database.events import on_table_write
+from database.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth replaying on a hit (content-type/length are rebuilt)
+CACHED_HEADERS = ("x-total-count", "x-next-cursor", "x-prev-cursor", "etag", "last-modified")
+
+
+def request_signature(request: Request) -> str:
+    """
+    Canonical key for a request: path plus query parameters sorted by name
+
+    The sort is stable, so repeated parameters (filter[...] triples,
+    which are matched by position) keep their relative order.
+    """
+    items = sorted(request.query_params.multi_items(), key=lambda item: item[0])
+    raw = json.dumps([request.url.path, items], separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface behind ResponseCache
+
+    Values are opaque bytes; entries are tagged with the table they were read
+    from so a committed write to that table can drop them all at once.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, table: str, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, table: str, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_tables(self, tables: Set[str]) -> None:
+        """Drop every entry read from the given tables (may schedule async work)"""
+
+    def describe(self) -> dict:
+        return {"backend": type(self).__name__, **asdict(self.stats)}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count and total bytes, with per-entry TTL"""
+
+    def __init__(self, max_entries: int, max_bytes: int, clock=time.monotonic):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    async def get(self, table: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get((table, key))
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._remove((table, key))
+                return None
+            self._data.move_to_end((table, key))
+            return value
+
+    async def set(self, table: str, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove((table, key))
+            self._data[(table, key)] = (self._clock() + ttl, value)
+            self._bytes += len(value)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def invalidate_tables(self, tables: Set[str]) -> None:
+        with self._lock:
+            stale = [key for key in self._data if key[0] in tables]
+            for key in stale:
+                self._remove(key)
+            self.stats.invalidations += len(stale)
+
+    def _remove(self, key) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def describe(self) -> dict:
+        return {**super().describe(), "entries": len(self._data), "bytes": self._bytes}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache in Redis, so every worker sees the same entries
+
+    Invalidation bumps a per-table generation number that is part of every
+    key; old entries simply stop being addressed and expire via their TTL.
+    Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "rjfs:cache"):
+        super().__init__()
+        import redis.asyncio as redis_asyncio
+        self._redis = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def _key(self, table: str, key: str) -> str:
+        generation = await self._redis.get(f"{self._prefix}:gen:{table}") or b"0"
+        return f"{self._prefix}:{table}:{generation.decode()}:{key}"
+
+    async def get(self, table: str, key: str) -> Optional[bytes]:
+        return await self._redis.get(await self._key(table, key))
+
+    async def set(self, table: str, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(await self._key(table, key), value, px=int(ttl * 1000))
+
+    def invalidate_tables(self, tables: Set[str]) -> None:
+        async def bump():
+            for table in tables:
+                await self._redis.incr(f"{self._prefix}:gen:{table}")
+        try:
+            asyncio.get_running_loop().create_task(bump())
+            self.stats.invalidations += len(tables)
+        except RuntimeError:
+            logger.warning("No event loop to invalidate cached %s; entries expire by TTL", sorted(tables))
+
+
+class ResponseCache:
+    """
+    Caches rendered JSON bodies (plus pagination headers) by canonical request signature
+
+    A hit skips the database and serialization entirely. Entries live for
+    `ttl` seconds at most and are dropped when their table is written.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def signature(request: Request) -> str:
+        return request_signature(request)
+
+    async def get(self, table: str, request: Request) -> Optional[Response]:
+        if self.backend is None:
+            return None
+        value = await self.backend.get(table, self.signature(request))
+        if value is None:
+            self.backend.stats.misses += 1
+            return None
+        self.backend.stats.hits += 1
+        header_line, _, body = value.partition(b"\n")
+        headers = json.loads(header_line)
+        headers["x-cache"] = "hit"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def put(self, table: str, request: Request, response: Response) -> None:
+        if self.backend is None or response.status_code != 200:
+            return
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        value = json.dumps(headers).encode() + b"\n" + response.body
+        await self.backend.set(table, self.signature(request), value, self.ttl)
+
+    def describe(self) -> dict:
+        if self.backend is None:
+            return {"backend": None}
+        return {**self.backend.describe(), "ttl": self.ttl}
+
+
+def build_backend(kind: str) -> Optional[CacheBackend]:
+    """
+    Backend selected by RESPONSE_CACHE_BACKEND (none | memory | redis)
+
+    The memory backend is per process: a write handled by one worker cannot
+    invalidate another worker's copy, so it is refused when WEB_CONCURRENCY > 1.
+    """
+    if kind == "memory":
+        if settings.WEB_CONCURRENCY > 1:
+            raise ValueError(
+                "RESPONSE_CACHE_BACKEND=memory cannot be invalidated across "
+                f"{settings.WEB_CONCURRENCY} workers; use redis or none"
+            )
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+    if kind == "redis":
+        return RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+    return None
+
+
+response_cache = ResponseCache(build_backend(settings.RESPONSE_CACHE_BACKEND), settings.RESPONSE_CACHE_TTL)
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """Swap the backend at runtime (e.g. a local stand-in for the shared cache in tests)"""
+    response_cache.backend = backend
+
+
+def _with_referencing_tables(tables: Set[str]) -> Set[str]:
+    """Tables with a foreign key into a written table embed or filter on its rows too"""
+    return set(tables) | {
+        table.name for table in Base.metadata.tables.values()
+        if any(fk.column.table.name in tables for fk in table.foreign_keys)
+    }
+
+
+@on_table_write
+def _invalidate_responses(tables: Set[str]) -> None:
+    if response_cache.backend is not None:
+        response_cache.backend.invalidate_tables(_with_referencing_tables(tables))
@@ -0,0 +1,53 @@
+from typing import Any, Optional, Tuple
+from sqlalchemy import and_, or_, case, func, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.types import Text
+from utils.model_metadata import ModelMetadata, _escape_like, LIKE_ESCAPE
+
+# Title matches outweigh body matches in the fallback ranking
+FALLBACK_WEIGHTS = (2, 1)
+
+
+def build_search(metadata: ModelMetadata, term: str, dialect_name: str) -> Optional[Tuple[Any, Any]]:
+    """
+    Build (match condition, rank expression) for a free-text search term
+
+    On PostgreSQL this uses the model's generated tsvector column (GIN
+    indexed) with websearch_to_tsquery, and also matches trigram-indexed
+    short columns by similarity so typos and word fragments still find rows.
+    Other dialects (SQLite in tests) fall back to ILIKE over the search
+    columns. Returns None when the model declares no search columns.
+    """
+    term = term.strip()
+    if not term or not metadata.search_columns:
+        return None
+    columns = [metadata.columns[name] for name in metadata.search_columns]
+
+    if dialect_name == "postgresql" and metadata.search_vector:
+        table = metadata.model_class.__table__.name
+        vector = literal_column(f"{table}.{metadata.search_vector}", type_=TSVECTOR)
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{metadata.search_language}'::regconfig"), term)
+        conditions = [vector.op("@@")(tsquery)]
+        rank = func.ts_rank_cd(vector, tsquery)
+        for info in columns:
+            # Similarity is only meaningful for short columns (titles), not
+            # long Text bodies, even when those are trigram indexed too
+            if info.trigram_indexed and not isinstance(info.attribute.type, Text):
+                # Served by the gin_trgm_ops index on the column
+                conditions.append(info.attribute.op("%")(term))
+                rank = rank + func.similarity(info.attribute, term)
+        return or_(*conditions), rank
+
+    words = term.split()
+    patterns = [f"%{_escape_like(word)}%" for word in words]
+    # Every word must appear in at least one search column
+    condition = and_(*(
+        or_(*(info.attribute.ilike(pattern, escape=LIKE_ESCAPE) for info in columns))
+        for pattern in patterns
+    ))
+    rank = sum(
+        case((info.attribute.ilike(pattern, escape=LIKE_ESCAPE), FALLBACK_WEIGHTS[min(i, len(FALLBACK_WEIGHTS) - 1)]), else_=0)
+        for i, info in enumerate(columns)
+        for pattern in patterns
+    )
+    return condition, rank
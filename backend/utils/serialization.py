@@ -0,0 +1,50 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Iterable, List, Mapping
+from uuid import UUID
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def _default(value: Any):
+    """Fallback encoder for types the stdlib json module does not know"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize plain data (dicts, lists, datetimes...) straight to JSON bytes
+
+    Uses orjson when installed, which encodes datetimes natively in the same
+    ISO 8601 form jsonable_encoder produces; otherwise falls back to json.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def rows_to_dicts(rows: Iterable[Mapping]) -> List[dict]:
+    """Turn Core row mappings into dicts without touching the ORM"""
+    return [dict(row) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for already-plain data
+
+    Skips jsonable_encoder's reflective walk: content must be made of dicts,
+    lists and scalars, e.g. rows read with Result.mappings().
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,74 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+When several requests run the same query at the same moment, the first one
+(the leader) executes it and the others await its result instead of issuing
+their own. Nothing is kept once the flight lands, so unlike the response
+cache this never serves data older than an in-flight query: a caller either
+starts a new execution or joins one that began after it arrived.
+
+Only plain rows (dicts built from row mappings) may be shared: an ORM
+instance belongs to the leader's session, which is not the waiter's and
+may already be closed, so callers with entities skip coalescing.
+
+Errors reach every waiter. If the leader is cancelled (client went away),
+its waiters are not failed; one of them starts a new flight.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+from utils.metrics import registry
+
+single_flight_total = registry.counter(
+    "single_flight_total", "Coalescable executions, by group and role (leader|shared)", ("group", "role"))
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key within one event loop"""
+
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of fn(), run once per key at a time; also whether it was shared"""
+        while True:
+            future = self._flights.get(key)
+            if future is None:
+                break
+            try:
+                # Shielded so a waiter's own cancellation never cancels the leader's flight
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    continue  # the leader was cancelled, not us: take over
+                raise
+            single_flight_total.inc(self.group, "shared")
+            return result, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        single_flight_total.inc(self.group, "leader")
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved; waiters (if any) re-raise it themselves
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+# List pages (QueryBuilder.execute) and single rows (detail endpoints)
+list_flights = SingleFlight("list")
+detail_flights = SingleFlight("detail")
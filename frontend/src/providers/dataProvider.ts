@@ -2,7 +2,7 @@ import { DataProvider } from "@refinedev/core";
 import { axiosInstance } from "./axiosInstance";
 
 export const dataProvider = (apiUrl: string): DataProvider => ({
-  getList: async ({ resource, pagination, sorters }) => {
+  getList: async ({ resource, pagination, sorters, meta }) => {
     console.log("[Data Provider] API URL:", apiUrl);
     console.log("[Data Provider] Making request to:", `${apiUrl}/${resource}/`);
     
@@ -17,6 +17,11 @@ export const dataProvider = (apiUrl: string): DataProvider => ({
       params._order = sorters[0].order;
     }
 
+    // Sparse fieldset: only fetch the columns the view renders
+    if (meta?.fields?.length) {
+      params._fields = meta.fields.join(",");
+    }
+
     const response = await axiosInstance.get(`${apiUrl}/${resource}/`, { params });
 
     console.log("[Data Provider] Response headers:", response.headers);
@@ -37,6 +42,49 @@ export const dataProvider = (apiUrl: string): DataProvider => ({
     };
   },
 
+  getMany: async ({ resource, ids, meta }) => {
+    // One request for all ids instead of one getOne per id
+    const params: any = { id: ids };
+    if (meta?.fields?.length) {
+      params._fields = meta.fields.join(",");
+    }
+    const response = await axiosInstance.get(`${apiUrl}/${resource}/many`, {
+      params,
+      paramsSerializer: { indexes: null },
+    });
+    return {
+      data: response.data,
+    };
+  },
+
+  // Bulk writes run as one statement each on the backend
+  createMany: async ({ resource, variables }) => {
+    const response = await axiosInstance.post(`${apiUrl}/${resource}/bulk`, variables);
+    return {
+      data: response.data,
+    };
+  },
+
+  updateMany: async ({ resource, ids, variables }) => {
+    const response = await axiosInstance.patch(`${apiUrl}/${resource}/bulk`, {
+      ids,
+      values: variables,
+    });
+    return {
+      data: response.data,
+    };
+  },
+
+  deleteMany: async ({ resource, ids }) => {
+    const response = await axiosInstance.delete(`${apiUrl}/${resource}/bulk`, {
+      params: { id: ids },
+      paramsSerializer: { indexes: null },
+    });
+    return {
+      data: response.data,
+    };
+  },
+
   // Add these required methods as stubs
   create: async ({ resource, variables }) => {
     throw new Error("Not implemented");